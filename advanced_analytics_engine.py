@@ -17,6 +17,8 @@ Features:
 import asyncio
 import logging
 import json
+import random
+import threading
 import time
 import uuid
 import numpy as np
@@ -25,10 +27,13 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable, Tuple, Union
 from dataclasses import dataclass, asdict, field
 from enum import Enum
-from collections import defaultdict, deque
+from collections import defaultdict
 import statistics
 from abc import ABC, abstractmethod
 
+from metric_store import ColumnarMetricStore, summarize_buckets
+from streaming_stats import StreamingBaseline
+
 # ML and analytics imports
 try:
     from sklearn.ensemble import IsolationForest, RandomForestRegressor
@@ -120,28 +125,56 @@ class PerformanceProfile:
     recommendations: List[str]
     last_updated: datetime
 
+def _to_epoch_ns(timestamp: datetime) -> int:
+    """Naive-UTC datetime -> epoch nanoseconds"""
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+
+def _from_epoch_ns(timestamp_ns: int) -> datetime:
+    """Epoch nanoseconds -> naive-UTC datetime"""
+    return _EPOCH + timedelta(microseconds=timestamp_ns // 1000)
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _exponential_smoothing(values: np.ndarray, alpha: float) -> float:
+    """Final value of s[0] = x[0], s[i] = alpha * x[i] + (1 - alpha) * s[i-1]"""
+    decay = (1 - alpha) ** np.arange(len(values) - 1, -1, -1)
+    weights = alpha * decay
+    weights[0] = decay[0]
+    return float(weights @ values)
+
 class TimeSeriesAnalyzer:
     """Advanced time series analysis and forecasting"""
 
-    def __init__(self, window_size: int = 100):
+    def __init__(self, window_size: int = 100, store: ColumnarMetricStore = None):
         self.window_size = window_size
-        self.data_buffers: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window_size))
+        # Reads zero-copy views from a shared store; standalone analyzers
+        # keep their own small ring buffers
+        self.owns_store = store is None
+        self.store = store if store is not None else ColumnarMetricStore(capacity=window_size, rollup_tiers=())
 
     def add_data_point(self, metric_name: str, value: float, timestamp: datetime):
-        """Add a data point to the time series"""
-        self.data_buffers[metric_name].append((timestamp, value))
+        """Add a data point to the time series (standalone analyzers only)"""
+        if self.owns_store:
+            self.store.append(metric_name, _to_epoch_ns(timestamp), value)
+
+    def _series(self, metric_name: str, min_points: int):
+        series = self.store.get(metric_name)
+        if series is None or len(series) < min_points:
+            return None
+        return series
 
     def detect_trends(self, metric_name: str, lookback_periods: int = 20) -> Dict[str, Any]:
         """Detect trends in time series data"""
-        if metric_name not in self.data_buffers or len(self.data_buffers[metric_name]) < lookback_periods:
+        series = self._series(metric_name, lookback_periods)
+        if series is None:
             return {'trend': 'insufficient_data', 'confidence': 0.0}
 
-        data = list(self.data_buffers[metric_name])[-lookback_periods:]
-        values = [point[1] for point in data]
+        values = series.values(lookback_periods)
 
         # Calculate trend using linear regression
         x = np.arange(len(values))
-        y = np.array(values)
+        y = values
 
         # Simple linear regression
         n = len(x)
@@ -180,48 +213,32 @@ class TimeSeriesAnalyzer:
 
     def forecast(self, metric_name: str, periods_ahead: int = 10) -> Dict[str, Any]:
         """Simple forecasting using exponential smoothing"""
-        if metric_name not in self.data_buffers or len(self.data_buffers[metric_name]) < 10:
+        series = self._series(metric_name, 10)
+        if series is None:
             return {'error': 'insufficient_data'}
 
-        data = list(self.data_buffers[metric_name])
-        values = [point[1] for point in data]
-        timestamps = [point[0] for point in data]
+        values = series.values(self.window_size)
+        timestamps = series.timestamps(2)
 
         # Exponential smoothing parameters
         alpha = 0.3  # smoothing factor
 
-        # Initialize
-        s = [values[0]]
-
-        # Calculate smoothed values
-        for i in range(1, len(values)):
-            s.append(alpha * values[i] + (1 - alpha) * s[i-1])
+        # Only the last two smoothed values are needed, and each is a
+        # geometrically weighted sum of the window: no per-point loop
+        last_smoothed = _exponential_smoothing(values, alpha)
+        trend = last_smoothed - _exponential_smoothing(values[:-1], alpha) if len(values) >= 2 else 0
 
-        # Forecast
-        last_smoothed = s[-1]
-        forecasts = []
-
-        # Simple trend component
-        if len(s) >= 2:
-            trend = s[-1] - s[-2]
+        last_timestamp = _from_epoch_ns(int(timestamps[-1]))
+        if len(timestamps) >= 2:
+            interval = (int(timestamps[-1]) - int(timestamps[-2])) / 1e9
         else:
-            trend = 0
-
-        last_timestamp = timestamps[-1]
-        forecast_timestamps = []
-
-        for i in range(periods_ahead):
-            forecast_value = last_smoothed + trend * (i + 1)
-            forecasts.append(forecast_value)
-
-            # Estimate next timestamp (assuming regular intervals)
-            if len(timestamps) >= 2:
-                interval = (timestamps[-1] - timestamps[-2]).total_seconds()
-                next_timestamp = last_timestamp + timedelta(seconds=interval * (i + 1))
-            else:
-                next_timestamp = last_timestamp + timedelta(minutes=5 * (i + 1))
+            interval = 300.0
 
-            forecast_timestamps.append(next_timestamp)
+        forecasts = [last_smoothed + trend * (i + 1) for i in range(periods_ahead)]
+        forecast_timestamps = [
+            last_timestamp + timedelta(seconds=interval * (i + 1))
+            for i in range(periods_ahead)
+        ]
 
         return {
             'forecasts': forecasts,
@@ -233,59 +250,119 @@ class TimeSeriesAnalyzer:
 class AnomalyDetector:
     """Advanced anomaly detection using multiple algorithms"""
 
-    def __init__(self):
-        self.baseline_stats: Dict[str, Dict[str, float]] = {}
+    def __init__(self, enable_isolation_forest: bool = False, refit_interval: float = 3600,
+                 iforest_sample_size: int = 1024):
+        # Streaming baselines are updated per point; Isolation Forest refits
+        # are opt-in and rate-limited to one per metric per refit_interval
+        self.baselines: Dict[str, StreamingBaseline] = {}
         self.isolation_forests: Dict[str, Any] = {}
-        self.update_interval = 3600  # 1 hour
+        self.enable_isolation_forest = enable_isolation_forest and SKLEARN_AVAILABLE
+        self.update_interval = refit_interval
+        self.iforest_sample_size = iforest_sample_size
         self.last_model_update = {}
 
-    def update_baseline(self, metric_name: str, data_points: List[float]):
-        """Update baseline statistics for a metric"""
+    @property
+    def baseline_stats(self) -> Dict[str, Dict[str, float]]:
+        """Snapshot of every baseline with enough samples to be used"""
+        return {name: baseline.snapshot() for name, baseline in self.baselines.items()
+                if baseline.ready}
+
+    def observe(self, metric_name: str, value: float):
+        """Fold a new data point into the metric's streaming baseline (O(1))"""
+        baseline = self.baselines.get(metric_name)
+        if baseline is None:
+            baseline = self.baselines[metric_name] = StreamingBaseline()
+        baseline.update(value)
+
+    def update_baseline(self, metric_name: str, data_points: Union[List[float], np.ndarray]):
+        """Rebuild a metric's baseline from historical data points"""
         if len(data_points) < 5:
             return
 
-        self.baseline_stats[metric_name] = {
-            'mean': statistics.mean(data_points),
-            'median': statistics.median(data_points),
-            'std': statistics.stdev(data_points) if len(data_points) > 1 else 0,
-            'min': min(data_points),
-            'max': max(data_points),
-            'q25': np.percentile(data_points, 25),
-            'q75': np.percentile(data_points, 75),
-            'iqr': np.percentile(data_points, 75) - np.percentile(data_points, 25)
-        }
+        baseline = StreamingBaseline()
+        for value in np.asarray(data_points, dtype=np.float64).tolist():
+            baseline.update(value)
+        self.baselines[metric_name] = baseline
+
+    def needs_refit(self, metric_name: str) -> bool:
+        """True if the metric's Isolation Forest is enabled and due for a refit"""
+        if not self.enable_isolation_forest:
+            return False
+        last_update = self.last_model_update.get(metric_name)
+        return last_update is None or \
+            (datetime.utcnow() - last_update).total_seconds() >= self.update_interval
+
+    def refit_isolation_forest(self, metric_name: str, data_points: np.ndarray):
+        """Fit a fresh Isolation Forest (blocking; run off the event loop)"""
+        if not self.enable_isolation_forest or len(data_points) < 10:
+            return
 
-        # Update Isolation Forest model if available
-        if SKLEARN_AVAILABLE and len(data_points) >= 10:
-            try:
-                # Reshape for sklearn
-                X = np.array(data_points).reshape(-1, 1)
+        try:
+            # Reshape for sklearn
+            X = np.asarray(data_points, dtype=np.float64).reshape(-1, 1)
 
-                # Create and fit Isolation Forest
-                iso_forest = IsolationForest(contamination=0.1, random_state=42)
-                iso_forest.fit(X)
+            # Create and fit Isolation Forest
+            iso_forest = IsolationForest(contamination=0.1, random_state=42)
+            iso_forest.fit(X)
 
-                self.isolation_forests[metric_name] = iso_forest
-                self.last_model_update[metric_name] = datetime.utcnow()
+            self.isolation_forests[metric_name] = iso_forest
+            self.last_model_update[metric_name] = datetime.utcnow()
 
+        except Exception as e:
+            logger.warning(f"Failed to update Isolation Forest for {metric_name}: {e}")
+
+    def detect_batch(self, metric_name: str, values: np.ndarray,
+                     timestamps_ns: np.ndarray) -> List[AnomalyAlert]:
+        """Detect anomalies in a batch of points for one metric
+
+        A vectorised pre-filter applies the z-score, IQR and (if fitted)
+        Isolation Forest tests to the whole batch; full alerts are only
+        built for the points it flags.
+        """
+        baseline = self.baselines.get(metric_name)
+        if baseline is None or not baseline.ready or not len(values):
+            return []
+
+        candidates = np.zeros(len(values), dtype=bool)
+        ewma_std = baseline.ewma_std
+        if ewma_std > 0:
+            candidates |= np.abs(values - baseline.ewma) > 2 * ewma_std
+
+        q25 = baseline.quantiles.quantile(0.25)
+        q75 = baseline.quantiles.quantile(0.75)
+        candidates |= (values < q25 - 1.5 * (q75 - q25)) | (values > q75 + 1.5 * (q75 - q25))
+
+        iso_forest = self.isolation_forests.get(metric_name) if self.enable_isolation_forest else None
+        if iso_forest is not None:
+            try:
+                candidates |= iso_forest.predict(values.reshape(-1, 1)) == -1
             except Exception as e:
-                logger.warning(f"Failed to update Isolation Forest for {metric_name}: {e}")
+                logger.warning(f"Isolation Forest detection failed for {metric_name}: {e}")
+
+        alerts = []
+        for i in np.flatnonzero(candidates):
+            alert = self.detect_anomaly(metric_name, float(values[i]), _from_epoch_ns(int(timestamps_ns[i])))
+            if alert:
+                alerts.append(alert)
+        return alerts
 
     def detect_anomaly(self, metric_name: str, value: float, timestamp: datetime) -> Optional[AnomalyAlert]:
         """Detect if a value is anomalous"""
 
-        if metric_name not in self.baseline_stats:
+        baseline = self.baselines.get(metric_name)
+        if baseline is None or not baseline.ready:
             return None
 
-        stats = self.baseline_stats[metric_name]
         anomaly_level = None
         description = ""
         confidence = 0.0
-        expected_range = (stats['min'], stats['max'])
+        expected_range = (baseline.minimum, baseline.maximum)
 
-        # Statistical outlier detection (Z-score method)
-        if stats['std'] > 0:
-            z_score = abs(value - stats['mean']) / stats['std']
+        # Statistical outlier detection (Z-score against the EWMA baseline,
+        # which follows level shifts instead of all-time history)
+        ewma_std = baseline.ewma_std
+        if ewma_std > 0:
+            z_score = abs(value - baseline.ewma) / ewma_std
 
             if z_score > 3:
                 anomaly_level = AnomalyLevel.CRITICAL
@@ -300,9 +377,11 @@ class AnomalyDetector:
                 confidence = min(0.75, z_score / 6)
                 description = f"Moderate anomaly detected (Z-score: {z_score:.2f})"
 
-        # IQR-based detection
-        iqr_lower = stats['q25'] - 1.5 * stats['iqr']
-        iqr_upper = stats['q75'] + 1.5 * stats['iqr']
+        # IQR-based detection against the streaming quartile sketch
+        q25 = baseline.quantiles.quantile(0.25)
+        q75 = baseline.quantiles.quantile(0.75)
+        iqr_lower = q25 - 1.5 * (q75 - q25)
+        iqr_upper = q75 + 1.5 * (q75 - q25)
 
         if value < iqr_lower or value > iqr_upper:
             if anomaly_level is None:
@@ -313,7 +392,7 @@ class AnomalyDetector:
             expected_range = (iqr_lower, iqr_upper)
 
         # Isolation Forest detection
-        if SKLEARN_AVAILABLE and metric_name in self.isolation_forests:
+        if self.enable_isolation_forest and metric_name in self.isolation_forests:
             try:
                 iso_forest = self.isolation_forests[metric_name]
                 anomaly_score = iso_forest.decision_function([[value]])[0]
@@ -345,7 +424,7 @@ class AnomalyDetector:
                 expected_range=expected_range,
                 confidence=confidence,
                 suggested_actions=suggested_actions,
-                context={'baseline_stats': stats}
+                context={'baseline_stats': baseline.snapshot()}
             )
 
         return None
@@ -387,6 +466,8 @@ class AnomalyDetector:
 
         return actions
 
+ANOMALY_BACKPRESSURE_POLICIES = ('drop', 'sample', 'block')
+
 class AdvancedAnalyticsEngine:
     """
     Advanced Analytics Engine for comprehensive system monitoring and optimization
@@ -400,11 +481,54 @@ class AdvancedAnalyticsEngine:
     - Behavioral analytics and pattern recognition
     """
 
-    def __init__(self, retention_days: int = 30):
+    def __init__(self, retention_days: int = 30, buffer_capacity: int = 10000,
+                 enable_isolation_forest: bool = False, anomaly_queue_size: int = 10000,
+                 anomaly_backpressure: str = 'drop', anomaly_batch_interval: float = 0.05):
+        if anomaly_backpressure not in ANOMALY_BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown anomaly back-pressure policy: {anomaly_backpressure}")
+
         self.retention_days = retention_days
-        self.metrics_buffer: Dict[str, deque] = defaultdict(lambda: deque(maxlen=10000))
-        self.time_series_analyzer = TimeSeriesAnalyzer()
-        self.anomaly_detector = AnomalyDetector()
+        # One columnar ring buffer per metric, shared with the analyzers, plus
+        # 1m/1h/1d rollups so history survives for the whole retention period
+        self.rollup_min_buckets = 24  # buckets a tier must give per queried window
+        self.metric_store = ColumnarMetricStore(
+            capacity=buffer_capacity,
+            rollup_tiers=(
+                ('1m', 60, min(retention_days, 2) * 1440),
+                ('1h', 3600, retention_days * 24),
+                ('1d', 86400, retention_days),
+            )
+        )
+        self.time_series_analyzer = TimeSeriesAnalyzer(store=self.metric_store)
+        self.anomaly_detector = AnomalyDetector(enable_isolation_forest=enable_isolation_forest)
+
+        # Bounded anomaly-check queue drained in batches by one consumer task.
+        # Pending points are kept in parallel lists that the consumer swaps
+        # out under the lock, so a drain is O(1) for producers.
+        self.anomaly_queue_size = anomaly_queue_size
+        self.anomaly_backpressure = anomaly_backpressure
+        self.anomaly_batch_interval = anomaly_batch_interval
+        self.anomaly_block_timeout = 1.0
+        self._anomaly_queue = threading.Condition()
+        self._pending_names: List[str] = []
+        self._pending_values: List[float] = []
+        self._pending_timestamps: List[int] = []
+        self._overflow_seen = 0
+        self._consumer_thread: Optional[int] = None
+        self._sample_rng = random.Random()
+        self.anomaly_queue_stats = {
+            'enqueued': 0,
+            'processed': 0,
+            'dropped': 0,
+            'sampled_out': 0,
+            'blocked': 0,
+            'batches': 0,
+            'alerts': 0,
+            'max_depth': 0,
+            'last_batch_size': 0,
+            'last_lag_seconds': 0.0,
+            'max_lag_seconds': 0.0
+        }
 
         # Analytics state
         self.running = False
@@ -429,15 +553,18 @@ class AdvancedAnalyticsEngine:
     async def start(self):
         """Start the analytics engine"""
         self.running = True
+        # The consumer runs on this loop; 'block' must never wait on its thread
+        self._consumer_thread = threading.get_ident()
 
         # Start background processes
         analysis_task = asyncio.create_task(self._analysis_loop())
         cleanup_task = asyncio.create_task(self._cleanup_loop())
         model_update_task = asyncio.create_task(self._model_update_loop())
+        anomaly_task = asyncio.create_task(self._anomaly_consumer_loop())
 
         logger.info("🚀 Advanced Analytics Engine started")
 
-        return [analysis_task, cleanup_task, model_update_task]
+        return [analysis_task, cleanup_task, model_update_task, anomaly_task]
 
     async def stop(self):
         """Stop the analytics engine"""
@@ -447,46 +574,129 @@ class AdvancedAnalyticsEngine:
     def record_metric(self, name: str, value: float, metric_type: MetricType = MetricType.SYSTEM,
                      tags: Dict[str, str] = None, metadata: Dict[str, Any] = None):
         """Record a metric value"""
-        timestamp = datetime.utcnow()
-
-        metric_point = MetricPoint(
-            timestamp=timestamp,
-            value=value,
-            metric_name=name,
-            metric_type=metric_type,
-            tags=tags or {},
-            metadata=metadata or {}
-        )
-
-        # Store in buffer
-        self.metrics_buffer[name].append(metric_point)
-
-        # Update time series analyzer
-        self.time_series_analyzer.add_data_point(name, value, timestamp)
+        timestamp_ns = time.time_ns()
+
+        # Store in the metric's ring buffer (also feeds the time series analyzer)
+        self.metric_store.append(name, timestamp_ns, value, tags, metric_type, metadata)
+
+        # Update the streaming anomaly baseline
+        self.anomaly_detector.observe(name, value)
+
+        # Queue the point for the batched anomaly check
+        self._enqueue_anomaly_check(name, value, timestamp_ns)
+
+    def _enqueue_anomaly_check(self, name: str, value: float, timestamp_ns: int):
+        """Add a point to the bounded anomaly queue, applying back-pressure"""
+        stats = self.anomaly_queue_stats
+        with self._anomaly_queue:
+            if len(self._pending_names) >= self.anomaly_queue_size:
+                policy = self.anomaly_backpressure
+                if policy == 'sample':
+                    # Reservoir sampling keeps a uniform sample of the overflow
+                    self._overflow_seen += 1
+                    slot = self._sample_rng.randrange(self.anomaly_queue_size + self._overflow_seen)
+                    if slot < self.anomaly_queue_size:
+                        self._pending_names[slot] = name
+                        self._pending_values[slot] = value
+                        self._pending_timestamps[slot] = timestamp_ns
+                    stats['sampled_out'] += 1
+                    return
+
+                # Blocking an event-loop thread would stall the consumer: drop instead
+                if policy == 'block' and self._may_block():
+                    stats['blocked'] += 1
+                    self._anomaly_queue.wait_for(
+                        lambda: len(self._pending_names) < self.anomaly_queue_size,
+                        timeout=self.anomaly_block_timeout
+                    )
+
+                if len(self._pending_names) >= self.anomaly_queue_size:
+                    stats['dropped'] += 1
+                    return
+
+            self._pending_names.append(name)
+            self._pending_values.append(value)
+            self._pending_timestamps.append(timestamp_ns)
+            stats['enqueued'] += 1
+            if len(self._pending_names) > stats['max_depth']:
+                stats['max_depth'] = len(self._pending_names)
+
+    def _may_block(self) -> bool:
+        """Whether a producer on this thread can wait for the consumer"""
+        if threading.get_ident() == self._consumer_thread:
+            return False
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return True
+        return False
+
+    def get_anomaly_queue_stats(self) -> Dict[str, Any]:
+        """Queue depth, lag and back-pressure counters for the anomaly pipeline"""
+        with self._anomaly_queue:
+            depth = len(self._pending_names)
+            oldest = self._pending_timestamps[0] if depth else None
+        return {
+            **self.anomaly_queue_stats,
+            'depth': depth,
+            'capacity': self.anomaly_queue_size,
+            'policy': self.anomaly_backpressure,
+            'lag_seconds': (time.time_ns() - oldest) / 1e9 if oldest is not None else 0.0
+        }
 
-        # Check for anomalies
-        asyncio.create_task(self._check_anomaly_async(name, value, timestamp))
+    async def process_anomaly_queue(self) -> int:
+        """Drain the anomaly queue and check it in per-metric batches"""
+        with self._anomaly_queue:
+            names, values, timestamps = self._pending_names, self._pending_values, self._pending_timestamps
+            self._pending_names, self._pending_values, self._pending_timestamps = [], [], []
+            self._overflow_seen = 0
+            self._anomaly_queue.notify_all()
+
+        if not names:
+            return 0
+
+        stats = self.anomaly_queue_stats
+        lag = (time.time_ns() - min(timestamps)) / 1e9
+        stats['batches'] += 1
+        stats['processed'] += len(names)
+        stats['last_batch_size'] = len(names)
+        stats['last_lag_seconds'] = lag
+        stats['max_lag_seconds'] = max(stats['max_lag_seconds'], lag)
+
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for index, name in enumerate(names):
+            groups[name].append(index)
+        value_array = np.asarray(values, dtype=np.float64)
+        timestamp_array = np.asarray(timestamps, dtype=np.int64)
+
+        for metric_name, indices in groups.items():
+            try:
+                anomalies = self.anomaly_detector.detect_batch(
+                    metric_name, value_array[indices], timestamp_array[indices]
+                )
+            except Exception as e:
+                logger.error(f"Anomaly detection error: {e}")
+                continue
 
-    async def _check_anomaly_async(self, metric_name: str, value: float, timestamp: datetime):
-        """Asynchronously check for anomalies"""
-        try:
-            anomaly = self.anomaly_detector.detect_anomaly(metric_name, value, timestamp)
+            for anomaly in anomalies:
+                stats['alerts'] += 1
+                await self._dispatch_alert(anomaly)
 
-            if anomaly:
-                logger.warning(f"🚨 Anomaly detected in {metric_name}: {anomaly.description}")
+        return len(names)
 
-                # Notify callbacks
-                for callback in self.alert_callbacks:
-                    try:
-                        if asyncio.iscoroutinefunction(callback):
-                            await callback(anomaly)
-                        else:
-                            callback(anomaly)
-                    except Exception as e:
-                        logger.error(f"Alert callback error: {e}")
+    async def _dispatch_alert(self, anomaly: AnomalyAlert):
+        """Log an anomaly and notify alert callbacks"""
+        logger.warning(f"🚨 Anomaly detected in {anomaly.metric_name}: {anomaly.description}")
 
-        except Exception as e:
-            logger.error(f"Anomaly detection error: {e}")
+        # Notify callbacks
+        for callback in self.alert_callbacks:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(anomaly)
+                else:
+                    callback(anomaly)
+            except Exception as e:
+                logger.error(f"Alert callback error: {e}")
 
     def add_alert_callback(self, callback: Callable):
         """Add a callback for anomaly alerts"""
@@ -510,39 +720,86 @@ class AdvancedAnalyticsEngine:
 
     def get_metric_summary(self, metric_name: str, time_window: timedelta = None) -> Dict[str, Any]:
         """Get comprehensive summary for a metric"""
-        if metric_name not in self.metrics_buffer:
+        series = self.metric_store.get(metric_name)
+        if series is None:
             return {'error': 'Metric not found'}
 
-        data_points = list(self.metrics_buffer[metric_name])
-
-        # Apply time window filter
+        # Apply time window filter (timestamps are sorted: binary search)
         if time_window:
-            cutoff_time = datetime.utcnow() - time_window
-            data_points = [dp for dp in data_points if dp.timestamp >= cutoff_time]
+            now_ns = time.time_ns()
+            window_ns = int(time_window.total_seconds() * 1e9)
+            cutoff_ns = now_ns - window_ns
+
+            # Long windows are answered from the coarsest rollup tier that
+            # still resolves them, so cost tracks bucket count, not raw points
+            tier = series.tier_for_window(window_ns, self.rollup_min_buckets)
+            if tier is None and series.rollups and not series.covers(cutoff_ns):
+                tier = min(series.rollups, key=lambda t: t.resolution_ns)
+            if tier is not None:
+                summary = self._summarize_rollup(metric_name, tier, cutoff_ns, now_ns)
+                if summary is None:
+                    return {'error': 'No data points in time window'}
+                return self._add_trend_analysis(metric_name, summary)
+
+            timestamps, values = series.since(cutoff_ns)
+        else:
+            timestamps, values = series.snapshot()
 
-        if not data_points:
+        if not len(values):
             return {'error': 'No data points in time window'}
 
-        values = [dp.value for dp in data_points]
+        minimum, maximum = float(values.min()), float(values.max())
 
         # Basic statistics
         summary = {
             'metric_name': metric_name,
             'data_points': len(values),
+            'resolution': 'raw',
+            'time_range': {
+                'start': _from_epoch_ns(int(timestamps[0])).isoformat(),
+                'end': _from_epoch_ns(int(timestamps[-1])).isoformat()
+            },
+            'statistics': {
+                'mean': float(values.mean()),
+                'median': float(np.median(values)),
+                'std': float(values.std(ddof=1)) if len(values) > 1 else 0,
+                'min': minimum,
+                'max': maximum,
+                'range': maximum - minimum
+            }
+        }
+
+        return self._add_trend_analysis(metric_name, summary)
+
+    def _summarize_rollup(self, metric_name: str, tier, cutoff_ns: int,
+                          now_ns: int) -> Optional[Dict[str, Any]]:
+        """Summary statistics from rollup buckets (median is approximate)"""
+        stats = summarize_buckets(tier.buckets(cutoff_ns))
+        if stats is None:
+            return None
+
+        return {
+            'metric_name': metric_name,
+            'data_points': stats['count'],
+            'resolution': tier.name,
+            'buckets': stats['buckets'],
             'time_range': {
-                'start': min(dp.timestamp for dp in data_points).isoformat(),
-                'end': max(dp.timestamp for dp in data_points).isoformat()
+                'start': _from_epoch_ns(max(stats['start_ns'], cutoff_ns)).isoformat(),
+                'end': _from_epoch_ns(min(stats['end_ns'] + tier.resolution_ns, now_ns)).isoformat()
             },
             'statistics': {
-                'mean': statistics.mean(values),
-                'median': statistics.median(values),
-                'std': statistics.stdev(values) if len(values) > 1 else 0,
-                'min': min(values),
-                'max': max(values),
-                'range': max(values) - min(values)
+                'mean': stats['mean'],
+                'median': stats['median'],
+                'std': stats['std'],
+                'min': stats['min'],
+                'max': stats['max'],
+                'range': stats['max'] - stats['min']
             }
         }
 
+    def _add_trend_analysis(self, metric_name: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach trend detection and forecast to a metric summary"""
+
         # Add trend analysis
         trends = self.time_series_analyzer.detect_trends(metric_name)
         summary['trends'] = trends
@@ -569,9 +826,9 @@ class AdvancedAnalyticsEngine:
 
                 # Gather metric values
                 for metric_name in definition['metric_names']:
-                    if metric_name in self.metrics_buffer and self.metrics_buffer[metric_name]:
-                        recent_values = [dp.value for dp in list(self.metrics_buffer[metric_name])[-10:]]
-                        metric_values[metric_name] = statistics.mean(recent_values)
+                    series = self.metric_store.get(metric_name)
+                    if series is not None and len(series):
+                        metric_values[metric_name] = float(series.values(10).mean())
 
                 # Calculate KPI based on method
                 method = definition['calculation_method']
@@ -639,10 +896,11 @@ class AdvancedAnalyticsEngine:
 
         if entity_id:
             # Filter metrics related to specific entity
-            metrics_to_analyze = [name for name in self.metrics_buffer.keys() 
-                                if entity_id in name or entity_id in str(self.metrics_buffer[name])]
+            metrics_to_analyze = [name for name in self.metric_store
+                                if entity_id in name or
+                                any(entity_id in tag for tag in self.metric_store.tag_values(name))]
         else:
-            metrics_to_analyze = list(self.metrics_buffer.keys())
+            metrics_to_analyze = list(self.metric_store)
 
         # Generate insights for each metric
         for metric_name in metrics_to_analyze[:20]:  # Limit to prevent overload
@@ -655,21 +913,22 @@ class AdvancedAnalyticsEngine:
                         insights['trends'][metric_name] = summary['trends']
 
                     # Check for recent anomalies (simplified)
-                    recent_data = list(self.metrics_buffer[metric_name])[-20:]
-                    for dp in recent_data:
-                        if time_window:
-                            cutoff = datetime.utcnow() - time_window
-                            if dp.timestamp < cutoff:
-                                continue
-
-                        # This is a simplified anomaly check
-                        if abs(dp.value - summary['statistics']['mean']) > 2 * summary['statistics']['std']:
-                            insights['anomalies'].append({
-                                'metric': metric_name,
-                                'value': dp.value,
-                                'timestamp': dp.timestamp.isoformat(),
-                                'deviation': abs(dp.value - summary['statistics']['mean'])
-                            })
+                    series = self.metric_store.get(metric_name)
+                    timestamps, values = series.snapshot(20)
+                    if time_window:
+                        cutoff_ns = time.time_ns() - int(time_window.total_seconds() * 1e9)
+                        start = int(np.searchsorted(timestamps, cutoff_ns, side='left'))
+                        timestamps, values = timestamps[start:], values[start:]
+
+                    # This is a simplified anomaly check
+                    deviations = np.abs(values - summary['statistics']['mean'])
+                    for i in np.flatnonzero(deviations > 2 * summary['statistics']['std']):
+                        insights['anomalies'].append({
+                            'metric': metric_name,
+                            'value': float(values[i]),
+                            'timestamp': _from_epoch_ns(int(timestamps[i])).isoformat(),
+                            'deviation': float(deviations[i])
+                        })
 
             except Exception as e:
                 logger.error(f"Insight generation error for {metric_name}: {e}")
@@ -731,6 +990,21 @@ class AdvancedAnalyticsEngine:
                 logger.error(f"Analysis loop error: {e}")
                 await asyncio.sleep(5.0)
 
+    async def _anomaly_consumer_loop(self):
+        """Background consumer for the batched anomaly queue"""
+        self._consumer_thread = threading.get_ident()
+        while self.running:
+            try:
+                await self.process_anomaly_queue()
+                await asyncio.sleep(self.anomaly_batch_interval)
+
+            except Exception as e:
+                logger.error(f"Anomaly consumer error: {e}")
+                await asyncio.sleep(1.0)
+
+        # Check whatever was queued before shutdown
+        await self.process_anomaly_queue()
+
     async def _cleanup_loop(self):
         """Background cleanup loop"""
         while self.running:
@@ -763,10 +1037,9 @@ class AdvancedAnalyticsEngine:
         system_metrics = {}
 
         # Gather recent metrics
-        for metric_name, buffer in self.metrics_buffer.items():
-            if buffer:
-                recent_values = [dp.value for dp in list(buffer)[-10:]]
-                system_metrics[metric_name] = statistics.mean(recent_values)
+        for metric_name, series in self.metric_store.items():
+            if len(series):
+                system_metrics[metric_name] = float(series.values(10).mean())
 
         if system_metrics:
             # Calculate overall performance grade
@@ -805,39 +1078,43 @@ class AdvancedAnalyticsEngine:
                 logger.error(f"Custom metric calculation error for {metric_name}: {e}")
 
     async def _update_anomaly_baselines(self):
-        """Update anomaly detection baselines"""
-        for metric_name, buffer in self.metrics_buffer.items():
-            if len(buffer) >= 10:
-                values = [dp.value for dp in buffer]
-                self.anomaly_detector.update_baseline(metric_name, values)
+        """Refit opt-in Isolation Forest models (streaming baselines update per point)"""
+        if not self.anomaly_detector.enable_isolation_forest:
+            return
+
+        loop = asyncio.get_running_loop()
+        for metric_name, series in self.metric_store.items():
+            if len(series) >= 10 and self.anomaly_detector.needs_refit(metric_name):
+                # Copy the sample: the ring keeps changing while the fit runs
+                sample = np.array(series.values(self.anomaly_detector.iforest_sample_size))
+                await loop.run_in_executor(
+                    None, self.anomaly_detector.refit_isolation_forest, metric_name, sample
+                )
 
     async def _cleanup_old_data(self):
         """Clean up old data beyond retention period"""
-        cutoff_time = datetime.utcnow() - timedelta(days=self.retention_days)
-
-        for metric_name in list(self.metrics_buffer.keys()):
-            buffer = self.metrics_buffer[metric_name]
+        cutoff_ns = time.time_ns() - self.retention_days * 86400 * 1_000_000_000
 
+        for metric_name, series in self.metric_store.items():
             # Remove old data points
-            while buffer and buffer[0].timestamp < cutoff_time:
-                buffer.popleft()
+            series.drop_before(cutoff_ns)
 
-            # Remove empty buffers
-            if not buffer:
-                del self.metrics_buffer[metric_name]
+            # Remove metrics with neither raw points nor rollups left
+            if series.is_empty():
+                self.metric_store.remove(metric_name)
 
     async def _update_prediction_models(self):
         """Update prediction models with recent data"""
         if not SKLEARN_AVAILABLE:
             return
 
-        for metric_name, buffer in self.metrics_buffer.items():
-            if len(buffer) >= 50:  # Need sufficient data for ML models
+        for metric_name, series in self.metric_store.items():
+            if len(series) >= 50:  # Need sufficient data for ML models
                 try:
                     # Prepare data
-                    data_points = list(buffer)[-100:]  # Last 100 points
-                    X = np.array([[i] for i in range(len(data_points))])
-                    y = np.array([dp.value for dp in data_points])
+                    data_points = series.values(100)  # Last 100 points
+                    X = np.arange(len(data_points)).reshape(-1, 1)
+                    y = data_points
 
                     # Train simple regression model
                     model = RandomForestRegressor(n_estimators=10, random_state=42)
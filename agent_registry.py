@@ -0,0 +1,312 @@
+"""
+XMRT-Ecosystem: Agent Registry
+Indexed agent lookup for task assignment.
+
+Agents are indexed by capability and by specialization. Every index key
+keeps a max-heap of its agents ordered by rank, the task-independent part
+of the assignment score, times the agent's weight for that capability
+(1.0 for specializations and unweighted capabilities):
+
+    rank = base_score * (1 - load / capacity)
+
+Selection first scores the (usually few) agents matching two or more of
+the requested keys, found by intersecting the index sets. Every other
+agent matches exactly one key, so once the heaps are walked best-first an
+agent not yet seen can score at most ``bound * max(top of each heap)``;
+the walk stops as soon as that cannot beat the best score found, and only
+a handful of agents are scored no matter how many are registered. Load, score, weight and heartbeat
+changes push a new heap entry and leave the old one to be skipped lazily;
+stale entries are popped when they reach the top of a heap, and a heap
+is compacted once they make up a fifth of it.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Rank of agents that are full, unavailable or missed their heartbeat
+INELIGIBLE_RANK = -1.0
+
+
+@dataclass
+class RegisteredAgent:
+    """Registry view of one agent"""
+    agent_id: str
+    capabilities: Set[str]
+    weights: Dict[str, float] = field(default_factory=dict)
+    specialization: Optional[str] = None
+    capacity: int = 3
+    load: int = 0
+    base_score: float = 1.0
+    available: bool = True
+    last_heartbeat: float = field(default_factory=time.time)
+    expired: bool = False
+    version: int = 0
+    order: int = 0
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.load < self.capacity
+
+    @property
+    def rank(self) -> float:
+        if self.expired or not self.available or not self.has_capacity:
+            return INELIGIBLE_RANK
+        return self.base_score * (1.0 - self.load / self.capacity)
+
+    def heap_key(self, key: Tuple[str, str]) -> float:
+        rank = self.rank
+        if rank < 0 or key[0] != 'capability':
+            return rank
+        return rank * self.weights.get(key[1], 1.0)
+
+
+class AgentRegistry:
+    """Capability/specialization index with lazily maintained rank heaps"""
+
+    def __init__(self, heartbeat_timeout: Optional[float] = None):
+        self.heartbeat_timeout = heartbeat_timeout
+        self.agents: Dict[str, RegisteredAgent] = {}
+        # Index sets are insertion-ordered dicts so iteration is deterministic
+        self.by_capability: Dict[str, Dict[str, None]] = {}
+        self.by_specialization: Dict[str, Dict[str, None]] = {}
+        self._heaps: Dict[Tuple[str, str], List[Tuple[float, int, int, str]]] = {}  # (-heap key, order, version, id)
+        self._order = itertools.count()
+        self._versions = itertools.count(1)
+        self._parked: List[RegisteredAgent] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self.agents
+
+    def register(self, agent_id: str, capabilities: Iterable[str], specialization: Optional[str] = None,
+                 capacity: int = 3, base_score: float = 1.0, load: int = 0, available: bool = True,
+                 heartbeat: Optional[float] = None, weights: Optional[Dict[str, float]] = None) -> RegisteredAgent:
+        """Add an agent, replacing any previous registration under the same id"""
+        with self._lock:
+            if agent_id in self.agents:
+                self.unregister(agent_id)
+            entry = RegisteredAgent(
+                agent_id=agent_id,
+                capabilities=set(capabilities),
+                weights=dict(weights or {}),
+                specialization=specialization,
+                capacity=max(1, capacity),
+                load=load,
+                base_score=base_score,
+                available=available,
+                order=next(self._order)
+            )
+            if heartbeat is not None:
+                entry.last_heartbeat = heartbeat
+            self.agents[agent_id] = entry
+            for cap in entry.capabilities:
+                self.by_capability.setdefault(cap, {})[agent_id] = None
+            if specialization is not None:
+                self.by_specialization.setdefault(specialization, {})[agent_id] = None
+            self._push(entry)
+            return entry
+
+    def unregister(self, agent_id: str):
+        with self._lock:
+            entry = self.agents.pop(agent_id, None)
+            if entry is None:
+                return
+            for cap in entry.capabilities:
+                self._discard(self.by_capability, cap, agent_id)
+            if entry.specialization is not None:
+                self._discard(self.by_specialization, entry.specialization, agent_id)
+
+    def update(self, agent_id: str, load: Optional[int] = None, capacity: Optional[int] = None,
+               base_score: Optional[float] = None, available: Optional[bool] = None,
+               weights: Optional[Dict[str, float]] = None):
+        """Apply load/score/availability/weight changes; re-ranks only if something moved"""
+        with self._lock:
+            entry = self.agents.get(agent_id)
+            if entry is None:
+                return
+            previous = (entry.rank, entry.weights)
+            if load is not None:
+                entry.load = load
+            if capacity is not None:
+                entry.capacity = max(1, capacity)
+            if base_score is not None:
+                entry.base_score = base_score
+            if available is not None:
+                entry.available = available
+            if weights is not None:
+                entry.weights = dict(weights)
+            if (entry.rank, entry.weights) != previous:
+                self._push(entry)
+
+    def adjust_load(self, agent_id: str, delta: int):
+        with self._lock:
+            entry = self.agents.get(agent_id)
+            if entry is not None:
+                self.update(agent_id, load=max(0, entry.load + delta))
+
+    def heartbeat(self, agent_id: str, timestamp: Optional[float] = None):
+        with self._lock:
+            entry = self.agents.get(agent_id)
+            if entry is None:
+                return
+            entry.last_heartbeat = time.time() if timestamp is None else timestamp
+            if entry.expired:
+                entry.expired = False
+                self._push(entry)
+
+    def is_alive(self, agent_id: str, now: Optional[float] = None) -> bool:
+        entry = self.agents.get(agent_id)
+        if entry is None:
+            return False
+        if self.heartbeat_timeout is None:
+            return True
+        now = time.time() if now is None else now
+        return now - entry.last_heartbeat < self.heartbeat_timeout
+
+    def candidates(self, capabilities: Iterable[str] = (), specialization: Optional[str] = None,
+                   now: Optional[float] = None) -> List[str]:
+        """Ids of live agents with free capacity matching a capability or the specialization"""
+        with self._lock:
+            now = time.time() if now is None else now
+            matched: Dict[str, None] = {}
+            for cap in capabilities:
+                matched.update(self.by_capability.get(cap, {}))
+            if specialization is not None:
+                matched.update(self.by_specialization.get(specialization, {}))
+            eligible = [agent_id for agent_id in matched if self._eligible(self.agents[agent_id], now)]
+            self._flush_parked()
+            return eligible
+
+    def select(self, score: Callable[[str], Optional[float]], bound: float,
+               capabilities: Iterable[str] = (), specialization: Optional[str] = None,
+               now: Optional[float] = None) -> Optional[str]:
+        """Highest-scoring eligible agent among those matching the keys.
+
+        ``score(agent_id)`` returns the full task score, or None to skip the
+        agent. It must never exceed ``bound`` times the sum of the agent's
+        heap keys over the requested keys (a capability listed twice counts
+        twice).
+        """
+        best_id, best_score = None, float('-inf')
+        seen: Set[str] = set()
+
+        def consider(agent_id: str, entry: RegisteredAgent):
+            nonlocal best_id, best_score
+            seen.add(agent_id)
+            if not self._eligible(entry, now):
+                return
+            agent_score = score(agent_id)
+            if agent_score is not None and agent_score > best_score:
+                best_id, best_score = agent_id, agent_score
+
+        with self._lock:
+            now = time.time() if now is None else now
+            multiplicity: Dict[Tuple[str, str], int] = {}
+            for cap in capabilities:
+                key = ('capability', cap)
+                multiplicity[key] = multiplicity.get(key, 0) + 1
+            if specialization is not None:
+                multiplicity[('specialization', specialization)] = 1
+
+            # Agents matching several keys are scored directly
+            members = [self._index(key).get(key[1], {}).keys() for key in multiplicity]
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    for agent_id in first & second:
+                        if agent_id not in seen:
+                            consider(agent_id, self.agents[agent_id])
+
+            # One best-first walk over all requested heap arrays, merged in
+            # a single frontier keyed by heap key x multiplicity, whose top
+            # is then the threshold. Heaps are never popped during the walk,
+            # so nothing needs restoring afterwards
+            heaps = []
+            frontier = []
+            for key, count in multiplicity.items():
+                heap = self._heaps.get(key)
+                # Entries superseded by a rank drop sit above the live ones
+                while heap and self._is_stale(heap[0]):
+                    heapq.heappop(heap)
+                if heap:
+                    frontier.append((heap[0][0] * count, len(heaps), 0))
+                    heaps.append((heap, count))
+            heapq.heapify(frontier)
+
+            while frontier:
+                neg_key, walk, index = heapq.heappop(frontier)
+                if neg_key > 0 or (best_id is not None and -neg_key * bound <= best_score):
+                    break
+                heap, count = heaps[walk]
+                for child in (2 * index + 1, 2 * index + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child][0] * count, walk, child))
+
+                _key, _order, version, agent_id = heap[index]
+                entry = self.agents.get(agent_id)
+                if entry is None or entry.version != version or agent_id in seen:
+                    continue
+                consider(agent_id, entry)
+            self._flush_parked()
+            return best_id
+
+    def _eligible(self, entry: RegisteredAgent, now: float) -> bool:
+        if entry.expired or not entry.available or not entry.has_capacity:
+            return False
+        if self.heartbeat_timeout is not None and now - entry.last_heartbeat >= self.heartbeat_timeout:
+            # Parked below every live agent until the next heartbeat; the
+            # re-push waits until no heap is being walked
+            entry.expired = True
+            self._parked.append(entry)
+            return False
+        return True
+
+    def _flush_parked(self):
+        parked, self._parked = self._parked, []
+        for entry in parked:
+            self._push(entry)
+
+    def _keys(self, entry: RegisteredAgent) -> List[Tuple[str, str]]:
+        keys = [('capability', cap) for cap in entry.capabilities]
+        if entry.specialization is not None:
+            keys.append(('specialization', entry.specialization))
+        return keys
+
+    def _push(self, entry: RegisteredAgent):
+        entry.version = next(self._versions)
+        for key in self._keys(entry):
+            heap = self._heaps.setdefault(key, [])
+            heapq.heappush(heap, (-entry.heap_key(key), entry.order, entry.version, entry.agent_id))
+            if len(heap) > self._live_count(key) * 5 // 4 + 32:
+                self._compact(key)
+
+    def _index(self, key: Tuple[str, str]) -> Dict[str, Dict[str, None]]:
+        return self.by_capability if key[0] == 'capability' else self.by_specialization
+
+    def _live_count(self, key: Tuple[str, str]) -> int:
+        return len(self._index(key).get(key[1], ()))
+
+    def _is_stale(self, item: Tuple[float, int, int, str]) -> bool:
+        entry = self.agents.get(item[3])
+        return entry is None or entry.version != item[2]
+
+    def _compact(self, key: Tuple[str, str]):
+        """Drop superseded heap entries for one key"""
+        live = [item for item in self._heaps[key] if not self._is_stale(item)]
+        heapq.heapify(live)
+        self._heaps[key] = live
+
+    def _discard(self, index: Dict[str, Dict[str, None]], key: str, agent_id: str):
+        members = index.get(key)
+        if members is None:
+            return
+        members.pop(agent_id, None)
+        if not members:
+            del index[key]
+            self._heaps.pop(('capability' if index is self.by_capability else 'specialization', key), None)
@@ -15,6 +15,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from xmrt_coordination_core import AgentMessage, MessageType
 from enhanced_multi_agent_coordinator import EnhancedMultiAgentCoordinator
+from message_bus import MessagePriority
 
 load_dotenv()
 openai_key = os.getenv("VITE_OPEN_AI_API_KEY")
@@ -67,7 +68,8 @@ class ElizaAgent:
                 if message.type == MessageType.REQUEST:
                     response = await self._handle_request(message)
                     if response and self.coordinator:
-                        await self.coordinator.message_bus.post_message(response)
+                        # The requester is waiting: skip queued bulk traffic
+                        await self.coordinator.message_bus.post_message(response, MessagePriority.HIGH)
                         print(f"[ELIZA] Sent response to {message.sender}")
                 
                 self.message_queue.task_done()
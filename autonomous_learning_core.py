@@ -13,6 +13,7 @@ License: MIT
 import asyncio
 import json
 import logging
+import multiprocessing
 import pickle
 import time
 import sqlite3
@@ -26,19 +27,30 @@ import numpy as np
 from sklearn.neural_network import MLPRegressor, MLPClassifier
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import mean_squared_error, accuracy_score, f1_score
+from sklearn.model_selection import cross_val_score
+from sklearn.metrics import accuracy_score, f1_score
 from sklearn.cluster import KMeans, DBSCAN
 import networkx as nx
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 import threading
 import hashlib
 import base64
 
+from experience_index import ExperienceIndex
+from knowledge_graph import EDGE_INDEX_SQL, KnowledgeGraph, edge_row
+from learning_model import ModelRegistry, experience_features, fit_outcome_model
+from learning_store import EXPERIENCE_COLUMNS, LazyExperienceMap, LearningStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Startup modes for stored experiences:
+#   'lazy'  - load ids, actions, scores and timestamps; parse a row on first access
+#   'eager' - parse every row in the constructor
+LOAD_MODES = ('lazy', 'eager')
+
 class LearningMode(Enum):
     """Learning operation modes"""
     EXPLORATION = "exploration"
@@ -101,13 +113,6 @@ class LearningTask:
     progress: float = 0.0
     results: Optional[Dict[str, Any]] = None
 
-@dataclass
-class KnowledgeGraph:
-    """Graph representation of accumulated knowledge"""
-    nodes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
-    edges: List[Tuple[str, str, Dict[str, Any]]] = field(default_factory=list)
-    clusters: Dict[str, List[str]] = field(default_factory=dict)
-
 @dataclass
 class PerformanceMetrics:
     """System performance tracking"""
@@ -128,7 +133,12 @@ class AutonomousLearningCore:
                  memory_path: str = "/tmp/learning_memory.db",
                  github_manager=None,
                  analytics_engine=None,
-                 community_intelligence=None):
+                 community_intelligence=None,
+                 memory_capacity: int = 10000,
+                 load_mode: str = 'lazy',
+                 model_dir: Optional[str] = None):
+        if load_mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode: {load_mode}")
 
         # Core dependencies
         self.github_manager = github_manager
@@ -137,8 +147,11 @@ class AutonomousLearningCore:
 
         # Memory and persistence
         self.memory_path = memory_path
+        self.load_mode = load_mode
+        self.store = LearningStore(memory_path)
         self.knowledge_graph = KnowledgeGraph()
-        self.experiences: Dict[str, Experience] = {}
+        self.experiences = LazyExperienceMap(memory_path, self._experience_from_row)
+        self.experience_index = ExperienceIndex()
         self.patterns: Dict[str, Pattern] = {}
         self.learning_tasks: Dict[str, LearningTask] = {}
 
@@ -150,6 +163,13 @@ class AutonomousLearningCore:
             'anomaly_detector': DBSCAN(eps=0.5, min_samples=5)
         }
 
+        # The outcome predictor is trained incrementally in a worker process and
+        # shared with other workers through a versioned registry on disk
+        self.model_registry = ModelRegistry(model_dir or f"{memory_path}.models")
+        self.model_version = 0
+        self._untrained_ids: List[str] = []
+        self._training_pool: Optional[ProcessPoolExecutor] = None
+
         # Scalers and encoders
         self.scalers = {
             'experience': StandardScaler(),
@@ -165,7 +185,7 @@ class AutonomousLearningCore:
         self.learning_mode = LearningMode.ADAPTIVE
         self.learning_rate = 0.01
         self.exploration_rate = 0.1
-        self.memory_capacity = 10000
+        self.memory_capacity = memory_capacity
 
         # Performance tracking
         self.performance_history: List[PerformanceMetrics] = []
@@ -179,6 +199,11 @@ class AutonomousLearningCore:
         # Initialize systems
         self._initialize_memory_system()
         self._load_persistent_knowledge()
+        self.store.open()
+        self._load_shared_model()
+        if not self.model_version:
+            # No model anywhere yet: the first training run covers the loaded history
+            self._untrained_ids = list(self.experiences)
 
         logger.info("Autonomous Learning Core initialized")
 
@@ -207,7 +232,11 @@ class AutonomousLearningCore:
             # Store experience in memory
             with self.memory_lock:
                 self.experiences[experience_id] = experience
-                await self._persist_experience(experience)
+                self.experience_index.add(experience_id, action, context.keys(), success_score)
+                self._untrained_ids.append(experience_id)
+
+            # Queued for the store's writer thread; never waits on disk
+            await self._persist_experience(experience)
 
             # Extract patterns and update knowledge graph
             await self._extract_patterns_from_experience(experience)
@@ -416,11 +445,10 @@ class AutonomousLearningCore:
 
             cutoff_date = datetime.now() - timedelta(days=timeframe_days)
 
-            # Filter relevant experiences
+            # Filter relevant experiences (by timestamp first, which needs no hydration)
             relevant_experiences = [
-                exp for exp in self.experiences.values()
-                if exp.timestamp >= cutoff_date and 
-                (domain == "general" or domain in exp.context.get("domain", ""))
+                exp for exp in self.experiences.values(self.experiences.ids_since(cutoff_date.timestamp()))
+                if domain == "general" or domain in exp.context.get("domain", "")
             ]
 
             if not relevant_experiences:
@@ -512,6 +540,7 @@ class AutonomousLearningCore:
         """Initialize the persistent memory system"""
         try:
             conn = sqlite3.connect(self.memory_path)
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
 
             # Create tables for different knowledge types
@@ -525,10 +554,30 @@ class AutonomousLearningCore:
                     timestamp TEXT,
                     knowledge_type TEXT,
                     tags TEXT,
-                    parent_task_id TEXT
+                    parent_task_id TEXT,
+                    context_keys TEXT
                 )
             """)
 
+            # Databases created before context_keys: add it and backfill from the context JSON
+            columns = [row[1] for row in cursor.execute("PRAGMA table_info(experiences)")]
+            if 'context_keys' not in columns:
+                cursor.execute("ALTER TABLE experiences ADD COLUMN context_keys TEXT")
+                try:
+                    cursor.execute("""
+                        UPDATE experiences SET context_keys = (
+                            SELECT json_group_array(key) FROM (SELECT key FROM json_each(experiences.context) ORDER BY key)
+                        )
+                    """)
+                except sqlite3.Error as e:
+                    logger.warning(f"context_keys backfill skipped, keys will be parsed at load: {e}")
+
+            # Covering index: lazy startup reads only this, never the JSON columns
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_experiences_recent
+                ON experiences (timestamp, id, action, success_score, context_keys)
+            """)
+
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS patterns (
                     id TEXT PRIMARY KEY,
@@ -560,6 +609,13 @@ class AutonomousLearningCore:
                 )
             """)
 
+            # One row per edge; older databases with duplicate rows get the
+            # index when the loaded graph is written back
+            try:
+                cursor.execute(EDGE_INDEX_SQL)
+            except sqlite3.IntegrityError:
+                logger.info("knowledge_edges has duplicate rows; it will be rewritten at load")
+
             conn.commit()
             conn.close()
 
@@ -578,22 +634,18 @@ class AutonomousLearningCore:
             cursor = conn.cursor()
 
             # Load experiences
-            cursor.execute("SELECT * FROM experiences ORDER BY timestamp DESC LIMIT ?", (self.memory_capacity,))
-            for row in cursor.fetchall():
-                exp_id, context, action, outcome, success_score, timestamp, knowledge_type, tags, parent_task_id = row
-
-                experience = Experience(
-                    experience_id=exp_id,
-                    context=json.loads(context),
-                    action_taken=action,
-                    outcome=json.loads(outcome),
-                    success_score=success_score,
-                    timestamp=datetime.fromisoformat(timestamp),
-                    knowledge_type=KnowledgeType(knowledge_type),
-                    tags=json.loads(tags) if tags else [],
-                    parent_task_id=parent_task_id
+            if self.load_mode == 'eager':
+                cursor.execute(
+                    f"SELECT {', '.join(EXPERIENCE_COLUMNS)} FROM experiences ORDER BY timestamp DESC LIMIT ?",
+                    (self.memory_capacity,)
                 )
-                self.experiences[exp_id] = experience
+                for row in cursor.fetchall():
+                    experience = self._experience_from_row(row)
+                    self.experiences[experience.experience_id] = experience
+                    self.experience_index.add(experience.experience_id, experience.action_taken,
+                                              experience.context.keys(), experience.success_score)
+            else:
+                self._load_experience_index(cursor)
 
             # Load patterns
             cursor.execute("SELECT * FROM patterns")
@@ -613,40 +665,105 @@ class AutonomousLearningCore:
                 )
                 self.patterns[pat_id] = pattern
 
+            # Load the knowledge graph for the loaded experiences, strongest edges first
+            stale = self.knowledge_graph.load(conn, keep=self.experiences)
+            # Experiences stored before the graph was persisted have no node, so
+            # nothing new could link to them; build those from the compact arrays
+            backfilled = 0
+            for experience_id in self.experiences:
+                if experience_id not in self.knowledge_graph:
+                    action, success_score, timestamp = self.experiences.summary(experience_id)
+                    self.knowledge_graph.add_node(experience_id, {
+                        "type": "experience",
+                        "action": action,
+                        "success_score": success_score,
+                        "timestamp": datetime.fromtimestamp(timestamp).isoformat()
+                    })
+                    backfilled += 1
+            if stale or backfilled:
+                logger.info(f"Rewriting knowledge graph tables ({stale} stale rows, {backfilled} new nodes)")
+                self.knowledge_graph.save(conn)
+
             conn.close()
             logger.info(f"Loaded {len(self.experiences)} experiences and {len(self.patterns)} patterns from memory")
 
         except Exception as e:
             logger.error(f"Error loading persistent knowledge: {str(e)}")
 
+    def _load_experience_index(self, cursor: sqlite3.Cursor):
+        """Index-first load: compact per-experience fields, no JSON parsing beyond key lists"""
+        cursor.execute("""
+            SELECT id, action, success_score, timestamp, context_keys FROM experiences
+            ORDER BY timestamp DESC LIMIT ?
+        """, (self.memory_capacity,))
+        rows = cursor.fetchall()
+
+        # Rows written before context_keys existed fall back to their context
+        missing = [row[0] for row in rows if row[4] is None]
+        legacy_keys = {}
+        for start in range(0, len(missing), 500):
+            page = missing[start:start + 500]
+            cursor.execute(f"SELECT id, context FROM experiences WHERE id IN ({','.join('?' * len(page))})", page)
+            legacy_keys.update((exp_id, sorted(json.loads(context or '{}'))) for exp_id, context in cursor)
+
+        parsed_keys: Dict[str, frozenset] = {}
+        summaries = []
+        entries = []
+        for exp_id, action, success_score, timestamp, context_keys in rows:
+            if context_keys is None:
+                keys = frozenset(legacy_keys.get(exp_id, ()))
+            else:
+                # Key lists repeat heavily; parse each distinct one once
+                keys = parsed_keys.get(context_keys)
+                if keys is None:
+                    keys = parsed_keys[context_keys] = frozenset(json.loads(context_keys))
+            summaries.append((exp_id, action, success_score, datetime.fromisoformat(timestamp).timestamp()))
+            entries.append((exp_id, action, keys, success_score))
+        self.experience_index.add_many(entries)
+        self.experiences.load_index(summaries)
+
+    def _experience_from_row(self, row: Tuple[Any, ...]) -> Experience:
+        exp_id, context, action, outcome, success_score, timestamp, knowledge_type, tags, parent_task_id = row
+        return Experience(
+            experience_id=exp_id,
+            context=json.loads(context),
+            action_taken=action,
+            outcome=json.loads(outcome),
+            success_score=success_score,
+            timestamp=datetime.fromisoformat(timestamp),
+            knowledge_type=KnowledgeType(knowledge_type),
+            tags=json.loads(tags) if tags else [],
+            parent_task_id=parent_task_id
+        )
+
     async def _persist_experience(self, experience: Experience):
-        """Persist experience to database"""
+        """Queue experience for the database"""
         try:
-            conn = sqlite3.connect(self.memory_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO experiences 
-                (id, context, action, outcome, success_score, timestamp, knowledge_type, tags, parent_task_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            self.store.upsert('experiences', experience.experience_id, (
                 experience.experience_id,
-                json.dumps(experience.context),
+                json.dumps(experience.context, default=str),
                 experience.action_taken,
-                json.dumps(experience.outcome),
+                json.dumps(experience.outcome, default=str),
                 experience.success_score,
                 experience.timestamp.isoformat(),
                 experience.knowledge_type.value,
                 json.dumps(experience.tags),
-                experience.parent_task_id
+                experience.parent_task_id,
+                json.dumps(sorted(map(str, experience.context.keys())))
             ))
 
-            conn.commit()
-            conn.close()
-
         except Exception as e:
             logger.error(f"Error persisting experience: {str(e)}")
 
+    def _persist_pattern(self, pattern: Pattern):
+        """Queue pattern for the database"""
+        self.store.upsert('patterns', pattern.pattern_id, (
+            pattern.pattern_id, pattern.pattern_type, pattern.description,
+            json.dumps(pattern.conditions, default=str), json.dumps(pattern.predictions, default=str),
+            pattern.confidence, pattern.usage_count, pattern.success_rate,
+            pattern.last_updated.isoformat()
+        ))
+
     def _generate_id(self, prefix: str) -> str:
         """Generate unique ID with prefix"""
         timestamp = int(time.time() * 1000000)
@@ -675,6 +792,7 @@ class AutonomousLearningCore:
                      experience.success_score) / existing_pattern.usage_count
                 )
                 existing_pattern.last_updated = datetime.now()
+                self._persist_pattern(existing_pattern)
             else:
                 pattern_id = self._generate_id("pat")
                 new_pattern = Pattern(
@@ -688,6 +806,7 @@ class AutonomousLearningCore:
                     success_rate=experience.success_score
                 )
                 self.patterns[pattern_id] = new_pattern
+                self._persist_pattern(new_pattern)
         except Exception as e:
             logger.error(f"Error extracting patterns: {str(e)}")
 
@@ -695,22 +814,34 @@ class AutonomousLearningCore:
         """Update knowledge graph with new experience"""
         try:
             node_id = experience.experience_id
-            self.knowledge_graph.nodes[node_id] = {
+            node_data = {
                 "type": "experience",
                 "action": experience.action_taken,
                 "success_score": experience.success_score,
                 "timestamp": experience.timestamp.isoformat()
             }
-
-            # Connect to similar experiences
-            for existing_id, existing_exp in self.experiences.items():
-                if existing_id != node_id:
-                    similarity = self._calculate_experience_similarity(experience, existing_exp)
-                    if similarity > 0.7:
-                        self.knowledge_graph.edges.append((
-                            node_id, existing_id, 
-                            {"similarity": similarity, "type": "similar_experience"}
-                        ))
+            created_at = datetime.now().isoformat()
+            self.knowledge_graph.add_node(node_id, node_data, created_at)
+            self.store.upsert('knowledge_graph', node_id, (node_id, json.dumps(node_data), created_at))
+
+            # Connect to similar experiences: (key Jaccard + action match) / 2 > 0.7
+            # needs the same action and a Jaccard above 0.4, which the index answers
+            neighbours = self.experience_index.neighbours(
+                experience.action_taken, experience.context.keys(), 0.4
+            )
+            candidates = []
+            for existing_id, context_similarity in neighbours:
+                similarity = (context_similarity + 1.0) / 2
+                if existing_id != node_id and similarity > 0.7:
+                    candidates.append((existing_id, similarity))
+
+            # The graph keeps each node's strongest edges; persist what changed
+            added, evicted = self.knowledge_graph.add_edges(node_id, candidates)
+            for source, target, similarity in added:
+                row = edge_row(source, target, similarity, created_at)
+                self.store.upsert('knowledge_edges', row[:2], row)
+            for key in evicted:
+                self.store.delete('knowledge_edges', key)
         except Exception as e:
             logger.error(f"Error updating knowledge graph: {str(e)}")
 
@@ -738,62 +869,87 @@ class AutonomousLearningCore:
     async def _trigger_adaptive_learning(self):
         """Trigger adaptive learning process"""
         try:
-            with self.learning_lock:
-                logger.info("Triggering adaptive learning")
-                await self._retrain_models()
-                self.last_training_time = datetime.now()
+            logger.info("Triggering adaptive learning")
+            await self._retrain_models()
+            self.last_training_time = datetime.now()
         except Exception as e:
             logger.error(f"Error in adaptive learning: {str(e)}")
 
     async def _retrain_models(self):
-        """Retrain ML models with accumulated data"""
+        """Continue the shared outcome model on experiences it has not seen, off the event loop"""
+        if len(self.experiences) < 20:
+            return
+        # A run is already in flight; blocking here would stall the event loop
+        if not self.learning_lock.acquire(blocking=False):
+            return
         try:
-            if len(self.experiences) < 20:
+            # Another worker may have published a newer version since our last run
+            self._load_shared_model()
+            batch, self._untrained_ids = self._untrained_ids, []
+            features, targets = await self._prepare_training_data(batch)
+            if not targets:
                 return
 
-            X, y = await self._prepare_training_data()
-
-            if len(X) > 0:
-                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-                self.models['outcome_predictor'].fit(X_train, y_train)
-
-                predictions = self.models['outcome_predictor'].predict(X_test)
-                mse = mean_squared_error(y_test, predictions)
-                logger.info(f"Model retrained with MSE: {mse:.4f}")
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(
+                    self._get_training_pool(), fit_outcome_model,
+                    self.model_registry.directory, features, targets
+                )
+            except Exception:
+                self._untrained_ids[:0] = batch
+                raise
+
+            self._load_shared_model()
+            mse = f"{result['mse']:.4f}" if result['mse'] is not None else "n/a"
+            logger.info(f"Model v{result['version']} trained on {result['rows']} new experiences "
+                        f"in {result['seconds']}s with MSE: {mse}")
         except Exception as e:
             logger.error(f"Error retraining models: {str(e)}")
+        finally:
+            self.learning_lock.release()
 
-    async def _prepare_training_data(self) -> Tuple[np.ndarray, np.ndarray]:
-        """Prepare training data from experiences"""
+    async def _prepare_training_data(self, experience_ids: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], List[float]]:
+        """Feature dicts (hashed to a sparse matrix by the trainer) and targets"""
         try:
-            X = []
-            y = []
-
-            for experience in self.experiences.values():
-                features = [
-                    len(experience.context),
-                    hash(experience.action_taken) % 1000,
-                    experience.timestamp.hour,
-                    experience.timestamp.weekday()
-                ]
-                X.append(features)
-                y.append(experience.success_score)
-
-            return np.array(X), np.array(y)
+            features = []
+            targets = []
+
+            for experience in self.experiences.values(experience_ids):
+                features.append(experience_features(experience.context, experience.action_taken,
+                                                    experience.timestamp))
+                targets.append(experience.success_score)
+
+            return features, targets
         except Exception as e:
             logger.error(f"Error preparing training data: {str(e)}")
-            return np.array([]), np.array([])
+            return [], []
+
+    def _get_training_pool(self) -> ProcessPoolExecutor:
+        if self._training_pool is None:
+            # spawn: the parent has live threads (store writer, web server) that fork would copy mid-lock
+            self._training_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        return self._training_pool
+
+    def _load_shared_model(self):
+        """Adopt the registry's latest outcome model if it is newer than ours"""
+        try:
+            if self.model_registry.latest_version() <= self.model_version:
+                return
+            model, metadata, version = self.model_registry.load()
+            if model is not None:
+                self.models['outcome_predictor'] = model
+                self.model_version = version
+                logger.info(f"Loaded shared outcome model v{version} ({metadata.get('total_rows', 0)} experiences)")
+        except Exception as e:
+            logger.warning(f"Could not load shared outcome model: {str(e)}")
 
     async def _find_similar_experiences(self, context: Dict[str, Any], action: str) -> List[Experience]:
         """Find experiences similar to given context and action"""
-        similar = []
         try:
-            for experience in self.experiences.values():
-                if experience.action_taken == action:
-                    similarity = self._calculate_context_similarity(context, experience.context)
-                    if similarity > 0.5:
-                        similar.append(experience)
-            return sorted(similar, key=lambda x: x.success_score, reverse=True)[:10]
+            # Same action, key Jaccard > 0.5, best success scores first
+            best = self.experience_index.best_matches(action, context.keys(), 0.5, limit=10)
+            return [self.experiences[experience_id] for experience_id in best]
         except Exception as e:
             return []
 
@@ -965,37 +1121,22 @@ class AutonomousLearningCore:
     async def _optimize_memory_usage(self):
         """Optimize memory usage by removing old or low-value experiences"""
         if len(self.experiences) > self.memory_capacity:
-            sorted_experiences = sorted(
-                self.experiences.values(),
-                key=lambda x: (x.success_score, x.timestamp),
-                reverse=True
-            )
-
-            keep_experiences = sorted_experiences[:self.memory_capacity]
-            new_experiences = {exp.experience_id: exp for exp in keep_experiences}
-            self.experiences = new_experiences
+            # Ranked from the compact score/timestamp arrays, without hydrating anything
+            for experience_id in self.experiences.ranked_ids()[self.memory_capacity:]:
+                del self.experiences[experience_id]
+                self.experience_index.remove(experience_id)
+                for key in self.knowledge_graph.remove_node(experience_id):
+                    self.store.delete('knowledge_edges', key)
+                self.store.delete('knowledge_graph', experience_id)
+            self.experiences.compact()
 
     async def _persist_critical_knowledge(self):
-        """Persist critical knowledge to storage"""
+        """Wait (off the event loop) until all queued knowledge is on disk"""
         try:
-            conn = sqlite3.connect(self.memory_path)
-            cursor = conn.cursor()
-
-            for pattern in self.patterns.values():
-                if pattern.confidence > 0.7 or pattern.usage_count > 10:
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO patterns
-                        (id, pattern_type, description, conditions, predictions, confidence, usage_count, success_rate, last_updated)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        pattern.pattern_id, pattern.pattern_type, pattern.description,
-                        json.dumps(pattern.conditions), json.dumps(pattern.predictions),
-                        pattern.confidence, pattern.usage_count, pattern.success_rate,
-                        pattern.last_updated.isoformat()
-                    ))
-
-            conn.commit()
-            conn.close()
+            # Experiences, patterns and graph changes are queued as they happen
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, self.store.flush, 60.0):
+                logger.warning(f"Learning store still has {self.store.pending_count()} writes pending")
         except Exception as e:
             logger.error(f"Error persisting critical knowledge: {str(e)}")
 
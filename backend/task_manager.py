@@ -4,18 +4,42 @@ XMRT Ecosystem Automated Task Management and Agent Coordination System
 Handles autonomous task assignment, execution, and coordination between AI agents
 '''
 
+import heapq
+import itertools
 import json
 import logging
+import os
+import sys
 import threading
 import time
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
 from enum import Enum
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Optional, Any
 import uuid
 
+try:
+    from agent_registry import AgentRegistry
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from agent_registry import AgentRegistry
+
 logger = logging.getLogger(__name__)
 
+# Simple keyword matching - could be enhanced with NLP
+CAPABILITY_KEYWORDS = {
+    "analysis": ["analysis", "analyze", "review"],
+    "monitoring": ["monitor", "watch", "track"],
+    "optimization": ["optimize", "improve", "enhance"],
+    "coordination": ["coordinate", "manage", "organize"],
+    "security": ["secure", "protect", "audit"],
+    "communication": ["communicate", "notify", "announce"]
+}
+
+STUCK_TASK_TIMEOUT = 3600  # seconds an agent may stay inactive on an in-progress task
+METRICS_INTERVAL = 30  # seconds between full performance metric snapshots
+
 class TaskPriority(Enum):
     CRITICAL = "critical"
     HIGH = "high"
@@ -81,13 +105,38 @@ class TaskManager:
     def __init__(self):
         self.tasks: Dict[str, Task] = {}
         self.agents: Dict[str, Agent] = {}
-        self.task_queue: Dict[TaskPriority, List[str]] = {
-            priority: [] for priority in TaskPriority
+        self.agent_registry = AgentRegistry()  # Specialization index + load heaps
+        self._required_capabilities: Dict[str, List[str]] = {}  # per-task extraction cache
+        # Insertion-ordered dicts used as FIFO sets: O(1) removal on assignment
+        self.task_queue: Dict[TaskPriority, Dict[str, None]] = {
+            priority: {} for priority in TaskPriority
         }
         self.running = False
         self.coordination_rules = []
         self.performance_metrics = {}
         
+        # Event-driven processing: task creation, completion, reassignment and
+        # new agents set _work_pending and wake the processor thread
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._work_pending = False
+        self._dependents: Dict[str, List[str]] = {}
+        self._enqueued_at: Dict[str, float] = {}
+        
+        # Stuck-task detection: (deadline, seq, task_id, agent_id) min-heap
+        self.stuck_task_timeout = STUCK_TASK_TIMEOUT
+        self.metrics_interval = METRICS_INTERVAL
+        self._deadlines: List[tuple] = []
+        self._deadline_seq = itertools.count()
+        
+        self.processor_metrics = {
+            'wakeups': 0,
+            'assignments': 0,
+            'stuck_reassignments': 0
+        }
+        self._assignment_times: deque = deque(maxlen=10000)
+        self._queue_waits: deque = deque(maxlen=1000)
+        
         # Initialize default agents
         self._initialize_agents()
         self._load_coordination_rules()
@@ -138,9 +187,46 @@ class TaskManager:
         ]
         
         for agent in default_agents:
-            self.agents[agent.id] = agent
+            self.register_agent(agent)
             logger.info(f"Initialized agent: {agent.name}")
     
+    def register_agent(self, agent: Agent):
+        '''Add an agent and index it for assignment'''
+        with self._lock:
+            self.agents[agent.id] = agent
+            self.agent_registry.register(
+                agent.id,
+                agent.capabilities,
+                specialization=agent.specialization.value,
+                capacity=agent.max_concurrent_tasks,
+                base_score=agent.performance_score,
+                load=len(agent.current_tasks),
+                available=agent.availability
+            )
+            self._signal()
+    
+    def _signal(self):
+        '''Wake the task processor: there may be assignable work'''
+        with self._wakeup:
+            self._work_pending = True
+            self._wakeup.notify()
+    
+    def _enqueue(self, task: Task):
+        self.task_queue[task.priority][task.id] = None
+        self._enqueued_at[task.id] = time.time()
+        self._signal()
+    
+    def _sync_agent(self, agent: Agent):
+        '''Push an agent's workload and performance into the registry'''
+        self.agent_registry.update(
+            agent.id,
+            load=len(agent.current_tasks),
+            capacity=agent.max_concurrent_tasks,
+            base_score=agent.performance_score,
+            available=agent.availability
+        )
+        self.agent_registry.heartbeat(agent.id)
+    
     def _load_coordination_rules(self):
         '''Load agent coordination rules'''
         self.coordination_rules = [
@@ -182,14 +268,17 @@ class TaskManager:
             estimated_duration=estimated_duration
         )
         
-        self.tasks[task_id] = task
-        self.task_queue[priority].append(task_id)
-        
-        logger.info(f"Created task: {title} (ID: {task_id})")
-        
-        # Trigger immediate assignment for critical tasks
-        if priority == TaskPriority.CRITICAL:
-            self._assign_task(task_id)
+        with self._lock:
+            self.tasks[task_id] = task
+            for dep_id in task.dependencies:
+                self._dependents.setdefault(dep_id, []).append(task_id)
+            self._enqueue(task)
+            
+            logger.info(f"Created task: {title} (ID: {task_id})")
+            
+            # Trigger immediate assignment for critical tasks
+            if priority == TaskPriority.CRITICAL:
+                self._assign_task(task_id)
         
         return task_id
     
@@ -204,34 +293,30 @@ class TaskManager:
             logger.info(f"Task {task_id} waiting for dependencies")
             return False
         
-        # Find suitable agents
-        suitable_agents = self._find_suitable_agents(task)
+        # Select best agent based on performance and availability
+        selected_agent = self._select_best_agent(task)
         
-        if not suitable_agents:
+        if not selected_agent:
             logger.warning(f"No suitable agents found for task {task_id}")
             return False
         
-        # Select best agent based on performance and availability
-        selected_agent = self._select_best_agent(suitable_agents, task)
+        # Assign task
+        task.assigned_agent = selected_agent.id
+        task.status = TaskStatus.ASSIGNED
+        selected_agent.current_tasks.append(task_id)
+        selected_agent.last_active = datetime.now()
+        self._sync_agent(selected_agent)
         
-        if selected_agent:
-            # Assign task
-            task.assigned_agent = selected_agent.id
-            task.status = TaskStatus.ASSIGNED
-            selected_agent.current_tasks.append(task_id)
-            selected_agent.last_active = datetime.now()
-            
-            # Remove from queue
-            self.task_queue[task.priority].remove(task_id)
-            
-            logger.info(f"Assigned task {task_id} to agent {selected_agent.name}")
-            
-            # Apply coordination rules
-            self._apply_coordination_rules(task)
-            
-            return True
+        # Remove from queue
+        self.task_queue[task.priority].pop(task_id, None)
+        self._record_assignment(task_id)
+        
+        logger.info(f"Assigned task {task_id} to agent {selected_agent.name}")
+        
+        # Apply coordination rules
+        self._apply_coordination_rules(task)
         
-        return False
+        return True
     
     def _check_dependencies(self, task: Task) -> bool:
         '''Check if all task dependencies are completed'''
@@ -243,25 +328,18 @@ class TaskManager:
     
     def _find_suitable_agents(self, task: Task) -> List[Agent]:
         '''Find agents suitable for the task'''
-        suitable_agents = []
-        
-        for agent in self.agents.values():
-            if (agent.specialization == task.specialization and
-                agent.availability and
-                len(agent.current_tasks) < agent.max_concurrent_tasks):
-                suitable_agents.append(agent)
-        
-        return suitable_agents
+        return [
+            self.agents[agent_id]
+            for agent_id in self.agent_registry.candidates(specialization=task.specialization.value)
+        ]
     
-    def _select_best_agent(self, agents: List[Agent], task: Task) -> Optional[Agent]:
+    def _select_best_agent(self, task: Task) -> Optional[Agent]:
         '''Select the best agent for the task based on performance and workload'''
-        if not agents:
-            return None
+        required_capabilities = set(self._extract_required_capabilities(task))
         
         # Score agents based on performance, workload, and specialization match
-        scored_agents = []
-        
-        for agent in agents:
+        def score(agent_id: str) -> float:
+            agent = self.agents[agent_id]
             score = agent.performance_score
             
             # Prefer agents with lower current workload
@@ -269,36 +347,34 @@ class TaskManager:
             score *= workload_factor
             
             # Bonus for exact capability match
-            required_capabilities = self._extract_required_capabilities(task)
-            capability_match = len(set(required_capabilities) & set(agent.capabilities))
+            capability_match = len(required_capabilities.intersection(agent.capabilities))
             if capability_match > 0:
                 score *= (1.0 + capability_match * 0.1)
             
-            scored_agents.append((score, agent))
-        
-        # Return agent with highest score
-        scored_agents.sort(key=lambda x: x[0], reverse=True)
-        return scored_agents[0][1]
+            return score
+        
+        # Agents of the task's specialization are visited best rank
+        # (performance x workload) first until none can beat the leader
+        agent_id = self.agent_registry.select(
+            score,
+            bound=1.0 + len(required_capabilities) * 0.1,
+            specialization=task.specialization.value
+        )
+        return self.agents[agent_id] if agent_id else None
     
     def _extract_required_capabilities(self, task: Task) -> List[str]:
-        '''Extract required capabilities from task description'''
-        # Simple keyword matching - could be enhanced with NLP
-        capability_keywords = {
-            "analysis": ["analysis", "analyze", "review"],
-            "monitoring": ["monitor", "watch", "track"],
-            "optimization": ["optimize", "improve", "enhance"],
-            "coordination": ["coordinate", "manage", "organize"],
-            "security": ["secure", "protect", "audit"],
-            "communication": ["communicate", "notify", "announce"]
-        }
+        '''Extract required capabilities from task description (cached per task)'''
+        cached = self._required_capabilities.get(task.id)
+        if cached is not None:
+            return cached
         
-        required_capabilities = []
         description_lower = task.description.lower()
+        required_capabilities = [
+            capability for capability, keywords in CAPABILITY_KEYWORDS.items()
+            if any(keyword in description_lower for keyword in keywords)
+        ]
         
-        for capability, keywords in capability_keywords.items():
-            if any(keyword in description_lower for keyword in keywords):
-                required_capabilities.append(capability)
-        
+        self._required_capabilities[task.id] = required_capabilities
         return required_capabilities
     
     def _apply_coordination_rules(self, task: Task):
@@ -323,44 +399,54 @@ class TaskManager:
         if not task:
             return False
         
-        task.progress = min(100, max(0, progress))
-        
-        if result:
-            task.result = result
-        
-        if progress >= 100:
-            self.complete_task(task_id)
-        elif task.status == TaskStatus.ASSIGNED:
-            task.status = TaskStatus.IN_PROGRESS
+        with self._lock:
+            task.progress = min(100, max(0, progress))
+            
+            if result:
+                task.result = result
+            
+            if progress >= 100:
+                self.complete_task(task_id)
+            elif task.status == TaskStatus.ASSIGNED:
+                task.status = TaskStatus.IN_PROGRESS
+                self._watch_progress(task)
         
         logger.info(f"Updated task {task_id} progress to {progress}%")
         return True
     
     def complete_task(self, task_id: str, result: Optional[Dict[str, Any]] = None):
         '''Mark task as completed'''
-        task = self.tasks.get(task_id)
-        if not task:
-            return False
-        
-        task.status = TaskStatus.COMPLETED
-        task.progress = 100
-        
-        if result:
-            task.result = result
-        
-        # Remove from agent's current tasks
-        if task.assigned_agent:
-            agent = self.agents.get(task.assigned_agent)
-            if agent and task_id in agent.current_tasks:
-                agent.current_tasks.remove(task_id)
-                
-                # Update agent performance
-                self._update_agent_performance(agent, task)
-        
-        logger.info(f"Completed task: {task.title}")
-        
-        # Check for dependent tasks
-        self._check_dependent_tasks(task_id)
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if not task:
+                return False
+            
+            task.status = TaskStatus.COMPLETED
+            task.progress = 100
+            
+            if result:
+                task.result = result
+            
+            self.task_queue[task.priority].pop(task_id, None)
+            self._enqueued_at.pop(task_id, None)
+            
+            # Remove from agent's current tasks
+            if task.assigned_agent:
+                agent = self.agents.get(task.assigned_agent)
+                if agent and task_id in agent.current_tasks:
+                    agent.current_tasks.remove(task_id)
+                    
+                    # Update agent performance
+                    self._update_agent_performance(agent, task)
+                    self._sync_agent(agent)
+                    self._signal()  # freed capacity
+            
+            self._required_capabilities.pop(task_id, None)
+            
+            logger.info(f"Completed task: {task.title}")
+            
+            # Check for dependent tasks
+            self._check_dependent_tasks(task_id)
         
         return True
     
@@ -384,9 +470,9 @@ class TaskManager:
     
     def _check_dependent_tasks(self, completed_task_id: str):
         '''Check and potentially assign tasks that were waiting for this one'''
-        for task in self.tasks.values():
-            if (completed_task_id in task.dependencies and 
-                task.status == TaskStatus.PENDING and
+        for dependent_id in self._dependents.get(completed_task_id, ()):
+            task = self.tasks.get(dependent_id)
+            if (task and task.status == TaskStatus.PENDING and
                 self._check_dependencies(task)):
                 self._assign_task(task.id)
     
@@ -399,72 +485,153 @@ class TaskManager:
         threading.Thread(target=self._task_processor_loop, daemon=True).start()
         logger.info("Started automated task processor")
     
+    def stop_task_processor(self):
+        '''Stop the task processor thread'''
+        self.running = False
+        self._signal()
+    
     def _task_processor_loop(self):
-        '''Main task processing loop'''
+        '''Main task processing loop: sleeps until signalled or the next deadline'''
+        next_metrics_update = 0.0
         while self.running:
             try:
-                # Process tasks by priority
-                for priority in [TaskPriority.CRITICAL, TaskPriority.HIGH, 
-                               TaskPriority.MEDIUM, TaskPriority.LOW]:
-                    queue = self.task_queue[priority]
+                with self._wakeup:
+                    now = time.time()
+                    wake_at = next_metrics_update
+                    if self._deadlines:
+                        wake_at = min(wake_at, self._deadlines[0][0])
+                    if not self._work_pending and wake_at > now:
+                        self._wakeup.wait(wake_at - now)
+                    self._work_pending = False
+                    if not self.running:
+                        break
+                    self.processor_metrics['wakeups'] += 1
                     
-                    # Try to assign pending tasks
-                    for task_id in queue.copy():
-                        if self._assign_task(task_id):
-                            break  # Assigned one task, move to next priority
-                
-                # Check for stuck or overdue tasks
-                self._check_stuck_tasks()
-                
-                # Update performance metrics
-                self._update_performance_metrics()
-                
-                time.sleep(30)  # Check every 30 seconds
+                    # Assign everything that can run right now
+                    self._drain_queue()
+                    
+                    # Check for stuck or overdue tasks
+                    self._check_stuck_tasks()
+                    
+                    # Update performance metrics
+                    if time.time() >= next_metrics_update:
+                        self._update_performance_metrics()
+                        next_metrics_update = time.time() + self.metrics_interval
                 
             except Exception as e:
                 logger.error(f"Error in task processor loop: {e}")
                 time.sleep(60)
     
+    def _drain_queue(self) -> int:
+        '''Assign every pending task that has a free agent, highest priority first'''
+        assigned = 0
+        saturated = set()  # specializations with no free agent left in this pass
+        for priority in [TaskPriority.CRITICAL, TaskPriority.HIGH,
+                        TaskPriority.MEDIUM, TaskPriority.LOW]:
+            queue = self.task_queue[priority]
+            for task_id in list(queue):
+                task = self.tasks.get(task_id)
+                if not task or task.specialization in saturated:
+                    continue
+                if task.status != TaskStatus.PENDING:
+                    queue.pop(task_id, None)
+                    continue
+                if not self._check_dependencies(task):
+                    continue  # assigned from _check_dependent_tasks when unblocked
+                if self._assign_task(task_id):
+                    assigned += 1
+                else:
+                    saturated.add(task.specialization)
+        return assigned
+    
+    def _record_assignment(self, task_id: str):
+        now = time.time()
+        self.processor_metrics['assignments'] += 1
+        self._assignment_times.append(now)
+        enqueued_at = self._enqueued_at.pop(task_id, None)
+        if enqueued_at is not None:
+            self._queue_waits.append(now - enqueued_at)
+    
+    def _watch_progress(self, task: Task):
+        '''Schedule a stuck check for an in-progress task'''
+        agent = self.agents.get(task.assigned_agent)
+        if agent:
+            deadline = agent.last_active.timestamp() + self.stuck_task_timeout
+            seq = next(self._deadline_seq)
+            heapq.heappush(self._deadlines, (deadline, seq, task.id, agent.id))
+            if self._deadlines[0][1] == seq:
+                self._signal()  # earlier than the processor's current wake-up time
+    
     def _check_stuck_tasks(self):
-        '''Check for tasks that might be stuck'''
-        current_time = datetime.now()
-        
-        for task in self.tasks.values():
-            if task.status == TaskStatus.IN_PROGRESS:
-                # Check if task has been in progress too long
-                if task.assigned_agent:
-                    agent = self.agents.get(task.assigned_agent)
-                    if agent:
-                        time_since_active = current_time - agent.last_active
-                        
-                        # If agent hasn't been active for 1 hour, reassign task
-                        if time_since_active > timedelta(hours=1):
-                            logger.warning(f"Reassigning stuck task {task.id} from inactive agent {agent.name}")
-                            self._reassign_task(task.id)
+        '''Check for tasks that might be stuck (only those whose deadline passed)'''
+        now = time.time()
+        
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _deadline, _seq, task_id, agent_id = heapq.heappop(self._deadlines)
+            task = self.tasks.get(task_id)
+            if not task or task.status != TaskStatus.IN_PROGRESS or task.assigned_agent != agent_id:
+                continue
+            agent = self.agents.get(agent_id)
+            if not agent:
+                continue
+            
+            # The agent may have picked up other work since; push the deadline out
+            deadline = agent.last_active.timestamp() + self.stuck_task_timeout
+            if deadline > now:
+                heapq.heappush(self._deadlines, (deadline, next(self._deadline_seq), task_id, agent_id))
+                continue
+            
+            # Agent hasn't been active for the timeout, reassign task
+            logger.warning(f"Reassigning stuck task {task.id} from inactive agent {agent.name}")
+            self._reassign_task(task.id)
+            self.processor_metrics['stuck_reassignments'] += 1
     
     def _reassign_task(self, task_id: str):
         '''Reassign a task to a different agent'''
-        task = self.tasks.get(task_id)
-        if not task:
-            return False
-        
-        # Remove from current agent
-        if task.assigned_agent:
-            agent = self.agents.get(task.assigned_agent)
-            if agent and task_id in agent.current_tasks:
-                agent.current_tasks.remove(task_id)
-        
-        # Reset task status
-        task.assigned_agent = None
-        task.status = TaskStatus.PENDING
-        task.progress = 0
-        
-        # Add back to queue
-        self.task_queue[task.priority].append(task_id)
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if not task:
+                return False
+            
+            # Remove from current agent
+            if task.assigned_agent:
+                agent = self.agents.get(task.assigned_agent)
+                if agent and task_id in agent.current_tasks:
+                    agent.current_tasks.remove(task_id)
+                    self.agent_registry.update(agent.id, load=len(agent.current_tasks))
+            
+            # Reset task status
+            task.assigned_agent = None
+            task.status = TaskStatus.PENDING
+            task.progress = 0
+            
+            # Add back to queue
+            self._enqueue(task)
         
         logger.info(f"Reset task {task_id} for reassignment")
         return True
     
+    def get_processor_metrics(self) -> Dict[str, Any]:
+        '''Assignment throughput and queue-wait latency'''
+        with self._lock:
+            now = time.time()
+            waits = sorted(self._queue_waits)
+            
+            def wait_percentile(pct: float) -> float:
+                if not waits:
+                    return 0.0
+                return waits[min(len(waits) - 1, int(round(pct / 100.0 * (len(waits) - 1))))]
+            
+            return {
+                **self.processor_metrics,
+                'assignments_last_minute': sum(1 for t in self._assignment_times if now - t <= 60),
+                'queued_tasks': sum(len(queue) for queue in self.task_queue.values()),
+                'queue_wait_p50_seconds': wait_percentile(50),
+                'queue_wait_p95_seconds': wait_percentile(95),
+                'queue_wait_max_seconds': waits[-1] if waits else 0.0,
+                'watched_deadlines': len(self._deadlines)
+            }
+    
     def _update_performance_metrics(self):
         '''Update system performance metrics'''
         total_tasks = len(self.tasks)
@@ -482,6 +649,7 @@ class TaskManager:
                 agent_id: len(agent.current_tasks) / agent.max_concurrent_tasks
                 for agent_id, agent in self.agents.items()
             },
+            'processor': self.get_processor_metrics(),
             'last_updated': datetime.now().isoformat()
         }
     
@@ -509,6 +677,7 @@ class TaskManager:
                 priority.value: len(queue) for priority, queue in self.task_queue.items()
             },
             'performance_metrics': self.performance_metrics,
+            'processor_metrics': self.get_processor_metrics(),
             'running': self.running
         }
 
@@ -14,6 +14,8 @@ from typing import Dict, List, Optional
 import openai
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
+from llm_cache import get_llm_cache, request_bypasses_cache
+
 # Agent personalities and contexts
 AGENT_PERSONALITIES = {
     'dao_governor': {
@@ -96,6 +98,7 @@ class EnhancedChatSystem:
         self.agent_states: Dict[str, Dict] = {}
         self.discussion_threads: List = []
         self.openai_client = None
+        self.response_cache = get_llm_cache()
         
         # Initialize OpenAI client if API key is available
         if os.getenv('OPENAI_API_KEY'):
@@ -148,8 +151,9 @@ class EnhancedChatSystem:
         
         return True
     
-    def generate_agent_response(self, agent_id: str, room_id: str, context: List[str], user_message: str = None) -> str:
-        """Generate a response from an AI agent using OpenAI API"""
+    def generate_agent_response(self, agent_id: str, room_id: str, context: List[str], user_message: str = None,
+                                bypass_cache: bool = False) -> str:
+        """Generate a response from an AI agent using OpenAI API (served from the LLM cache when possible)"""
         if not self.openai_client:
             # Fallback to predefined responses if OpenAI is not available
             return self.get_fallback_response(agent_id, room_id)
@@ -195,17 +199,24 @@ Recent conversation:
             else:
                 user_prompt = "Please contribute to the ongoing discussion or start a new relevant topic."
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
-            )
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
             
-            return response.choices[0].message.content.strip()
+            def call_openai() -> str:
+                response = self.openai_client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages,
+                    max_tokens=150,
+                    temperature=0.7
+                )
+                return response.choices[0].message.content.strip()
+            
+            return self.response_cache.get_or_call(
+                call_openai, "gpt-3.5-turbo", messages, temperature=0.7,
+                bypass=bypass_cache or request_bypasses_cache(), max_tokens=150
+            )
             
         except Exception as e:
             print(f"Error generating response for {agent_id}: {e}")
@@ -252,6 +263,9 @@ Recent conversation:
         if not initiating_agent:
             initiating_agent = random.choice(room_agents)
         
+        # Background threads have no request context to read the bypass header from
+        bypass_cache = request_bypasses_cache()
+        
         # Add initial message
         initial_message = f"Let's discuss {topic}. I'd like to hear everyone's perspective on this."
         self.add_message(room_id, initiating_agent, initial_message)
@@ -272,7 +286,7 @@ Recent conversation:
                     time.sleep(random.randint(2, 5))
                     
                     # Generate and send response
-                    response = self.generate_agent_response(agent_id, room_id, [topic])
+                    response = self.generate_agent_response(agent_id, room_id, [topic], bypass_cache=bypass_cache)
                     self.add_message(room_id, agent_id, response)
                     
                     # Stop typing indicator
@@ -291,6 +305,8 @@ Recent conversation:
     
     def handle_user_message(self, room_id: str, user_id: str, message: str):
         """Handle a message from a user and potentially trigger agent responses"""
+        bypass_cache = request_bypasses_cache()
+        
         # Add user message
         self.add_message(room_id, f"User_{user_id}", message)
         
@@ -324,7 +340,7 @@ Recent conversation:
                 time.sleep(random.randint(2, 4))
                 
                 # Generate response
-                response = self.generate_agent_response(agent_id, room_id, [], message)
+                response = self.generate_agent_response(agent_id, room_id, [], message, bypass_cache=bypass_cache)
                 self.add_message(room_id, agent_id, response)
                 
                 # Stop typing indicator
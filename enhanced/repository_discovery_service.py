@@ -5,6 +5,8 @@ Discovers and analyzes repositories in the XMRT ecosystem for learning opportuni
 
 import asyncio
 import logging
+import os
+import sys
 import aiohttp
 import time
 from datetime import datetime, timedelta
@@ -13,6 +15,12 @@ from dataclasses import dataclass
 import json
 import re
 
+try:
+    from github_http import cache_key, get_response_cache, validators
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from github_http import cache_key, get_response_cache, validators
+
 @dataclass
 class RepositoryInfo:
     """Information about a discovered repository"""
@@ -52,6 +60,13 @@ class RepositoryDiscoveryService:
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "XMRT-Enhanced-Eliza-Agent"
         }
+        self.github_token = os.getenv("GITHUB_TOKEN")
+        if self.github_token:
+            self.headers["Authorization"] = f"Bearer {self.github_token}"
+
+        # ETag cache shared with the other GitHub readers; 304s are free
+        self.http_cache = get_response_cache()
+        self.http_stats = {'requests': 0, 'not_modified': 0}
 
         # Repository classification patterns
         self.classification_patterns = {
@@ -151,6 +166,21 @@ class RepositoryDiscoveryService:
             self.logger.error(f"Repository discovery failed: {e}")
             return []
 
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None):
+        """Conditional GET; returns (status, data) with 304s answered from the cache"""
+        key = cache_key(self.github_token, url, params)
+        cached = self.http_cache.lookup(key)
+        async with self.session.get(url, params=params, headers=validators(cached)) as response:
+            self.http_stats['requests'] += 1
+            if response.status == 304 and cached is not None:
+                self.http_stats['not_modified'] += 1
+                return 200, json.loads(cached[2])
+            if response.status != 200:
+                return response.status, None
+            body = await response.text()
+            self.http_cache.store(key, response.headers, body)
+            return 200, json.loads(body)
+
     async def _search_repositories(self, query: str) -> List[Dict[str, Any]]:
         """Search GitHub repositories by query"""
         try:
@@ -162,18 +192,17 @@ class RepositoryDiscoveryService:
                 "per_page": 100
             }
 
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('items', [])
-                elif response.status == 403:
-                    # Rate limited - wait and retry
-                    self.logger.warning("GitHub API rate limited, waiting...")
-                    await asyncio.sleep(60)
-                    return []
-                else:
-                    self.logger.warning(f"GitHub search failed: {response.status}")
-                    return []
+            status, data = await self._get_json(url, params)
+            if status == 200:
+                return data.get('items', [])
+            elif status == 403:
+                # Rate limited - wait and retry
+                self.logger.warning("GitHub API rate limited, waiting...")
+                await asyncio.sleep(60)
+                return []
+            else:
+                self.logger.warning(f"GitHub search failed: {status}")
+                return []
 
         except Exception as e:
             self.logger.error(f"Repository search failed for query '{query}': {e}")
@@ -288,15 +317,14 @@ class RepositoryDiscoveryService:
         try:
             url = f"{self.github_api_base}/repos/{full_name}/readme"
 
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    # README content is base64 encoded
-                    import base64
-                    content = base64.b64decode(data.get('content', '')).decode('utf-8')
-                    return content
-                else:
-                    return ""
+            status, data = await self._get_json(url)
+            if status == 200:
+                # README content is base64 encoded
+                import base64
+                content = base64.b64decode(data.get('content', '')).decode('utf-8')
+                return content
+            else:
+                return ""
 
         except Exception as e:
             self.logger.debug(f"Failed to fetch README for {full_name}: {e}")
@@ -414,20 +442,19 @@ class RepositoryDiscoveryService:
     async def _calculate_commit_frequency(self, full_name: str) -> float:
         """Calculate recent commit frequency (commits per week)"""
         try:
-            # Get commits from last 4 weeks
-            since_date = (datetime.utcnow() - timedelta(weeks=4)).isoformat()
+            # Get commits from last 4 weeks (day granularity keeps the URL, and its ETag, stable)
+            since_date = (datetime.utcnow() - timedelta(weeks=4)).strftime('%Y-%m-%dT00:00:00Z')
             url = f"{self.github_api_base}/repos/{full_name}/commits"
             params = {
                 "since": since_date,
                 "per_page": 100
             }
 
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    commits = await response.json()
-                    return len(commits) / 4.0  # commits per week
-                else:
-                    return 0.0
+            status, commits = await self._get_json(url, params)
+            if status == 200:
+                return len(commits) / 4.0  # commits per week
+            else:
+                return 0.0
 
         except Exception as e:
             self.logger.debug(f"Failed to calculate commit frequency for {full_name}: {e}")
@@ -15,6 +15,8 @@ from typing import Dict, List, Optional, Any
 import openai
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
+from llm_cache import get_llm_cache, request_bypasses_cache
+
 # Agent personalities and contexts with MCP capabilities
 AGENT_PERSONALITIES = {
     'dao_governor': {
@@ -109,6 +111,7 @@ class EnhancedChatSystemWithMCP:
         self.agent_states: Dict[str, Dict] = {}
         self.discussion_threads: List = []
         self.openai_client = None
+        self.response_cache = get_llm_cache()
         
         # Initialize OpenAI client if API key is available
         if os.getenv('OPENAI_API_KEY'):
@@ -259,7 +262,8 @@ class EnhancedChatSystemWithMCP:
         
         return parameters
     
-    def generate_agent_response_with_mcp(self, agent_id: str, room_id: str, context: List[str], user_message: str = None) -> str:
+    def generate_agent_response_with_mcp(self, agent_id: str, room_id: str, context: List[str], user_message: str = None,
+                                         bypass_cache: bool = False) -> str:
         """Generate enhanced agent response that can use MCP tools"""
         
         # Check if user message has MCP intent
@@ -284,12 +288,14 @@ class EnhancedChatSystemWithMCP:
         
         # Generate response using OpenAI if available, otherwise use enhanced fallback
         if self.openai_client:
-            return self._generate_openai_response_with_mcp(agent_id, room_id, user_message, mcp_intent, mcp_result)
+            return self._generate_openai_response_with_mcp(agent_id, room_id, user_message, mcp_intent, mcp_result,
+                                                           bypass_cache=bypass_cache)
         else:
             return self._generate_fallback_response_with_mcp(agent_id, room_id, user_message, mcp_intent, mcp_result)
     
-    def _generate_openai_response_with_mcp(self, agent_id: str, room_id: str, user_message: str, mcp_intent: Optional[Dict], mcp_result: Optional[Dict]) -> str:
-        """Generate OpenAI response with MCP context"""
+    def _generate_openai_response_with_mcp(self, agent_id: str, room_id: str, user_message: str, mcp_intent: Optional[Dict], mcp_result: Optional[Dict],
+                                           bypass_cache: bool = False) -> str:
+        """Generate OpenAI response with MCP context (served from the LLM cache when possible)"""
         
         try:
             personality = AGENT_PERSONALITIES[agent_id]
@@ -347,17 +353,24 @@ Recent conversation:
             else:
                 user_prompt = "Please contribute to the ongoing discussion or start a new relevant topic using your MCP capabilities when appropriate."
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
             
-            return response.choices[0].message.content.strip()
+            def call_openai() -> str:
+                response = self.openai_client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages,
+                    max_tokens=200,
+                    temperature=0.7
+                )
+                return response.choices[0].message.content.strip()
+            
+            return self.response_cache.get_or_call(
+                call_openai, "gpt-3.5-turbo", messages, temperature=0.7,
+                bypass=bypass_cache or request_bypasses_cache(), max_tokens=200
+            )
             
         except Exception as e:
             print(f"Error generating OpenAI response for {agent_id}: {e}")
@@ -427,6 +440,8 @@ Recent conversation:
     
     def handle_user_message(self, room_id: str, user_id: str, message: str):
         """Enhanced user message handling with MCP integration"""
+        bypass_cache = request_bypasses_cache()
+        
         # Add user message
         self.add_message(room_id, f"User_{user_id}", message)
         
@@ -472,7 +487,7 @@ Recent conversation:
                 time.sleep(random.randint(2, 4))
                 
                 # Generate enhanced response with MCP
-                response = self.generate_agent_response_with_mcp(agent_id, room_id, [], message)
+                response = self.generate_agent_response_with_mcp(agent_id, room_id, [], message, bypass_cache=bypass_cache)
                 self.add_message(room_id, agent_id, response)
                 
                 # Stop typing indicator
@@ -510,6 +525,8 @@ Recent conversation:
             enhanced_topic = topic
         
         initial_message = f"Let's discuss {enhanced_topic}. I'll coordinate our analysis and use our GitHub integration tools as needed."
+        # Background threads have no request context to read the bypass header from
+        bypass_cache = request_bypasses_cache()
         self.add_message(room_id, initiating_agent, initial_message)
         
         # Schedule follow-up responses from other agents
@@ -528,7 +545,7 @@ Recent conversation:
                     time.sleep(random.randint(3, 6))
                     
                     # Generate enhanced response with potential MCP usage
-                    response = self.generate_agent_response_with_mcp(agent_id, room_id, [topic])
+                    response = self.generate_agent_response_with_mcp(agent_id, room_id, [topic], bypass_cache=bypass_cache)
                     self.add_message(room_id, agent_id, response)
                     
                     # Stop typing indicator
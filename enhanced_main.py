@@ -281,6 +281,7 @@ def get_autonomous_status():
         'agents': activity_state['agents'],
         'total_messages': activity_state['total_messages'],
         'chat_rooms': len(CHAT_ROOMS),
+        'llm_cache': chat_system.response_cache.get_metrics() if chat_system else None,
         'timestamp': datetime.now().isoformat()
     }
 
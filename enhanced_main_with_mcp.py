@@ -501,7 +501,8 @@ def get_comprehensive_status():
             'chat_system': {
                 'status': 'active',
                 'total_rooms': len(chat_system.chat_history),
-                'active_agents': 4
+                'active_agents': 4,
+                'llm_cache': chat_system.response_cache.get_metrics()
             },
             'utilities': {
                 'total_utilities': len(utilities_manager.utilities),
@@ -28,9 +28,11 @@ from enum import Enum, IntEnum
 from collections import defaultdict, deque
 from abc import ABC, abstractmethod
 import heapq
+import itertools
 import concurrent.futures
 from contextlib import asynccontextmanager
-from xmrt_coordination_core import AgentMessage, MessageType
+from agent_registry import AgentRegistry
+from message_bus import MessageBus
 
 # Configure advanced logging
 logging.basicConfig(
@@ -180,75 +182,124 @@ class AgentPerformanceMetrics:
         """Combined efficiency metric"""
         return self.success_rate * (1.0 - min(1.0, self.stress_level)) * (1.0 / max(1.0, self.average_processing_time / 10.0))
 
-class MessageBus:
+class DependencyScheduler:
     """
-    Asynchronous Message Bus for Inter-Agent Communication
-    Enables structured A2A messaging with subscription support.
+    Dependency-graph task scheduler
+
+    Tasks whose dependencies are all finished sit in a priority heap (FIFO
+    within a priority); the rest are parked with a count of unmet
+    dependencies and reverse edges from each dependency to its waiters.
+    Finishing a task releases exactly its waiters, so scheduling costs
+    O(log n) per task plus O(out-degree) per completion instead of a
+    queue scan per dependency.
+
+    Outcomes are kept for the last ``max_finished`` tasks, like the
+    completed-task history; a dependency on an older task counts as unmet.
     """
-    def __init__(self):
-        self._subscribers: Dict[str, List[Callable[[AgentMessage], Any]]] = defaultdict(list)
-        self._message_queue: asyncio.Queue = asyncio.Queue()
-        self._running = False
-        self._processing_task = None
-        logger.info("🚌 A2A Message Bus initialized")
 
-    async def start(self):
-        """Start the message processing loop"""
-        if self._running:
-            return
-        self._running = True
-        self._processing_task = asyncio.create_task(self._process_messages())
-        logger.info("🚀 Message Bus started")
+    def __init__(self, max_finished: int = 1000):
+        self.max_finished = max_finished
+        self.ready: List[Tuple[int, int, EnhancedTask]] = []
+        self._ready_ids: Dict[str, EnhancedTask] = {}
+        self.blocked: Dict[str, EnhancedTask] = {}
+        self.finished: Dict[str, bool] = {}  # task id -> succeeded
+        self._unmet: Dict[str, int] = {}
+        self._waiters: Dict[str, List[str]] = defaultdict(list)
+        self._sequence: Dict[str, int] = {}
+        self._counter = itertools.count()
 
-    async def stop(self):
-        """Stop the message processing loop"""
-        self._running = False
-        if self._processing_task:
-            self._processing_task.cancel()
-            try:
-                await self._processing_task
-            except asyncio.CancelledError:
-                pass
-        logger.info("🛑 Message Bus stopped")
-
-    def subscribe(self, receiver_id: str, callback: Callable[[AgentMessage], Any]):
-        """Subscribe an agent to messages addressed to them"""
-        self._subscribers[receiver_id].append(callback)
-        logger.info(f"📝 Agent {receiver_id} subscribed to message bus")
-
-    async def post_message(self, message: AgentMessage):
-        """Post a message to the bus"""
-        await self._message_queue.put(message)
-        logger.debug(f"📨 Message {message.id} posted from {message.sender} to {message.receiver}")
-
-    async def _process_messages(self):
-        """Internal loop to distribute messages"""
-        while self._running:
-            try:
-                message = await self._message_queue.get()
-                receiver = message.receiver
-                
-                # Deliver to specific subscribers
-                if receiver in self._subscribers:
-                    for callback in self._subscribers[receiver]:
-                        try:
-                            if asyncio.iscoroutinefunction(callback):
-                                asyncio.create_task(callback(message))
-                            else:
-                                callback(message)
-                        except Exception as e:
-                            logger.error(f"Error delivering message {message.id} to {receiver}: {e}")
-                
-                # Broadcast support (if receiver is 'all' or 'broadcast')
-                if receiver in ['all', 'broadcast'] and message.receiver != 'all':
-                     # Prevent infinite loops if logic changes, but for now simple check
-                     pass
-
-                self._message_queue.task_done()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in message processing loop: {e}")
+    def __len__(self) -> int:
+        return len(self.ready) + len(self.blocked)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.blocked or task_id in self._ready_ids
+
+    @property
+    def ready_count(self) -> int:
+        return len(self.ready)
+
+    def add(self, task: EnhancedTask) -> str:
+        """Queue a task; returns 'ready', 'blocked' or 'cancelled' (a dependency failed)"""
+        unmet = []
+        for dep_id in set(task.dependencies):
+            succeeded = self.finished.get(dep_id)
+            if succeeded is False:
+                self._record(task.id, False)
+                return 'cancelled'
+            if not succeeded:
+                unmet.append(dep_id)
+
+        if not unmet:
+            self.push_ready(task)
+            return 'ready'
+
+        self.blocked[task.id] = task
+        self._unmet[task.id] = len(unmet)
+        for dep_id in unmet:
+            self._waiters[dep_id].append(task.id)
+        return 'blocked'
+
+    def push_ready(self, task: EnhancedTask):
+        """(Re)insert a runnable task, keeping its original FIFO position"""
+        sequence = self._sequence.get(task.id)
+        if sequence is None:
+            sequence = self._sequence[task.id] = next(self._counter)
+        heapq.heappush(self.ready, (-task.priority.value, sequence, task))
+        self._ready_ids[task.id] = task
+
+    def pop_ready(self) -> Optional[EnhancedTask]:
+        """Highest-priority runnable task, or None"""
+        if not self.ready:
+            return None
+        task = heapq.heappop(self.ready)[2]
+        self._ready_ids.pop(task.id, None)
+        return task
+
+    def _record(self, task_id: str, succeeded: bool):
+        """Store an outcome, evicting the oldest ones beyond ``max_finished``"""
+        self.finished.pop(task_id, None)
+        self.finished[task_id] = succeeded
+        while len(self.finished) > self.max_finished:
+            del self.finished[next(iter(self.finished))]
+
+    def finish(self, task_id: str, succeeded: bool) -> Tuple[List[EnhancedTask], List[EnhancedTask]]:
+        """Record a final outcome; returns (released, cancelled) waiting tasks
+
+        Tasks whose last unmet dependency just succeeded are moved to the
+        ready heap. A failure cancels every transitive dependent. The first
+        outcome is final: finishing a task again is a no-op.
+        """
+        if task_id in self.finished:
+            return [], []
+        self._record(task_id, succeeded)
+        self._sequence.pop(task_id, None)
+        released: List[EnhancedTask] = []
+        cancelled: List[EnhancedTask] = []
+
+        pending = [task_id]
+        while pending:
+            current = pending.pop()
+            for waiter_id in self._waiters.pop(current, ()):
+                waiter = self.blocked.get(waiter_id)
+                if waiter is None:
+                    continue
+                if succeeded:
+                    self._unmet[waiter_id] -= 1
+                    if self._unmet[waiter_id] == 0:
+                        del self.blocked[waiter_id], self._unmet[waiter_id]
+                        self.push_ready(waiter)
+                        released.append(waiter)
+                else:
+                    del self.blocked[waiter_id], self._unmet[waiter_id]
+                    self._record(waiter_id, False)
+                    cancelled.append(waiter)
+                    pending.append(waiter_id)
+
+        return released, cancelled
+
+    def get(self, task_id: str) -> Optional[EnhancedTask]:
+        """Look up a queued (ready or blocked) task"""
+        return self.blocked.get(task_id) or self._ready_ids.get(task_id)
 
 class EnhancedMultiAgentCoordinator:
     """
@@ -266,10 +317,12 @@ class EnhancedMultiAgentCoordinator:
 
     def __init__(self, max_workers: int = 10):
         self.max_workers = max_workers
-        self.task_queue = []  # Priority queue
+        self.scheduler = DependencyScheduler()  # Ready heap + dependency graph
+        self.scheduling_lookahead = 256  # unassignable tasks skipped per pass
         self.active_tasks: Dict[str, EnhancedTask] = {}
         self.completed_tasks: deque = deque(maxlen=1000)
         self.agent_metrics: Dict[str, AgentPerformanceMetrics] = {}
+        self.agent_registry = AgentRegistry(heartbeat_timeout=60.0)  # Capability index + rank heaps
         self.task_history: List[Dict[str, Any]] = []
 
         # Coordination state
@@ -333,6 +386,8 @@ class EnhancedMultiAgentCoordinator:
                     name=cap,
                     proficiency=0.8  # Default proficiency
                 )
+            self.agent_registry.register(agent_id, capabilities, capacity=max_concurrent)
+            self._sync_agent(agent_id)
             
             # Subscribe agent to message bus if callback provided
             if message_callback:
@@ -340,6 +395,24 @@ class EnhancedMultiAgentCoordinator:
             
             logger.info(f"✅ Agent {agent_id} registered with capabilities: {capabilities}")
 
+    def record_heartbeat(self, agent_id: str):
+        """Mark an agent as alive"""
+        metrics = self.agent_metrics.get(agent_id)
+        if metrics:
+            metrics.last_heartbeat = datetime.utcnow()
+            self.agent_registry.heartbeat(agent_id)
+
+    def _sync_agent(self, agent_id: str):
+        """Push an agent's load, performance and capability scores into the registry"""
+        metrics = self.agent_metrics[agent_id]
+        self.agent_registry.update(
+            agent_id,
+            load=metrics.current_load,
+            capacity=metrics.max_concurrent_tasks,
+            base_score=metrics.efficiency_score * (1.0 - metrics.stress_level),
+            weights={name: cap.proficiency * cap.reliability_score for name, cap in metrics.capabilities.items()}
+        )
+
     def register_task_handler(self, task_type: TaskType, handler: Callable):
         """Register a handler function for a specific task type"""
         self.task_handlers[task_type] = handler
@@ -352,7 +425,9 @@ class EnhancedMultiAgentCoordinator:
     async def submit_task(self, task: EnhancedTask) -> str:
         """Submit a new task to the coordination system"""
         async with self.coordinator_lock:
-            heapq.heappush(self.task_queue, task)
+            if self.scheduler.add(task) == 'cancelled':
+                await self._fail_dependents([task])
+                return task.id
             self.system_metrics['total_tasks_processed'] += 1
 
             # Trigger immediate coordination if system is idle
@@ -378,6 +453,19 @@ class EnhancedMultiAgentCoordinator:
                 'estimated_completion': self._estimate_completion_time(task)
             }
 
+        # Check queued tasks (runnable or waiting on dependencies)
+        task = self.scheduler.get(task_id)
+        if task is not None:
+            return {
+                'id': task.id,
+                'status': task.status.value,
+                'progress': 0.0,
+                'blocked_on': [dep_id for dep_id in task.dependencies
+                               if not self.scheduler.finished.get(dep_id)],
+                'created_at': task.created_at.isoformat(),
+                'estimated_completion': self._estimate_completion_time(task)
+            }
+
         # Check completed tasks
         for task_data in self.completed_tasks:
             if task_data.get('id') == task_id:
@@ -394,10 +482,13 @@ class EnhancedMultiAgentCoordinator:
             'status': 'running' if self.running else 'stopped',
             'active_agents': active_agents,
             'total_agents': len(self.agent_metrics),
-            'queued_tasks': len(self.task_queue),
+            'queued_tasks': len(self.scheduler),
+            'ready_tasks': self.scheduler.ready_count,
+            'blocked_tasks': len(self.scheduler.blocked),
             'active_tasks': len(self.active_tasks),
             'completed_tasks': len(self.completed_tasks),
             'system_metrics': self.system_metrics.copy(),
+            'message_bus': self.message_bus.get_metrics(),
             'agent_performance': {
                 agent_id: {
                     'success_rate': metrics.success_rate,
@@ -411,47 +502,40 @@ class EnhancedMultiAgentCoordinator:
 
     def _select_best_agent(self, task: EnhancedTask) -> Optional[str]:
         """Intelligent agent selection based on capabilities, load, and performance"""
-        available_agents = []
+        def score(agent_id: str) -> Optional[float]:
+            metrics = self.agent_metrics[agent_id]
 
-        for agent_id, metrics in self.agent_metrics.items():
-            # Check if agent is available and capable
-            if (metrics.current_load < metrics.max_concurrent_tasks and 
-                (datetime.utcnow() - metrics.last_heartbeat).total_seconds() < 60):
-
-                # Calculate capability score
-                capability_score = 0.0
-                for req_cap in task.required_capabilities:
-                    if req_cap in metrics.capabilities:
-                        cap = metrics.capabilities[req_cap]
-                        capability_score += cap.proficiency * cap.reliability_score
-
-                if capability_score > 0:
-                    # Calculate overall agent score
-                    load_factor = 1.0 - (metrics.current_load / metrics.max_concurrent_tasks)
-                    performance_factor = metrics.efficiency_score
-                    stress_factor = 1.0 - metrics.stress_level
+            # Calculate capability score
+            capability_score = 0.0
+            for req_cap in task.required_capabilities:
+                if req_cap in metrics.capabilities:
+                    cap = metrics.capabilities[req_cap]
+                    capability_score += cap.proficiency * cap.reliability_score
 
-                    total_score = capability_score * load_factor * performance_factor * stress_factor
+            if capability_score <= 0:
+                return None
 
-                    available_agents.append((agent_id, total_score))
+            # Calculate overall agent score
+            load_factor = 1.0 - (metrics.current_load / metrics.max_concurrent_tasks)
+            performance_factor = metrics.efficiency_score
+            stress_factor = 1.0 - metrics.stress_level
 
-        if available_agents:
-            # Sort by score and return best agent
-            available_agents.sort(key=lambda x: x[1], reverse=True)
-            return available_agents[0][0]
+            return capability_score * load_factor * performance_factor * stress_factor
 
-        return None
+        # Only agents holding a required capability are visited, best first;
+        # the registry weights each capability heap by proficiency x
+        # reliability, so the heap keys add up to exactly this score
+        return self.agent_registry.select(score, bound=1.0, capabilities=task.required_capabilities)
 
     async def _coordinate_tasks(self):
         """Main coordination logic for task assignment"""
         async with self.coordinator_lock:
-            while self.task_queue and len(self.active_tasks) < self.max_workers:
-                task = heapq.heappop(self.task_queue)
-
-                # Check if task has unmet dependencies
-                if self._has_unmet_dependencies(task):
-                    # Re-queue for later
-                    heapq.heappush(self.task_queue, task)
+            # Only runnable tasks are in the ready heap, and a task no agent
+            # can take right now is set aside instead of stalling the queue
+            deferred = []
+            while len(self.active_tasks) < self.max_workers and len(deferred) < self.scheduling_lookahead:
+                task = self.scheduler.pop_ready()
+                if task is None:
                     break
 
                 # Select best agent for the task
@@ -465,6 +549,7 @@ class EnhancedMultiAgentCoordinator:
 
                     self.active_tasks[task.id] = task
                     self.agent_metrics[selected_agent].current_load += 1
+                    self._sync_agent(selected_agent)
 
                     # Execute task asynchronously
                     asyncio.create_task(self._execute_task(task))
@@ -477,9 +562,11 @@ class EnhancedMultiAgentCoordinator:
 
                     logger.info(f"🎯 Task {task.id} assigned to agent {selected_agent}")
                 else:
-                    # No suitable agent available, re-queue
-                    heapq.heappush(self.task_queue, task)
-                    break
+                    # No suitable agent available right now
+                    deferred.append(task)
+
+            for task in deferred:
+                self.scheduler.push_ready(task)
 
     async def _execute_task(self, task: EnhancedTask):
         """Execute a task with comprehensive error handling and monitoring"""
@@ -551,7 +638,7 @@ class EnhancedMultiAgentCoordinator:
                     task.priority = TaskPriority(task.priority.value - 1)
 
                 async with self.coordinator_lock:
-                    heapq.heappush(self.task_queue, task)
+                    self.scheduler.push_ready(task)
 
                 logger.warning(f"🔄 Task {task.id} failed, retrying (attempt {task.retry_count}/{task.max_retries})")
             else:
@@ -565,9 +652,17 @@ class EnhancedMultiAgentCoordinator:
                 logger.error(f"❌ Task {task.id} failed permanently: {task.error_message}")
 
         finally:
+            # Stale-task cleanup may already have failed this task and freed its agent
+            owned = task.id in self.active_tasks
+
+            # Release (or cancel) tasks waiting on this one
+            if owned and task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                await self._finish_task(task)
+
             # Clean up
-            if task.assigned_agent:
+            if owned and task.assigned_agent:
                 self.agent_metrics[task.assigned_agent].current_load -= 1
+                self._sync_agent(task.assigned_agent)
 
             if task.id in self.active_tasks:
                 completed_task = self.active_tasks.pop(task.id)
@@ -589,18 +684,43 @@ class EnhancedMultiAgentCoordinator:
 
     def _has_unmet_dependencies(self, task: EnhancedTask) -> bool:
         """Check if task dependencies are satisfied"""
-        for dep_id in task.dependencies:
-            # Check if dependency is completed
-            dependency_completed = False
-            for completed_task in self.completed_tasks:
-                if completed_task.get('id') == dep_id and completed_task.get('status') == 'completed':
-                    dependency_completed = True
-                    break
-
-            if not dependency_completed:
-                return True
-
-        return False
+        return any(not self.scheduler.finished.get(dep_id) for dep_id in task.dependencies)
+
+    async def _finish_task(self, task: EnhancedTask):
+        """Record a final task outcome in the dependency graph"""
+        released, cancelled = self.scheduler.finish(task.id, task.status == TaskStatus.COMPLETED)
+        if released:
+            logger.debug(f"🔓 Task {task.id} released {len(released)} dependent tasks")
+        if cancelled:
+            await self._fail_dependents(cancelled, task.id)
+
+    async def _fail_dependents(self, tasks: List[EnhancedTask], failed_dependency: str = None):
+        """Fail tasks that can never run because a dependency failed"""
+        for task in tasks:
+            dependency = failed_dependency or next(
+                (dep_id for dep_id in task.dependencies if self.scheduler.finished.get(dep_id) is False), None
+            )
+            task.status = TaskStatus.FAILED
+            task.completion_time = datetime.utcnow()
+            task.error_message = f"Dependency {dependency} failed"
+            self.completed_tasks.append({
+                'id': task.id,
+                'type': task.type.value,
+                'status': task.status.value,
+                'created_at': task.created_at.isoformat(),
+                'completion_time': task.completion_time.isoformat(),
+                'assigned_agent': None,
+                'execution_time': None,
+                'result': None,
+                'error': task.error_message
+            })
+            await self._emit_event('task_failed', {
+                'task_id': task.id,
+                'agent_id': None,
+                'error': task.error_message,
+                'execution_time': 0.0
+            })
+            logger.error(f"❌ Task {task.id} cancelled: {task.error_message}")
 
     def _calculate_task_progress(self, task: EnhancedTask) -> float:
         """Estimate task progress based on elapsed time and estimated duration"""
@@ -623,7 +743,7 @@ class EnhancedMultiAgentCoordinator:
             return estimated_end.isoformat()
         elif task.status in [TaskStatus.QUEUED, TaskStatus.ASSIGNED]:
             # Estimate based on queue position and agent availability
-            queue_time = len(self.task_queue) * 10.0  # Rough estimate
+            queue_time = self.scheduler.ready_count * 10.0  # Rough estimate
             estimated_start = datetime.utcnow() + timedelta(seconds=queue_time)
             estimated_end = estimated_start + timedelta(seconds=task.estimated_duration)
             return estimated_end.isoformat()
@@ -681,6 +801,7 @@ class EnhancedMultiAgentCoordinator:
             # Calculate stress based on load and performance
             stress = min(1.0, load_ratio * 0.7 + failure_rate * 0.3)
             metrics.stress_level = stress
+            self._sync_agent(agent_id)
 
     async def _rebalance_loads(self):
         """Implement intelligent load balancing"""
@@ -734,6 +855,7 @@ class EnhancedMultiAgentCoordinator:
                     decay_factor = 0.99
                     capability.success_rate *= decay_factor
                     capability.reliability_score *= decay_factor
+            self._sync_agent(agent_id)
 
     async def _check_agent_health(self):
         """Monitor agent health and detect issues"""
@@ -755,7 +877,7 @@ class EnhancedMultiAgentCoordinator:
                     task.retry_count += 1
 
                     async with self.coordinator_lock:
-                        heapq.heappush(self.task_queue, task)
+                        self.scheduler.push_ready(task)
                         self.active_tasks.pop(task.id, None)
 
     async def _detect_performance_anomalies(self):
@@ -787,8 +909,10 @@ class EnhancedMultiAgentCoordinator:
 
             if task.assigned_agent:
                 self.agent_metrics[task.assigned_agent].current_load -= 1
+                self._sync_agent(task.assigned_agent)
 
             self.active_tasks.pop(task.id, None)
+            await self._finish_task(task)
 
     async def _emit_event(self, event_type: str, data: Dict[str, Any]):
         """Emit system events to registered callbacks"""
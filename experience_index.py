@@ -0,0 +1,214 @@
+"""
+XMRT-Ecosystem: Experience Index
+Nearest-neighbour lookup of learning experiences by context keys.
+
+Experience similarity in the learning core is the Jaccard index of the
+context key sets of two experiences with the same action. Every
+experience is filed under its action and its key set; experiences that
+share a key set share one group, so a query scores each distinct key set
+once rather than each experience.
+
+Groups are found through an inverted index with prefix filtering: key
+sets are ordered by a fixed token order, and only the first
+``|keys| - ceil(t * |keys|) + 1`` tokens of each set are posted, where
+``t`` is the lowest threshold the index answers. Two sets with a Jaccard
+index of at least ``t`` always share a token in those prefixes, so
+probing the query's prefix finds every qualifying group. Candidates are
+then filtered by size and re-scored exactly. Results are therefore
+identical to a full scan.
+
+Each group keeps its members ordered by success score, so the best
+experiences across the matching groups come from a k-way merge.
+"""
+
+import heapq
+import math
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from itertools import islice
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Lowest Jaccard threshold queries may use. The knowledge graph links at
+# (jaccard + 1) / 2 > 0.7, i.e. jaccard > 0.4
+DEFAULT_MIN_SIMILARITY = 0.4
+
+
+def jaccard(keys1: FrozenSet[str], keys2: FrozenSet[str]) -> float:
+    union = len(keys1 | keys2)
+    return len(keys1 & keys2) / union if union else 0.0
+
+
+class _KeyGroup:
+    """Experiences with one action and one context key set"""
+
+    __slots__ = ('keys', 'members')
+
+    def __init__(self, keys: FrozenSet[str]):
+        self.keys = keys
+        self.members: List[Tuple[float, int, str]] = []  # (-success_score, seq, experience_id), sorted
+
+
+class _ActionPartition:
+    __slots__ = ('groups', 'postings')
+
+    def __init__(self):
+        self.groups: Dict[FrozenSet[str], _KeyGroup] = {}
+        self.postings: Dict[str, Set[FrozenSet[str]]] = defaultdict(set)
+
+
+class ExperienceIndex:
+    """Exact Jaccard search over context key sets, partitioned by action"""
+
+    def __init__(self, min_similarity: float = DEFAULT_MIN_SIMILARITY):
+        if not 0.0 < min_similarity <= 1.0:
+            raise ValueError(f"Unknown similarity threshold: {min_similarity}")
+        self.min_similarity = min_similarity
+        self._partitions: Dict[str, _ActionPartition] = {}
+        self._locations: Dict[str, Tuple[str, FrozenSet[str], float, int]] = {}
+        self._seq = 0
+        self._lock = threading.RLock()
+        self.stats = {'queries': 0, 'candidate_groups': 0, 'matched_groups': 0}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, experience_id: str) -> bool:
+        return experience_id in self._locations
+
+    @staticmethod
+    def _ordered(keys: FrozenSet[str]) -> List[str]:
+        # Any fixed total order keeps prefix filtering exact
+        return sorted(keys, key=lambda key: (hash(key), key))
+
+    @staticmethod
+    def _prefix_length(size: int, threshold: float) -> int:
+        return size - math.ceil(threshold * size - 1e-9) + 1
+
+    def _file(self, experience_id: str, action: str, keys: FrozenSet[str],
+              success_score: float) -> Optional[Tuple[_KeyGroup, Tuple[float, int, str]]]:
+        """Record an experience's location; (group, member entry) unless it has no keys"""
+        if experience_id in self._locations:
+            self.remove(experience_id)
+        self._seq += 1
+        self._locations[experience_id] = (action, keys, success_score, self._seq)
+        if not keys:
+            return None  # no key overlap is possible, so never similar
+
+        partition = self._partitions.get(action)
+        if partition is None:
+            partition = self._partitions[action] = _ActionPartition()
+        group = partition.groups.get(keys)
+        if group is None:
+            group = partition.groups[keys] = _KeyGroup(keys)
+            for key in self._ordered(keys)[:self._prefix_length(len(keys), self.min_similarity)]:
+                partition.postings[key].add(keys)
+        return group, (-success_score, self._seq, experience_id)
+
+    def add(self, experience_id: str, action: str, keys: Iterable[str], success_score: float):
+        """Index an experience (replacing any earlier entry with this id)"""
+        with self._lock:
+            filed = self._file(experience_id, action, frozenset(keys), success_score)
+            if filed is not None:
+                insort(filed[0].members, filed[1])
+
+    def add_many(self, entries: Iterable[Tuple[str, str, Iterable[str], float]]):
+        """Bulk ``add`` of (experience_id, action, keys, success_score), sorting each group once"""
+        with self._lock:
+            touched: Set[_KeyGroup] = set()
+            for experience_id, action, keys, success_score in entries:
+                keys = keys if isinstance(keys, frozenset) else frozenset(keys)
+                filed = self._file(experience_id, action, keys, success_score)
+                if filed is not None:
+                    filed[0].members.append(filed[1])
+                    touched.add(filed[0])
+            for group in touched:
+                group.members.sort()
+
+    def remove(self, experience_id: str) -> bool:
+        with self._lock:
+            location = self._locations.pop(experience_id, None)
+            if location is None:
+                return False
+            action, keys, success_score, seq = location
+            partition = self._partitions.get(action)
+            group = partition.groups.get(keys) if partition is not None else None
+            if group is None:
+                return True
+
+            entry = (-success_score, seq, experience_id)
+            position = bisect_left(group.members, entry)
+            if position < len(group.members) and group.members[position] == entry:
+                del group.members[position]
+            if not group.members:
+                del partition.groups[keys]
+                for key in keys:
+                    posted = partition.postings.get(key)
+                    if posted is not None:
+                        posted.discard(keys)
+                        if not posted:
+                            del partition.postings[key]
+                if not partition.groups:
+                    del self._partitions[action]
+            return True
+
+    def rebuild(self, experiences: Iterable[Any]):
+        """Re-index from ``Experience`` objects (e.g. after pruning memory)"""
+        with self._lock:
+            self._partitions.clear()
+            self._locations.clear()
+            for experience in experiences:
+                self.add(experience.experience_id, experience.action_taken,
+                         experience.context.keys(), experience.success_score)
+
+    def matching_groups(self, action: str, keys: Iterable[str], threshold: float) -> List[Tuple[float, _KeyGroup]]:
+        """(similarity, group) for every key set with similarity > ``threshold``"""
+        if threshold < self.min_similarity:
+            raise ValueError(f"Threshold {threshold} is below the index minimum {self.min_similarity}")
+        keys = frozenset(keys)
+        with self._lock:
+            self.stats['queries'] += 1
+            partition = self._partitions.get(action)
+            if partition is None or not keys:
+                return []
+
+            candidates: Set[FrozenSet[str]] = set()
+            for key in self._ordered(keys)[:self._prefix_length(len(keys), threshold)]:
+                posted = partition.postings.get(key)
+                if posted:
+                    candidates.update(posted)
+
+            # |A & B| / |A | B| <= min / max, so sizes outside [t|A|, |A|/t] cannot qualify
+            low, high = threshold * len(keys), len(keys) / threshold
+            matches = []
+            for candidate in candidates:
+                if low <= len(candidate) <= high:
+                    similarity = jaccard(keys, candidate)
+                    if similarity > threshold:
+                        matches.append((similarity, partition.groups[candidate]))
+            self.stats['candidate_groups'] += len(candidates)
+            self.stats['matched_groups'] += len(matches)
+            return matches
+
+    def best_matches(self, action: str, keys: Iterable[str], threshold: float,
+                     limit: int = 10) -> List[str]:
+        """Ids of the ``limit`` highest-scoring similar experiences (oldest first on ties)"""
+        with self._lock:
+            groups = [group.members for _, group in self.matching_groups(action, keys, threshold)]
+            return [entry[2] for entry in islice(heapq.merge(*groups), limit)]
+
+    def neighbours(self, action: str, keys: Iterable[str], threshold: float) -> List[Tuple[str, float]]:
+        """(experience_id, similarity) for every similar experience"""
+        with self._lock:
+            return [(entry[2], similarity)
+                    for similarity, group in self.matching_groups(action, keys, threshold)
+                    for entry in group.members]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                'experiences': len(self._locations),
+                'actions': len(self._partitions),
+                'key_groups': sum(len(partition.groups) for partition in self._partitions.values())
+            }
@@ -0,0 +1,380 @@
+"""
+XMRT-Ecosystem: GitHub HTTP Layer
+Conditional-request GitHub REST/GraphQL client with an on-disk cache.
+
+Every GET stores the response body with its ETag/Last-Modified, keyed by
+URL and token. The next request for the same URL sends If-None-Match /
+If-Modified-Since, and a 304 (which does not count against the rate
+limit) is answered from the cache. Responses that can never change, such
+as a commit looked up by SHA, are served from the cache without a
+request at all, and git blobs are stored by SHA in their own table.
+Both tables are pruned like the LLM cache: entries unused for the TTL
+go first, then the least recently used beyond the size limits.
+
+``fetch_files`` reads any set of files from a repository with one
+conditional repository request, one conditional recursive tree request
+and, for blobs not cached yet, a single GraphQL query (or one blob
+request per file without a token), instead of a contents call per path.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API = 'https://api.github.com'
+README_NAMES = ('README.md', 'README.rst', 'README.txt', 'README', 'readme.md')
+# The contents API refuses files over 1 MB; keep snapshots to that size
+MAX_FILE_BYTES = 1024 * 1024
+GRAPHQL_BATCH = 50
+# Prune the response cache every this many writes
+PRUNE_EVERY = 100
+_SHA = re.compile(r'^[0-9a-f]{40}$')
+
+
+class GitHubHTTPError(Exception):
+    """Non-2xx/304 response from the GitHub API"""
+
+    def __init__(self, status: int, message: str, url: str = ''):
+        super().__init__(f"GitHub API {status} for {url}: {message}")
+        self.status = status
+        self.url = url
+
+
+def validators(cached: Optional[Tuple[Optional[str], Optional[str], str]]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers for a cached response"""
+    headers = {}
+    if cached is not None:
+        if cached[0]:
+            headers['If-None-Match'] = cached[0]
+        if cached[1]:
+            headers['If-Modified-Since'] = cached[1]
+    return headers
+
+
+class GitHubResponseCache:
+    """ETag/Last-Modified response store plus a blob store, in SQLite"""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 30 * 86400.0,
+                 max_responses: int = 20000, max_blobs: int = 20000):
+        self.path = path or ':memory:'
+        self.ttl = ttl_seconds
+        self.max_responses = max(1, max_responses)
+        self.max_blobs = max(1, max_blobs)
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        if path:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS github_responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS github_blobs (
+                sha TEXT PRIMARY KEY,
+                content BLOB NOT NULL
+            );
+        ''')
+        # Caches created before pruning have no last_used column
+        for table in ('github_responses', 'github_blobs'):
+            columns = [row[1] for row in self._conn.execute(f'PRAGMA table_info({table})')]
+            if 'last_used' not in columns:
+                self._conn.execute(f'ALTER TABLE {table} ADD COLUMN last_used REAL NOT NULL DEFAULT 0')
+                self._conn.execute(f'UPDATE {table} SET last_used = ?', (time.time(),))
+            self._conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table} (last_used)')
+        self._conn.commit()
+
+    def lookup(self, key: str) -> Optional[Tuple[Optional[str], Optional[str], str]]:
+        """(etag, last_modified, body) for a cached response"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, body FROM github_responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None:
+                self._touch('github_responses', 'key', [key])
+            return row
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        return validators(self.lookup(key))
+
+    def store(self, key: str, headers: Mapping[str, str], body: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO github_responses (key, etag, last_modified, body, fetched_at, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, headers.get('ETag'), headers.get('Last-Modified'), body, now, now)
+            )
+            self._written(1, now)
+
+    def get_blob(self, sha: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute('SELECT content FROM github_blobs WHERE sha = ?', (sha,)).fetchone()
+            if row is not None:
+                self._touch('github_blobs', 'sha', [sha])
+        return row[0] if row else None
+
+    def put_blobs(self, blobs: Mapping[str, bytes]):
+        if not blobs:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO github_blobs (sha, content, last_used) VALUES (?, ?, ?)',
+                                   [(sha, content, now) for sha, content in blobs.items()])
+            self._written(len(blobs), now)
+
+    def _touch(self, table: str, column: str, keys: List[str]):
+        # Caller holds the lock
+        self._conn.executemany(f'UPDATE {table} SET last_used = ? WHERE {column} = ?',
+                               [(time.time(), key) for key in keys])
+        self._conn.commit()
+
+    def _written(self, count: int, now: float):
+        # Caller holds the lock
+        previous, self._writes = self._writes, self._writes + count
+        if previous // PRUNE_EVERY != self._writes // PRUNE_EVERY:
+            self._prune(now)
+        self._conn.commit()
+
+    def _prune(self, now: float):
+        """Drop entries unused for the TTL, then the least recently used beyond the limits"""
+        for table, column, limit in (('github_responses', 'key', self.max_responses),
+                                     ('github_blobs', 'sha', self.max_blobs)):
+            self._conn.execute(f'DELETE FROM {table} WHERE last_used < ?', (now - self.ttl,))
+            self._conn.execute(
+                f'DELETE FROM {table} WHERE {column} IN (SELECT {column} FROM {table} '
+                f'ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (limit,)
+            )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'responses': self._conn.execute('SELECT COUNT(*) FROM github_responses').fetchone()[0],
+                'blobs': self._conn.execute('SELECT COUNT(*) FROM github_blobs').fetchone()[0],
+                'max_responses': self.max_responses,
+                'max_blobs': self.max_blobs,
+                'ttl_seconds': self.ttl
+            }
+
+
+_shared_caches: Dict[str, GitHubResponseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_response_cache(path: Optional[str] = None) -> GitHubResponseCache:
+    """One cache per file per process (GITHUB_HTTP_CACHE_PATH by default)"""
+    path = path or os.getenv('GITHUB_HTTP_CACHE_PATH', '/tmp/xmrt_github_cache.sqlite3')
+    with _shared_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = GitHubResponseCache(
+                path,
+                ttl_seconds=float(os.getenv('GITHUB_HTTP_CACHE_TTL_SECONDS', str(30 * 86400))),
+                max_responses=int(os.getenv('GITHUB_HTTP_CACHE_MAX_RESPONSES', '20000')),
+                max_blobs=int(os.getenv('GITHUB_HTTP_CACHE_MAX_BLOBS', '20000'))
+            )
+        return _shared_caches[path]
+
+
+def cache_key(token: Optional[str], url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Responses differ by credentials, so the token's hash is part of the key"""
+    identity = hashlib.sha256(token.encode()).hexdigest()[:16] if token else 'anonymous'
+    query = '&'.join(f"{k}={params[k]}" for k in sorted(params)) if params else ''
+    return f"{identity} {url}?{query}"
+
+
+class GitHubHTTP:
+    """GitHub API client that revalidates instead of re-downloading"""
+
+    def __init__(self, token: Optional[str] = None, cache: Optional[GitHubResponseCache] = None,
+                 api_base: str = GITHUB_API, timeout: float = 30.0):
+        if not REQUESTS_AVAILABLE:
+            raise ImportError("requests is required for GitHubHTTP")
+        self.token = token or None
+        self.cache = cache or get_response_cache()
+        self.api_base = api_base.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/vnd.github+json',
+            'User-Agent': 'XMRT-Ecosystem'
+        })
+        if self.token:
+            self.session.headers['Authorization'] = f"Bearer {self.token}"
+        self.rate_limit: Dict[str, Any] = {'remaining': None, 'limit': None, 'reset': None}
+        self.stats = {'requests': 0, 'not_modified': 0, 'served_from_cache': 0, 'graphql_requests': 0,
+                      'blob_cache_hits': 0, 'blobs_fetched': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def _url(self, path: str) -> str:
+        return path if path.startswith('http') else f"{self.api_base}/{path.lstrip('/')}"
+
+    def _track_rate_limit(self, headers: Mapping[str, str]):
+        if 'X-RateLimit-Remaining' in headers:
+            self.rate_limit = {
+                'remaining': int(headers['X-RateLimit-Remaining']),
+                'limit': int(headers.get('X-RateLimit-Limit', 0)),
+                'reset': int(headers.get('X-RateLimit-Reset', 0)),
+                'resource': headers.get('X-RateLimit-Resource')
+            }
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, immutable: bool = False) -> Any:
+        """GET with revalidation; ``immutable`` responses are never re-requested"""
+        url = self._url(path)
+        key = cache_key(self.token, url, params)
+        cached = self.cache.lookup(key)
+        if cached is not None and immutable:
+            self._count('served_from_cache')
+            return json.loads(cached[2])
+
+        response = self.session.get(url, params=params, headers=validators(cached), timeout=self.timeout)
+        self._count('requests')
+        self._track_rate_limit(response.headers)
+
+        if response.status_code == 304 and cached is not None:
+            self._count('not_modified')
+            return json.loads(cached[2])
+        if response.status_code >= 400:
+            raise GitHubHTTPError(response.status_code, self._error_message(response), url)
+        self.cache.store(key, response.headers, response.text)
+        return response.json()
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        """Uncached request (writes)"""
+        url = self._url(path)
+        response = self.session.request(method, url, json=payload, timeout=self.timeout)
+        self._count('requests')
+        self._track_rate_limit(response.headers)
+        if response.status_code >= 400:
+            raise GitHubHTTPError(response.status_code, self._error_message(response), url)
+        return response.json() if response.content else None
+
+    def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if not self.token:
+            raise GitHubHTTPError(401, 'GraphQL requires a token', 'graphql')
+        data = self.request('POST', 'graphql', {'query': query, 'variables': variables or {}})
+        self._count('graphql_requests')
+        if data.get('errors') and not data.get('data'):
+            raise GitHubHTTPError(200, json.dumps(data['errors'])[:500], 'graphql')
+        return data.get('data') or {}
+
+    @staticmethod
+    def _error_message(response) -> str:
+        try:
+            return response.json().get('message', response.text[:200])
+        except ValueError:
+            return response.text[:200]
+
+    # ----- Repository data -----
+    def repo(self, full: str) -> Dict[str, Any]:
+        return self.get_json(f"repos/{full}")
+
+    def tree(self, full: str, ref: str, recursive: bool = True) -> Dict[str, Any]:
+        """Whole tree at ``ref``; immutable when ``ref`` is a tree or commit SHA"""
+        return self.get_json(f"repos/{full}/git/trees/{ref}", {'recursive': 1} if recursive else None,
+                             immutable=bool(_SHA.match(ref)))
+
+    def commit(self, full: str, sha: str) -> Dict[str, Any]:
+        return self.get_json(f"repos/{full}/commits/{sha}", immutable=bool(_SHA.match(sha)))
+
+    def blobs(self, full: str, shas: Iterable[str]) -> Dict[str, bytes]:
+        """Blob contents by SHA, from the blob store or one batched fetch"""
+        found: Dict[str, bytes] = {}
+        missing: List[str] = []
+        for sha in dict.fromkeys(shas):
+            content = self.cache.get_blob(sha)
+            if content is None:
+                missing.append(sha)
+            else:
+                found[sha] = content
+        self._count('blob_cache_hits', len(found))
+        if not missing:
+            return found
+
+        fetched: Dict[str, bytes] = {}
+        if self.token:
+            owner, name = full.split('/', 1)
+            for start in range(0, len(missing), GRAPHQL_BATCH):
+                batch = [sha for sha in missing[start:start + GRAPHQL_BATCH] if _SHA.match(sha)]
+                fields = ' '.join(f'b{i}: object(oid: "{sha}") {{ ... on Blob {{ text isBinary isTruncated }} }}'
+                                  for i, sha in enumerate(batch))
+                data = self.graphql(
+                    f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}",
+                    {'owner': owner, 'name': name}
+                )
+                repository = data.get('repository') or {}
+                for i, sha in enumerate(batch):
+                    blob = repository.get(f"b{i}") or {}
+                    if blob.get('isTruncated'):
+                        # GraphQL cuts large text short; never cache a partial blob under its SHA
+                        fetched[sha] = self._rest_blob(full, sha)
+                    elif blob.get('text') is not None and not blob.get('isBinary'):
+                        fetched[sha] = blob['text'].encode('utf-8')
+        else:
+            for sha in missing:
+                fetched[sha] = self._rest_blob(full, sha)
+
+        self.cache.put_blobs(fetched)
+        self._count('blobs_fetched', len(fetched))
+        found.update(fetched)
+        return found
+
+    def _rest_blob(self, full: str, sha: str) -> bytes:
+        """Full blob content from the REST API (kept only in the blob store)"""
+        blob = self.request('GET', f"repos/{full}/git/blobs/{sha}")
+        if blob.get('encoding') == 'base64':
+            return base64.b64decode(blob.get('content', ''))
+        return str(blob.get('content', '')).encode('utf-8')
+
+    def fetch_files(self, full: str, paths: Iterable[str], include_readme: bool = True,
+                    ref: Optional[str] = None) -> Dict[str, str]:
+        """Map of path -> text for those of ``paths`` (and the root README) that exist"""
+        if ref is None:
+            ref = self.repo(full).get('default_branch') or 'main'
+        tree = self.tree(full, ref)
+        if tree.get('truncated'):
+            logger.warning(f"⚠️ Tree for {full}@{ref} truncated by GitHub; some files may be missing")
+        entries = {entry['path']: entry for entry in tree.get('tree', []) if entry.get('type') == 'blob'}
+
+        wanted = [path for path in dict.fromkeys(paths) if path in entries]
+        if include_readme:
+            readme = next((name for name in README_NAMES if name in entries), None)
+            if readme is None:
+                readme = next((path for path in entries if '/' not in path and path.lower().startswith('readme')), None)
+            if readme is not None and readme not in wanted:
+                wanted.insert(0, readme)
+        wanted = [path for path in wanted if entries[path].get('size', 0) <= MAX_FILE_BYTES]
+
+        contents = self.blobs(full, [entries[path]['sha'] for path in wanted])
+        return {path: contents[entries[path]['sha']].decode('utf-8', errors='ignore')
+                for path in wanted if entries[path]['sha'] in contents}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['rate_limit'] = dict(self.rate_limit)
+        stats['cache'] = self.cache.get_metrics()
+        return stats
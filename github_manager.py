@@ -19,16 +19,27 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import tempfile
 import traceback
+from collections import OrderedDict
 
 from github import Github, GithubException
 from github.Repository import Repository
 from github.GitRef import GitRef
 from github.ContentFile import ContentFile
 
+from github_http import GitHubHTTP, GitHubHTTPError, get_response_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CONFIG_FILE_NAMES = ('requirements.txt', 'Dockerfile', 'docker-compose.yml', 'render.yaml')
+README_FILE_NAMES = ('README.md', 'readme.md', 'README.rst', 'README.txt')
+# Tree analyses kept in memory, keyed by tree SHA
+TREE_ANALYSIS_CACHE_SIZE = 16
+# Bulk commits: blob uploads in flight, and attempts when the branch moves underneath us
+BLOB_UPLOAD_CONCURRENCY = 8
+COMMIT_MAX_ATTEMPTS = 3
+
 class GitHubManager:
     """
     Manages real GitHub repository operations for the XMRT-Ecosystem
@@ -51,6 +62,9 @@ class GitHubManager:
         # Initialize GitHub API client
         self.github_client = None
         self.repository = None
+        self.http = None  # conditional-request reader sharing the on-disk ETag cache
+        self._tree_analyses: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.tree_stats = {'analyses': 0, 'reused': 0}
         self.commit_history = []
         self.deployment_stats = {
             'total_commits': 0,
@@ -69,6 +83,7 @@ class GitHubManager:
 
             # Initialize GitHub client
             self.github_client = Github(self.github_token)
+            self.http = GitHubHTTP(self.github_token, get_response_cache())
 
             # Get repository reference
             self.repository = self.github_client.get_repo(f"{self.repo_owner}/{self.repo_name}")
@@ -132,13 +147,16 @@ class GitHubManager:
         """Analyze repository branches"""
         try:
             branches = []
-            for branch in self.repository.get_branches():
+            full = self.repository.full_name
+            for branch in self.http.get_json(f"repos/{full}/branches", {'per_page': 100}):
+                # Head commits are looked up by SHA, so unchanged branches cost nothing
+                commit = self.http.commit(full, branch['commit']['sha'])['commit']
                 branch_info = {
-                    'name': branch.name,
-                    'protected': branch.protected,
-                    'commit_sha': branch.commit.sha,
-                    'commit_message': branch.commit.commit.message,
-                    'last_modified': branch.commit.commit.author.date.isoformat()
+                    'name': branch['name'],
+                    'protected': branch.get('protected', False),
+                    'commit_sha': branch['commit']['sha'],
+                    'commit_message': commit['message'],
+                    'last_modified': commit['author']['date']
                 }
                 branches.append(branch_info)
 
@@ -152,44 +170,74 @@ class GitHubManager:
             logger.error(f"Branch analysis failed: {e}")
             return {'error': str(e), 'total_branches': 0}
 
+    def _analyze_tree(self) -> Dict[str, Any]:
+        """File structure and quality inputs for the default branch, from one recursive tree
+
+        The branch head is revalidated (a 304 while nothing is pushed) and the
+        analysis is memoised by tree SHA, so an unchanged tree costs no work.
+        """
+        full = self.repository.full_name
+        branch = self.http.get_json(f"repos/{full}/branches/{self.repository.default_branch}")
+        tree_sha = branch['commit']['commit']['tree']['sha']
+        analysis = self._tree_analyses.get(tree_sha)
+        if analysis is not None:
+            self._tree_analyses.move_to_end(tree_sha)
+            self.tree_stats['reused'] += 1
+            return analysis
+
+        tree = self.http.tree(full, tree_sha)
+        if tree.get('truncated'):
+            logger.warning(f"⚠️ Tree for {full} truncated by GitHub; analysis covers a partial listing")
+
+        file_structure = {
+            'python_files': [],
+            'config_files': [],
+            'documentation': [],
+            'total_files': 0,
+            'directories': [],
+            'tree_sha': tree_sha
+        }
+        root_files = set()
+        for entry in tree.get('tree', []):
+            path = entry['path']
+            if entry['type'] == 'tree':
+                file_structure['directories'].append(f"{path}/")
+                continue
+            if entry['type'] != 'blob':
+                continue  # submodules
+            file_structure['total_files'] += 1
+            name = path.rsplit('/', 1)[-1]
+            if '/' not in path:
+                root_files.add(name)
+
+            if name.endswith('.py'):
+                file_structure['python_files'].append(path)
+            elif name in CONFIG_FILE_NAMES:
+                file_structure['config_files'].append(path)
+            elif name.endswith(('.md', '.rst', '.txt')):
+                file_structure['documentation'].append(path)
+
+        analysis = {
+            'file_structure': file_structure,
+            'has_requirements': 'requirements.txt' in root_files,
+            'has_dockerfile': 'Dockerfile' in root_files,
+            'has_readme': any(name in root_files for name in README_FILE_NAMES),
+            'has_tests': any('test' in name.lower() for name in root_files),
+            'python_file_count': len(file_structure['python_files'])
+        }
+        self._tree_analyses[tree_sha] = analysis
+        while len(self._tree_analyses) > TREE_ANALYSIS_CACHE_SIZE:
+            self._tree_analyses.popitem(last=False)
+        self.tree_stats['analyses'] += 1
+        return analysis
+
     async def _analyze_file_structure(self) -> Dict[str, Any]:
         """Analyze repository file structure"""
         try:
-            file_structure = {
-                'python_files': [],
-                'config_files': [],
-                'documentation': [],
-                'total_files': 0,
-                'directories': []
-            }
-
-            # Get repository contents
-            contents = self.repository.get_contents("")
-
-            def analyze_contents(contents_list, path=""):
-                for content in contents_list:
-                    if content.type == "dir":
-                        file_structure['directories'].append(f"{path}{content.name}/")
-                        # Recursively analyze subdirectories
-                        try:
-                            subcontents = self.repository.get_contents(content.path)
-                            analyze_contents(subcontents, f"{path}{content.name}/")
-                        except:
-                            pass  # Skip if can't access subdirectory
-                    else:
-                        file_structure['total_files'] += 1
-                        full_path = f"{path}{content.name}"
-
-                        if content.name.endswith('.py'):
-                            file_structure['python_files'].append(full_path)
-                        elif content.name in ['requirements.txt', 'Dockerfile', 'docker-compose.yml', 'render.yaml']:
-                            file_structure['config_files'].append(full_path)
-                        elif content.name.endswith(('.md', '.rst', '.txt')):
-                            file_structure['documentation'].append(full_path)
-
-            analyze_contents(contents)
-
-            return file_structure
+            file_structure = self._analyze_tree()['file_structure']
+            # Copies, so callers cannot alter the memoised analysis
+            return {key: list(value) if isinstance(value, list) else value
+                    for key, value in file_structure.items()}
 
         except Exception as e:
             logger.error(f"File structure analysis failed: {e}")
@@ -199,16 +247,20 @@ class GitHubManager:
         """Get recent commit history"""
         try:
             commits = []
-            for commit in self.repository.get_commits()[:limit]:
+            full = self.repository.full_name
+            for listed in self.http.get_json(f"repos/{full}/commits", {'per_page': limit})[:limit]:
+                # Stats only come with the single-commit endpoint, which never changes for a SHA
+                commit = self.http.commit(full, listed['sha'])
+                stats = commit.get('stats') or {}
                 commit_info = {
-                    'sha': commit.sha,
-                    'message': commit.commit.message,
-                    'author': commit.commit.author.name,
-                    'author_email': commit.commit.author.email,
-                    'date': commit.commit.author.date.isoformat(),
-                    'additions': commit.stats.additions,
-                    'deletions': commit.stats.deletions,
-                    'changed_files': commit.stats.total
+                    'sha': commit['sha'],
+                    'message': commit['commit']['message'],
+                    'author': commit['commit']['author']['name'],
+                    'author_email': commit['commit']['author']['email'],
+                    'date': commit['commit']['author']['date'],
+                    'additions': stats.get('additions', 0),
+                    'deletions': stats.get('deletions', 0),
+                    'changed_files': stats.get('total', 0)
                 }
                 commits.append(commit_info)
 
@@ -231,60 +283,10 @@ class GitHubManager:
                 'code_quality_score': 0.0
             }
 
-            # Check for important files
-            try:
-                self.repository.get_contents("requirements.txt")
-                quality_metrics['has_requirements'] = True
-            except:
-                pass
-
-            try:
-                self.repository.get_contents("Dockerfile")
-                quality_metrics['has_dockerfile'] = True
-            except:
-                pass
-
-            try:
-                readme_files = ['README.md', 'readme.md', 'README.rst', 'README.txt']
-                for readme in readme_files:
-                    try:
-                        self.repository.get_contents(readme)
-                        quality_metrics['has_readme'] = True
-                        break
-                    except:
-                        continue
-            except:
-                pass
-
-            # Look for test files
-            try:
-                contents = self.repository.get_contents("")
-                for content in contents:
-                    if content.type == "file" and ('test' in content.name.lower() or content.name.startswith('test_')):
-                        quality_metrics['has_tests'] = True
-                        break
-            except:
-                pass
-
-            # Count Python files
-            try:
-                def count_python_files(contents_list):
-                    count = 0
-                    for content in contents_list:
-                        if content.type == "dir":
-                            try:
-                                subcontents = self.repository.get_contents(content.path)
-                                count += count_python_files(subcontents)
-                            except:
-                                pass
-                        elif content.name.endswith('.py'):
-                            count += 1
-                    return count
-
-                contents = self.repository.get_contents("")
-                quality_metrics['python_file_count'] = count_python_files(contents)
-            except:
-                pass
+            # Presence checks and the Python file count come from the same tree
+            analysis = self._analyze_tree()
+            for key in ('has_requirements', 'has_dockerfile', 'has_readme', 'has_tests', 'python_file_count'):
+                quality_metrics[key] = analysis[key]
 
             # Calculate quality score
             score = 0
@@ -344,19 +346,22 @@ class GitHubManager:
                 'cycle_id': cycle_id
             }
 
-            # Process each improvement
-            files_to_commit = []
+            # Process each improvement; one commit holds one version of a path,
+            # so a later improvement to the same file replaces an earlier one
+            files_by_path: Dict[str, Dict[str, Any]] = {}
 
             for improvement in improvements:
-                file_path = improvement.get('file_path', f'autonomous_improvement_{len(files_to_commit)+1}.py')
+                file_path = improvement.get('file_path', f'autonomous_improvement_{len(files_by_path)+1}.py')
                 file_content = improvement.get('code', improvement.get('generated_code', ''))
 
                 if file_content:
-                    files_to_commit.append({
+                    files_by_path[file_path] = {
                         'path': file_path,
                         'content': file_content,
                         'description': improvement.get('description', 'Autonomous improvement')
-                    })
+                    }
+
+            files_to_commit = list(files_by_path.values())
 
             if not files_to_commit:
                 logger.warning("No files to commit")
@@ -366,52 +371,28 @@ class GitHubManager:
                     'cycle_id': cycle_id
                 }
 
-            # Create or update files in repository
+            # One blob per file, one tree, one commit, one ref update
             committed_files = []
 
-            for file_info in files_to_commit:
-                try:
-                    file_path = file_info['path']
-                    file_content = file_info['content']
-
-                    # Check if file already exists
-                    try:
-                        existing_file = self.repository.get_contents(file_path)
-                        # Update existing file
-                        result = self.repository.update_file(
-                            path=file_path,
-                            message=f"Update {file_path} - {cycle_id}",
-                            content=file_content,
-                            sha=existing_file.sha,
-                            branch=self.branch_name
-                        )
-                        logger.info(f"📝 Updated file: {file_path}")
-
-                    except GithubException as e:
-                        if e.status == 404:
-                            # Create new file
-                            result = self.repository.create_file(
-                                path=file_path,
-                                message=f"Create {file_path} - {cycle_id}",
-                                content=file_content,
-                                branch=self.branch_name
-                            )
-                            logger.info(f"📄 Created new file: {file_path}")
-                        else:
-                            raise
-
+            try:
+                message = f"{commit_message} - {cycle_id}\n\n" + "\n".join(
+                    f"- {file_info['path']}: {file_info['description']}" for file_info in files_to_commit
+                )
+                commit_sha = await self._bulk_commit(files_to_commit, message)
+                for file_info in files_to_commit:
                     committed_files.append({
-                        'path': file_path,
-                        'commit_sha': result['commit'].sha,
+                        'path': file_info['path'],
+                        'commit_sha': commit_sha,
                         'status': 'success'
                     })
 
-                except Exception as file_error:
-                    logger.error(f"❌ Failed to commit file {file_path}: {file_error}")
+            except Exception as commit_error:
+                logger.error(f"❌ Failed to commit {len(files_to_commit)} files: {commit_error}")
+                for file_info in files_to_commit:
                     committed_files.append({
-                        'path': file_path,
+                        'path': file_info['path'],
                         'status': 'failed',
-                        'error': str(file_error)
+                        'error': str(commit_error)
                     })
 
             # Update commit results
@@ -419,7 +400,7 @@ class GitHubManager:
 
             if successful_commits:
                 commit_results['success'] = True
-                commit_results['commit_sha'] = successful_commits[-1]['commit_sha']  # Use last commit SHA
+                commit_results['commit_sha'] = successful_commits[-1]['commit_sha']
                 commit_results['files_modified'] = [f['path'] for f in successful_commits]
 
                 # Update deployment stats
@@ -457,6 +438,58 @@ class GitHubManager:
                 'timestamp': datetime.now().isoformat()
             }
 
+    async def _bulk_commit(self, files: List[Dict[str, Any]], message: str) -> str:
+        """Commit ``files`` to the branch in a single commit through the Git Data API
+
+        Blobs are uploaded concurrently, then one tree (on top of the branch
+        head's tree), one commit and a non-forced ref update: N + 4 requests.
+        If the branch moved meanwhile the ref update is rejected, and the tree
+        and commit are rebuilt on the new head, reusing the uploaded blobs.
+        """
+        full = self.repository.full_name
+        loop = asyncio.get_running_loop()
+        uploads = asyncio.Semaphore(BLOB_UPLOAD_CONCURRENCY)
+
+        async def create_blob(file_info):
+            payload = {
+                'content': base64.b64encode(file_info['content'].encode('utf-8')).decode('ascii'),
+                'encoding': 'base64'
+            }
+            async with uploads:
+                blob = await loop.run_in_executor(None, self.http.request, 'POST', f"repos/{full}/git/blobs", payload)
+            return {'path': file_info['path'], 'mode': '100644', 'type': 'blob', 'sha': blob['sha']}
+
+        entries = await asyncio.gather(*(create_blob(file_info) for file_info in files))
+
+        for attempt in range(1, COMMIT_MAX_ATTEMPTS + 1):
+            # Conditional GET: fresh every time, but a 304 when the branch has not moved
+            branch = await loop.run_in_executor(
+                None, self.http.get_json, f"repos/{full}/branches/{self.branch_name}"
+            )
+            head_sha = branch['commit']['sha']
+            tree = await loop.run_in_executor(None, self.http.request, 'POST', f"repos/{full}/git/trees", {
+                'base_tree': branch['commit']['commit']['tree']['sha'],
+                'tree': entries
+            })
+            commit = await loop.run_in_executor(None, self.http.request, 'POST', f"repos/{full}/git/commits", {
+                'message': message,
+                'tree': tree['sha'],
+                'parents': [head_sha]
+            })
+            try:
+                await loop.run_in_executor(None, self.http.request, 'PATCH',
+                                           f"repos/{full}/git/refs/heads/{self.branch_name}",
+                                           {'sha': commit['sha'], 'force': False})
+            except GitHubHTTPError as e:
+                # 422: not a fast-forward, someone pushed since we read the head
+                if e.status != 422 or attempt == COMMIT_MAX_ATTEMPTS:
+                    raise
+                logger.warning(f"⚠️ {self.branch_name} moved during commit, retrying ({attempt}/{COMMIT_MAX_ATTEMPTS})")
+                continue
+
+            logger.info(f"📝 Committed {len(files)} files to {self.branch_name} as {commit['sha'][:8]}")
+            return commit['sha']
+
     async def _trigger_deployment(self, commit_sha: str):
         """Trigger deployment after successful commit"""
         try:
@@ -613,24 +646,26 @@ class GitHubManager:
     async def health_check(self) -> Dict[str, Any]:
         """Perform health check on GitHub integration"""
         try:
-            # Check API rate limits
-            rate_limit = self.github_client.get_rate_limit()
+            # Check API rate limits (the rate_limit endpoint itself is not counted)
+            core = self.http.get_json("rate_limit")['resources']['core']
 
             # Check repository access
             repo_accessible = True
             try:
-                self.repository.get_contents("README.md")  # Try to access a common file
-            except:
+                self.http.get_json(f"repos/{self.repository.full_name}/readme")  # Revalidated, usually a 304
+            except GitHubHTTPError:
                 repo_accessible = False
 
             health_status = {
                 'github_connected': True,
                 'repository_accessible': repo_accessible,
                 'api_rate_limit': {
-                    'remaining': rate_limit.core.remaining,
-                    'limit': rate_limit.core.limit,
-                    'reset_time': rate_limit.core.reset.isoformat()
+                    'remaining': core['remaining'],
+                    'limit': core['limit'],
+                    'reset_time': datetime.fromtimestamp(core['reset']).isoformat()
                 },
+                'http_cache': self.http.get_metrics(),
+                'tree_analysis': dict(self.tree_stats),
                 'deployment_stats': self.deployment_stats.copy(),
                 'commit_history_count': len(self.commit_history),
                 'health_status': 'healthy' if repo_accessible else 'degraded'
@@ -672,7 +707,8 @@ class GitHubManager:
                 'repository_health': await self._assess_code_quality(),
                 'api_usage': {
                     'requests_made': getattr(self.github_client, '_Github__requester', {}).get('_Requester__requestCount', 0),
-                    'rate_limit_status': self.github_client.get_rate_limit().core.remaining
+                    'rate_limit_status': self.github_client.get_rate_limit().core.remaining,
+                    'conditional_requests': self.http.get_metrics() if self.http else None
                 },
                 'last_analysis': datetime.now().isoformat()
             }
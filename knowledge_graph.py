@@ -0,0 +1,298 @@
+"""
+XMRT-Ecosystem: Knowledge Graph
+Compact adjacency store for the learning core's experience graph.
+
+Nodes get dense integer ids, and each node's neighbours are a dict of
+neighbour id -> similarity. An edge is kept once per endpoint, parallel
+edges collapse into one, and a neighbour query costs O(degree).
+
+Each node keeps at most ``max_degree`` neighbours. A new edge is
+accepted only if it is stronger than the weakest edge of each endpoint
+that is already full; those weakest edges are evicted. The mutating
+methods return the edges they added and removed so the caller can
+persist just those rows.
+
+``load`` and ``save`` move the whole graph to and from the
+``knowledge_graph`` and ``knowledge_edges`` tables with one SELECT and
+one ``executemany`` per table. Edge rows are stored once per pair with
+the smaller node id as ``source``, under a unique index on
+(source, target). ``to_csr`` freezes the adjacency into CSR arrays.
+"""
+
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Any, Container, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per node (strongest first)
+MAX_DEGREE = 32
+EDGE_TYPE = "similar_experience"
+
+EDGE_INDEX_SQL = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_knowledge_edges_pair
+    ON knowledge_edges (source, target)
+"""
+
+
+def edge_key(source: str, target: str) -> Tuple[str, str]:
+    """Stored (source, target) order of an undirected edge"""
+    return (source, target) if source <= target else (target, source)
+
+
+def edge_row(source: str, target: str, similarity: float, created_at: str) -> Tuple[str, str, str, str]:
+    """``knowledge_edges`` row for an edge"""
+    source, target = edge_key(source, target)
+    return source, target, json.dumps({"similarity": similarity, "type": EDGE_TYPE}), created_at
+
+
+class KnowledgeGraph:
+    """Undirected similarity graph with integer node ids and a per-node degree cap"""
+
+    def __init__(self, max_degree: int = MAX_DEGREE):
+        if max_degree < 1:
+            raise ValueError(f"Unknown max degree: {max_degree}")
+        self.max_degree = max_degree
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.clusters: Dict[str, List[str]] = {}
+
+        self._ids: Dict[str, int] = {}
+        self._names: List[Optional[str]] = []
+        self._created: List[Optional[str]] = []
+        self._adjacency: List[Optional[Dict[int, float]]] = []
+        self._free: List[int] = []
+        self._edge_count = 0
+        self.stats = {'edges_added': 0, 'edges_updated': 0, 'edges_rejected': 0, 'edges_evicted': 0,
+                      'unknown_targets': 0}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._ids
+
+    # ----- Nodes -----
+    def add_node(self, node_id: str, data: Dict[str, Any], created_at: Optional[str] = None) -> int:
+        """Add or update a node; returns its integer id"""
+        self.nodes[node_id] = data
+        index = self._ids.get(node_id)
+        if index is not None:
+            return index
+        created_at = created_at or datetime.now().isoformat()
+        if self._free:
+            index = self._free.pop()
+            self._names[index], self._created[index], self._adjacency[index] = node_id, created_at, {}
+        else:
+            index = len(self._names)
+            self._names.append(node_id)
+            self._created.append(created_at)
+            self._adjacency.append({})
+        self._ids[node_id] = index
+        return index
+
+    def remove_node(self, node_id: str) -> List[Tuple[str, str]]:
+        """Drop a node; returns the (source, target) keys of the edges removed with it"""
+        index = self._ids.pop(node_id, None)
+        if index is None:
+            return []
+        self.nodes.pop(node_id, None)
+        removed = []
+        for neighbour in self._adjacency[index]:
+            del self._adjacency[neighbour][index]
+            removed.append(edge_key(node_id, self._names[neighbour]))
+        self._edge_count -= len(removed)
+        self._names[index] = self._created[index] = self._adjacency[index] = None
+        self._free.append(index)
+        return removed
+
+    # ----- Edges -----
+    def _unlink(self, a: int, b: int):
+        del self._adjacency[a][b]
+        del self._adjacency[b][a]
+        self._edge_count -= 1
+
+    def _weakest(self, index: int) -> Optional[Tuple[int, float]]:
+        """(neighbour, similarity) that a new edge must beat, or None while there is room"""
+        neighbours = self._adjacency[index]
+        if len(neighbours) < self.max_degree:
+            return None
+        weakest = min(neighbours, key=neighbours.get)
+        return weakest, neighbours[weakest]
+
+    def add_edge(self, source: str, target: str,
+                 similarity: float) -> Tuple[bool, List[Tuple[str, str]]]:
+        """Link two nodes; returns (stored, keys of edges evicted to make room)"""
+        a, b = self._ids.get(source), self._ids.get(target)
+        if a is None or b is None:
+            self.stats['unknown_targets'] += 1
+            return False, []
+        if a == b:
+            return False, []
+        if b in self._adjacency[a]:
+            # Parallel edge: keep one, with the latest similarity
+            self._adjacency[a][b] = self._adjacency[b][a] = similarity
+            self.stats['edges_updated'] += 1
+            return True, []
+
+        victims = []
+        for index in (a, b):
+            weakest = self._weakest(index)
+            if weakest is not None:
+                if weakest[1] >= similarity:
+                    self.stats['edges_rejected'] += 1
+                    return False, []
+                victims.append((index, weakest[0]))
+        evicted = []
+        for index, neighbour in victims:
+            self._unlink(index, neighbour)
+            evicted.append(edge_key(self._names[index], self._names[neighbour]))
+        self.stats['edges_evicted'] += len(evicted)
+
+        self._adjacency[a][b] = self._adjacency[b][a] = similarity
+        self._edge_count += 1
+        self.stats['edges_added'] += 1
+        return True, evicted
+
+    def add_edges(self, source: str, candidates: List[Tuple[str, float]]
+                  ) -> Tuple[List[Tuple[str, str, float]], List[Tuple[str, str]]]:
+        """Link ``source`` to its strongest (target, similarity) candidates
+
+        Returns (edges stored, keys of edges evicted). Candidates are tried
+        strongest first, so once ``source`` is full the rest are skipped.
+        """
+        added: List[Tuple[str, str, float]] = []
+        evicted: List[Tuple[str, str]] = []
+        index = self._ids.get(source)
+        if index is None:
+            return added, evicted
+        for target, similarity in sorted(candidates, key=lambda candidate: -candidate[1]):
+            weakest = self._weakest(index)
+            if weakest is not None and weakest[1] >= similarity:
+                self.stats['edges_rejected'] += 1
+                break
+            stored, dropped = self.add_edge(source, target, similarity)
+            if stored:
+                added.append((source, target, similarity))
+                evicted.extend(dropped)
+        return added, evicted
+
+    def neighbours(self, node_id: str) -> List[Tuple[str, float]]:
+        """(neighbour, similarity) pairs of a node"""
+        index = self._ids.get(node_id)
+        if index is None:
+            return []
+        names = self._names
+        return [(names[neighbour], similarity) for neighbour, similarity in self._adjacency[index].items()]
+
+    def degree(self, node_id: str) -> int:
+        index = self._ids.get(node_id)
+        return 0 if index is None else len(self._adjacency[index])
+
+    def edge_count(self) -> int:
+        return self._edge_count
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, float]]:
+        """Each edge once, as (source, target, similarity) in stored order"""
+        names = self._names
+        for index, neighbours in enumerate(self._adjacency):
+            if neighbours is None:
+                continue
+            name = names[index]
+            for neighbour, similarity in neighbours.items():
+                other = names[neighbour]
+                if name < other:
+                    yield name, other, similarity
+
+    def to_csr(self) -> Tuple[List[Optional[str]], np.ndarray, np.ndarray, np.ndarray]:
+        """(node names, indptr, indices, similarities); row i is node i, freed ids are empty rows"""
+        degrees = np.fromiter((len(neighbours) if neighbours is not None else 0
+                               for neighbours in self._adjacency), dtype=np.int64, count=len(self._adjacency))
+        indptr = np.zeros(len(degrees) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        similarities = np.empty(indptr[-1], dtype=np.float32)
+        for index, neighbours in enumerate(self._adjacency):
+            if neighbours:
+                start, end = indptr[index], indptr[index + 1]
+                indices[start:end] = list(neighbours.keys())
+                similarities[start:end] = list(neighbours.values())
+        return list(self._names), indptr, indices, similarities
+
+    def clear(self):
+        self.nodes.clear()
+        self.clusters.clear()
+        self._ids.clear()
+        self._names, self._created, self._adjacency, self._free = [], [], [], []
+        self._edge_count = 0
+
+    # ----- Bulk persistence -----
+    def load(self, conn: sqlite3.Connection, keep: Optional[Container[str]] = None) -> int:
+        """Replace the graph with the stored one, keeping only nodes in ``keep`` (default: all)
+
+        Edges are added strongest first, so the degree cap keeps each node's
+        top-k. Returns the number of stored rows that should not be there:
+        duplicate, self-loop, reversed, over-cap or orphaned rows. Call
+        ``save`` to rewrite the tables if that is non-zero.
+        """
+        self.clear()
+        stale = 0
+        for node_id, node_data, created_at in conn.execute(
+                "SELECT node_id, node_data, created_at FROM knowledge_graph"):
+            if keep is not None and node_id not in keep:
+                stale += 1
+                continue
+            self.add_node(node_id, json.loads(node_data or '{}'), created_at)
+
+        try:
+            rows = conn.execute(
+                "SELECT source, target, json_extract(edge_data, '$.similarity') FROM knowledge_edges"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # SQLite built without JSON1: parse in Python
+            rows = [(source, target, json.loads(edge_data or '{}').get('similarity'))
+                    for source, target, edge_data in conn.execute(
+                        "SELECT source, target, edge_data FROM knowledge_edges")]
+        rows.sort(key=lambda row: -(row[2] or 0.0))
+
+        for source, target, similarity in rows:
+            a, b = self._ids.get(source), self._ids.get(target)
+            if a is None or b is None or a == b or b in self._adjacency[a]:
+                stale += 1
+                continue
+            # Strongest first, so a full endpoint always rejects instead of evicting
+            stored, _ = self.add_edge(source, target, float(similarity or 0.0))
+            stale += source > target or not stored
+        logger.info(f"🕸️ Loaded knowledge graph: {len(self._ids)} nodes, {self._edge_count} edges")
+        return stale
+
+    def save(self, conn: sqlite3.Connection):
+        """Rewrite both tables from memory in one transaction"""
+        saved_at = datetime.now().isoformat()
+        with conn:
+            conn.execute("DELETE FROM knowledge_graph")
+            conn.executemany(
+                "INSERT INTO knowledge_graph (node_id, node_data, created_at) VALUES (?, ?, ?)",
+                ((node_id, json.dumps(self.nodes.get(node_id, {})), self._created[index])
+                 for node_id, index in self._ids.items())
+            )
+            conn.execute("DELETE FROM knowledge_edges")
+            conn.execute(EDGE_INDEX_SQL)
+            conn.executemany(
+                "INSERT INTO knowledge_edges (source, target, edge_data, created_at) VALUES (?, ?, ?, ?)",
+                (edge_row(source, target, similarity, saved_at) for source, target, similarity in self.iter_edges())
+            )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        degrees = [len(neighbours) for neighbours in self._adjacency if neighbours is not None]
+        return {
+            **self.stats,
+            'nodes': len(self._ids),
+            'edges': self._edge_count,
+            'max_degree': self.max_degree,
+            'mean_degree': round(sum(degrees) / len(degrees), 2) if degrees else 0.0,
+            'full_nodes': sum(degree >= self.max_degree for degree in degrees)
+        }
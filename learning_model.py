@@ -0,0 +1,154 @@
+"""
+XMRT-Ecosystem: Learning Model
+Feature hashing, incremental training and a shared on-disk model registry
+for the learning core's outcome predictor.
+
+``experience_features`` flattens an experience into string features
+(action, context keys, ``key=value`` for categorical values, hour and
+weekday) and signed-log numeric features. ``FeatureHasher`` turns a
+batch of those dicts into one sparse matrix with MurmurHash3, which is
+stable across processes, unlike ``hash()``.
+
+``fit_outcome_model`` runs in a worker process. It takes the registry
+lock, continues the newest model with ``partial_fit`` on the new rows
+only, and saves the result as the next version. Every worker picks up
+the latest version from the registry instead of training its own.
+"""
+
+import logging
+import math
+import os
+import pickle
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.metrics import mean_squared_error
+from sklearn.neural_network import MLPRegressor
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 2 ** 12
+HIDDEN_LAYER_SIZES = (100, 50)
+# Passes of partial_fit over each batch of new experiences
+TRAINING_EPOCHS = 5
+# Model versions kept on disk
+KEEP_VERSIONS = 5
+
+
+def experience_features(context: Mapping[str, Any], action: str, timestamp: datetime) -> Dict[str, Any]:
+    """Flat feature dict for FeatureHasher (strings are one-hot, numbers are values)"""
+    features: Dict[str, Any] = {
+        'action': action,
+        'hour': str(timestamp.hour),
+        'weekday': str(timestamp.weekday()),
+        'context_size': math.log1p(len(context))
+    }
+    for key, value in context.items():
+        features[f"key={key}"] = 1.0
+        if isinstance(value, bool) or isinstance(value, str):
+            features[f"ctx:{key}"] = str(value)[:64]
+        elif isinstance(value, (int, float)) and math.isfinite(value):
+            features[f"num:{key}"] = math.copysign(math.log1p(abs(value)), value)
+    return features
+
+
+def make_hasher(n_features: int = N_FEATURES) -> FeatureHasher:
+    return FeatureHasher(n_features=n_features, input_type='dict', alternate_sign=False)
+
+
+class ModelRegistry:
+    """Versioned pickles in a directory, with a LATEST pointer and an exclusive lock"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, version: int) -> str:
+        return os.path.join(self.directory, f"outcome_predictor.v{version}.pkl")
+
+    def latest_version(self) -> int:
+        try:
+            with open(os.path.join(self.directory, 'LATEST')) as pointer:
+                return int(pointer.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def load(self, version: Optional[int] = None) -> Tuple[Optional[Any], Dict[str, Any], int]:
+        """(model, metadata, version) for ``version`` (default: latest); (None, {}, 0) if none"""
+        version = self.latest_version() if version is None else version
+        if not version:
+            return None, {}, 0
+        with open(self._path(version), 'rb') as f:
+            payload = pickle.load(f)
+        return payload['model'], payload['metadata'], version
+
+    def save(self, model: Any, metadata: Dict[str, Any]) -> int:
+        """Write the next version atomically and point LATEST at it (hold ``lock()``)"""
+        version = self.latest_version() + 1
+        for path, data in ((self._path(version), pickle.dumps({'model': model, 'metadata': metadata})),
+                           (os.path.join(self.directory, 'LATEST'), str(version).encode())):
+            fd, tmp = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        for old in range(version - KEEP_VERSIONS, 0, -1):
+            if not os.path.exists(self._path(old)):
+                break
+            os.remove(self._path(old))
+        return version
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Serialise training across processes (no-op where fcntl is unavailable)"""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(os.path.join(self.directory, '.lock'), 'w') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def fit_outcome_model(directory: str, features: Sequence[Dict[str, Any]], targets: Sequence[float],
+                      n_features: int = N_FEATURES, epochs: int = TRAINING_EPOCHS,
+                      seed: int = 42) -> Dict[str, Any]:
+    """Continue the latest model on new rows and save it as a new version (worker process)"""
+    start = time.time()
+    X = make_hasher(n_features).transform(features)
+    y = np.asarray(targets, dtype=float)
+
+    # Hold out a fifth of the batch to report error on rows the model has not seen
+    order = np.random.RandomState(seed).permutation(len(y))
+    cut = len(y) - len(y) // 5 if len(y) >= 10 else len(y)
+    train, test = order[:cut], order[cut:]
+
+    registry = ModelRegistry(directory)
+    with registry.lock():
+        model, metadata, parent = registry.load()
+        if model is None or getattr(model, 'n_features_in_', n_features) != n_features:
+            model, metadata, parent = MLPRegressor(hidden_layer_sizes=HIDDEN_LAYER_SIZES, random_state=seed), {}, 0
+        for _ in range(max(1, epochs)):
+            model.partial_fit(X[train], y[train])
+        mse = float(mean_squared_error(y[test], model.predict(X[test]))) if len(test) else None
+        version = registry.save(model, {
+            'parent': parent,
+            'rows': len(y),
+            'total_rows': metadata.get('total_rows', 0) + len(y),
+            'mse': mse,
+            'n_features': n_features,
+            'trained_at': datetime.now().isoformat()
+        })
+    return {'version': version, 'rows': len(y), 'mse': mse, 'seconds': round(time.time() - start, 3)}
@@ -0,0 +1,383 @@
+"""
+XMRT-Ecosystem: Learning Store
+Write-behind SQLite persistence for the autonomous learning core.
+
+A single writer thread owns one long-lived WAL connection. Callers hand
+it rows through a queue and return immediately; the writer drains the
+queue in batches and commits each batch as one transaction. Upserts and
+deletes of the same row within a batch are coalesced (the last one
+wins), so a pattern updated by fifty experiences in a burst is written
+once. ``flush()`` waits until
+everything queued before it is on disk.
+
+``LazyExperienceMap`` is the read side: a mapping of experience id to
+``Experience`` that starts from compact arrays of ids, actions, scores
+and timestamps (read from a covering index) and parses a row's JSON
+columns only when that experience is first accessed, keeping recently
+hydrated experiences in an LRU.
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+UPSERT_SQL = {
+    'experiences': """
+        INSERT OR REPLACE INTO experiences
+        (id, context, action, outcome, success_score, timestamp, knowledge_type, tags, parent_task_id, context_keys)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'patterns': """
+        INSERT OR REPLACE INTO patterns
+        (id, pattern_type, description, conditions, predictions, confidence, usage_count, success_rate, last_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'knowledge_graph': """
+        INSERT OR REPLACE INTO knowledge_graph (node_id, node_data, created_at)
+        VALUES (?, ?, ?)
+    """,
+    # Relies on the unique (source, target) index; rows are keyed by edge_key()
+    'knowledge_edges': """
+        INSERT OR REPLACE INTO knowledge_edges (source, target, edge_data, created_at)
+        VALUES (?, ?, ?, ?)
+    """
+}
+
+DELETE_SQL = {
+    'knowledge_graph': "DELETE FROM knowledge_graph WHERE node_id = ?",
+    'knowledge_edges': "DELETE FROM knowledge_edges WHERE source = ? AND target = ?"
+}
+
+# Give up on a batch after this many failed commits
+MAX_WRITE_ATTEMPTS = 3
+
+EXPERIENCE_COLUMNS = ('id', 'context', 'action', 'outcome', 'success_score', 'timestamp',
+                      'knowledge_type', 'tags', 'parent_task_id')
+# SQLite's default limit on host parameters is 999
+HYDRATE_PAGE_SIZE = 500
+
+
+class LearningStore:
+    """Queue-fed SQLite writer shared by one AutonomousLearningCore"""
+
+    def __init__(self, db_path: str, batch_size: int = 1000, flush_interval: float = 0.5,
+                 busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._queue: 'queue.Queue[Any]' = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.stats = {
+            'queued': 0,
+            'rows_written': 0,
+            'coalesced': 0,
+            'commits': 0,
+            'failed_commits': 0,
+            'dropped_rows': 0,
+            'largest_batch': 0
+        }
+
+    def open(self):
+        """Start the writer thread (which opens the connection)"""
+        self._writer = threading.Thread(target=self._write_loop, daemon=True, name="LearningStoreWriter")
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ----- Producer side: never touches the disk -----
+    def upsert(self, table: str, key: Hashable, row: Sequence[Any]):
+        """Queue an INSERT OR REPLACE; a later write of ``key`` in the same batch wins"""
+        if table not in UPSERT_SQL:
+            raise ValueError(f"Unknown learning table: {table}")
+        self._put(('upsert', table, key, tuple(row)))
+
+    def delete(self, table: str, key: Hashable):
+        """Queue a DELETE of the row with primary key ``key`` (a tuple for composite keys)"""
+        if table not in DELETE_SQL:
+            raise ValueError(f"Unknown learning table: {table}")
+        self._put(('delete', table, key, key if isinstance(key, tuple) else (key,)))
+
+    def _put(self, item: Tuple[Any, ...]):
+        if self._closed:
+            logger.warning(f"⚠️ Learning store closed; dropping {item[1]} write")
+            return
+        self.stats['queued'] += 1
+        self._queue.put(item)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is committed"""
+        if self._writer is None or not self._writer.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        self._queue.put(('barrier', None, None, done))
+        return done.wait(timeout)
+
+    def pending_count(self) -> int:
+        return self._queue.qsize()
+
+    # ----- Writer thread -----
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+
+                # Take whatever else is already waiting, up to one batch
+                items = [first]
+                while len(items) < self.batch_size:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                writes: Dict[Tuple[str, Hashable], Tuple[str, Tuple[Any, ...]]] = {}
+                barriers: List[threading.Event] = []
+                for kind, table, key, payload in items:
+                    if kind in ('upsert', 'delete'):
+                        if (table, key) in writes:
+                            self.stats['coalesced'] += 1
+                        writes[(table, key)] = (kind, payload)
+                    elif kind == 'barrier':
+                        barriers.append(payload)
+                    else:
+                        stopping = True
+
+                self._commit(conn, writes)
+                for barrier in barriers:
+                    barrier.set()
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, writes: Dict[Tuple[str, Hashable], Tuple[str, Tuple[Any, ...]]]):
+        # One surviving write per key, so deletes and upserts in a batch never conflict
+        by_statement: Dict[str, List[Tuple[Any, ...]]] = {}
+        for (table, _key), (kind, params) in writes.items():
+            sql = UPSERT_SQL[table] if kind == 'upsert' else DELETE_SQL[table]
+            by_statement.setdefault(sql, []).append(params)
+        rows = len(writes)
+        if not rows:
+            return
+
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            try:
+                with conn:
+                    for sql, batch in by_statement.items():
+                        conn.executemany(sql, batch)
+                self.stats['rows_written'] += rows
+                self.stats['commits'] += 1
+                self.stats['largest_batch'] = max(self.stats['largest_batch'], rows)
+                return
+            except sqlite3.Error as e:
+                self.stats['failed_commits'] += 1
+                logger.error(f"❌ Learning store commit failed (attempt {attempt}/{MAX_WRITE_ATTEMPTS}): {e}")
+                time.sleep(0.1 * attempt)
+        self.stats['dropped_rows'] += rows
+
+    def close(self):
+        """Write everything still queued and stop the writer"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(('stop', None, None, None))
+            self._writer.join(timeout=30)
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.stats, 'pending': self.pending_count()}
+
+
+class LazyExperienceMap(MutableMapping):
+    """Experience id -> Experience, hydrated from SQLite on first access
+
+    Loaded rows are kept as parallel compact arrays (action code, score,
+    timestamp) plus the id list; the full row is fetched and passed to
+    ``hydrate`` only when an experience is read. Experiences added at
+    runtime stay resident, since the write-behind store may not have
+    written them yet. Iterating ``values()`` hydrates in pages of
+    HYDRATE_PAGE_SIZE rows without filling the LRU.
+    """
+
+    def __init__(self, db_path: str, hydrate: Callable[[Tuple[Any, ...]], Any], cache_size: int = 2048):
+        self.db_path = db_path
+        self.hydrate = hydrate
+        self.cache_size = max(1, int(cache_size))
+
+        self._positions: Dict[str, int] = {}  # id -> slot, in insertion order
+        self._ids: List[Optional[str]] = []
+        self._actions = array('l')
+        self._scores = array('d')
+        self._times = array('d')
+        self._action_codes: Dict[str, int] = {}
+        self._action_names: List[str] = []
+
+        self._resident: Dict[str, Any] = {}
+        self._cache: 'OrderedDict[str, Any]' = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self.stats = {'hydrated': 0, 'cache_hits': 0, 'paged_reads': 0}
+
+    def _slot(self, experience_id: str, action: str, success_score: float, timestamp: float):
+        code = self._action_codes.get(action)
+        if code is None:
+            code = self._action_codes[action] = len(self._action_names)
+            self._action_names.append(action)
+        position = self._positions.get(experience_id)
+        if position is None:
+            self._positions[experience_id] = len(self._ids)
+            self._ids.append(experience_id)
+            self._actions.append(code)
+            self._scores.append(success_score)
+            self._times.append(timestamp)
+        else:
+            self._actions[position] = code
+            self._scores[position] = success_score
+            self._times[position] = timestamp
+
+    def load_index(self, rows: Iterable[Tuple[str, str, float, float]]):
+        """Register stored experiences as (id, action, success_score, epoch seconds)"""
+        with self._lock:
+            positions, codes = self._positions, self._action_codes
+            for experience_id, action, success_score, timestamp in rows:
+                if experience_id in positions or action not in codes:
+                    self._slot(experience_id, action, success_score, timestamp)
+                    continue
+                positions[experience_id] = len(self._ids)
+                self._ids.append(experience_id)
+                self._actions.append(codes[action])
+                self._scores.append(success_score)
+                self._times.append(timestamp)
+
+    # ----- Mapping protocol -----
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._positions))
+
+    def __contains__(self, experience_id: object) -> bool:
+        return experience_id in self._positions
+
+    def __getitem__(self, experience_id: str) -> Any:
+        with self._lock:
+            experience = self._resident.get(experience_id)
+            if experience is not None:
+                return experience
+            if experience_id not in self._positions:
+                raise KeyError(experience_id)
+            experience = self._cache.get(experience_id)
+            if experience is not None:
+                self._cache.move_to_end(experience_id)
+                self.stats['cache_hits'] += 1
+                return experience
+
+            rows = self._fetch([experience_id])
+            if experience_id not in rows:
+                raise KeyError(experience_id)
+            experience = self.hydrate(rows[experience_id])
+            self.stats['hydrated'] += 1
+            self._cache[experience_id] = experience
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return experience
+
+    def __setitem__(self, experience_id: str, experience: Any):
+        with self._lock:
+            self._slot(experience_id, experience.action_taken, experience.success_score,
+                       experience.timestamp.timestamp())
+            self._resident[experience_id] = experience
+            self._cache.pop(experience_id, None)
+
+    def __delitem__(self, experience_id: str):
+        with self._lock:
+            position = self._positions.pop(experience_id)
+            self._ids[position] = None
+            self._resident.pop(experience_id, None)
+            self._cache.pop(experience_id, None)
+
+    # ----- Queries that need no hydration -----
+    def summary(self, experience_id: str) -> Tuple[str, float, float]:
+        """(action, success_score, epoch seconds) for an experience"""
+        position = self._positions[experience_id]
+        return self._action_names[self._actions[position]], self._scores[position], self._times[position]
+
+    def ids_since(self, cutoff: float) -> List[str]:
+        return [experience_id for experience_id, position in self._positions.items()
+                if self._times[position] >= cutoff]
+
+    def ranked_ids(self) -> List[str]:
+        """Ids by (success_score, timestamp), best first"""
+        return sorted(self._positions, reverse=True,
+                      key=lambda experience_id: (self._scores[self._positions[experience_id]],
+                                                 self._times[self._positions[experience_id]]))
+
+    def values(self, ids: Optional[Sequence[str]] = None) -> Iterator[Any]:
+        """Experiences for ``ids`` (default: all), hydrated a page at a time"""
+        ids = list(self._positions) if ids is None else list(ids)
+        for start in range(0, len(ids), HYDRATE_PAGE_SIZE):
+            page = ids[start:start + HYDRATE_PAGE_SIZE]
+            with self._lock:
+                ready = {experience_id: self._resident.get(experience_id) or self._cache.get(experience_id)
+                         for experience_id in page}
+                missing = [experience_id for experience_id, experience in ready.items() if experience is None]
+                rows = self._fetch(missing) if missing else {}
+                self.stats['paged_reads'] += bool(missing)
+            for experience_id in page:
+                experience = ready.get(experience_id)
+                if experience is None and experience_id in rows:
+                    experience = self.hydrate(rows[experience_id])
+                if experience is not None:
+                    yield experience
+
+    def items(self):
+        for experience in self.values():
+            yield experience.experience_id, experience
+
+    def _fetch(self, ids: Sequence[str]) -> Dict[str, Tuple[Any, ...]]:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        placeholders = ','.join('?' * len(ids))
+        cursor = self._conn.execute(
+            f"SELECT {', '.join(EXPERIENCE_COLUMNS)} FROM experiences WHERE id IN ({placeholders})", tuple(ids)
+        )
+        return {row[0]: row for row in cursor}
+
+    def compact(self):
+        """Drop the slots of deleted experiences"""
+        with self._lock:
+            live = [(experience_id, self._positions[experience_id]) for experience_id in self._positions]
+            self._ids = [experience_id for experience_id, _ in live]
+            self._actions = array('l', (self._actions[position] for _, position in live))
+            self._scores = array('d', (self._scores[position] for _, position in live))
+            self._times = array('d', (self._times[position] for _, position in live))
+            self._positions = {experience_id: slot for slot, (experience_id, _) in enumerate(live)}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.stats, 'experiences': len(self._positions), 'resident': len(self._resident),
+                'cached': len(self._cache), 'actions': len(self._action_names)}
@@ -0,0 +1,244 @@
+"""
+XMRT-Ecosystem: LLM Response Cache
+Content-addressed cache for chat-completion responses.
+
+A response is keyed by a SHA-256 of the model, the normalized messages
+(whitespace runs collapsed, role and content only), the temperature and
+any extra key material a caller adds, such as the content hashes of the
+files a prompt was built from. Lookups go to an in-memory LRU first and
+then to a SQLite table shared by every process on the host; both tiers
+honour a TTL and an entry limit. Each entry remembers how long the
+original call took, so hits report the latency they saved.
+
+``bypass=True`` skips the lookup for one request and stores the fresh
+response in place of the cached one; HTTP handlers derive it from the
+``X-LLM-Cache: bypass`` request header. Rows beyond the disk limit are
+pruned every 100 writes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+try:
+    from flask import has_request_context, request as flask_request
+    FLASK_AVAILABLE = True
+except ImportError:
+    FLASK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BYPASS_HEADER = 'X-LLM-Cache'
+BYPASS_VALUES = ('bypass', 'no-cache', 'refresh')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_messages(messages: Iterable[Mapping[str, Any]]) -> list:
+    return [{'role': str(message.get('role', '')),
+             'content': _WHITESPACE.sub(' ', str(message.get('content') or '')).strip()}
+            for message in messages]
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8', errors='ignore')).hexdigest()
+
+
+def bypass_requested(headers: Optional[Mapping[str, str]]) -> bool:
+    return bool(headers) and str(headers.get(BYPASS_HEADER, '')).strip().lower() in BYPASS_VALUES
+
+
+def request_bypasses_cache() -> bool:
+    """True inside a Flask request that carries the bypass header"""
+    return FLASK_AVAILABLE and has_request_context() and bypass_requested(flask_request.headers)
+
+
+class LLMResponseCache:
+    """In-memory LRU in front of a persistent SQLite tier"""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 86400.0,
+                 max_memory_entries: int = 512, max_disk_entries: int = 20000):
+        self.path = path
+        self.ttl = ttl_seconds
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.max_disk_entries = max(1, max_disk_entries)
+        self._memory: 'OrderedDict[str, Tuple[str, float, float]]' = OrderedDict()  # key -> (response, created, latency)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self.stats = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'bypassed': 0,
+                      'stores': 0, 'saved_seconds': 0.0, 'miss_seconds': 0.0}
+        if path:
+            self._open()
+
+    def _open(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    latency REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used)')
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM cache persistence disabled ({self.path}): {e}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(model: str, messages: Iterable[Mapping[str, Any]], temperature: float = 0.0,
+                 **extra: Any) -> str:
+        material = {
+            'model': model,
+            'messages': normalize_messages(messages),
+            'temperature': round(float(temperature), 3),
+            'extra': extra
+        }
+        return content_hash(json.dumps(material, sort_keys=True, default=str))
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                if now - item[1] < self.ttl:
+                    self._memory.move_to_end(key)
+                    self._hit('memory_hits', item[2])
+                    return item[0]
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        'SELECT response, created, latency FROM llm_responses WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row is not None and now - row[1] < self.ttl:
+                        self._conn.execute('UPDATE llm_responses SET last_used = ? WHERE key = ?', (now, key))
+                        self._conn.commit()
+                        self._remember(key, row)
+                        self._hit('disk_hits', row[2])
+                        return row[0]
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ LLM cache read failed: {e}")
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key: str, response: str, latency: float = 0.0, model: str = ''):
+        now = time.time()
+        with self._lock:
+            self._remember(key, (response, now, latency))
+            self.stats['stores'] += 1
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO llm_responses (key, model, response, created, last_used, latency) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', (key, model, response, now, now, latency)
+                )
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._prune(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ LLM cache write failed: {e}")
+
+    def get_or_call(self, call: Callable[[], str], model: str, messages: Iterable[Mapping[str, Any]],
+                    temperature: float = 0.0, bypass: bool = False,
+                    cacheable: Optional[Callable[[str], bool]] = None, **extra: Any) -> str:
+        """Cached response for this prompt, else ``call()`` (stored if ``cacheable``)"""
+        messages = list(messages)
+        key = self.make_key(model, messages, temperature, **extra)
+        if bypass:
+            with self._lock:
+                self.stats['bypassed'] += 1
+        else:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+        start = time.perf_counter()
+        response = call()
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.stats['miss_seconds'] += latency
+        if response and (cacheable is None or cacheable(response)):
+            self.put(key, response, latency, model)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM llm_responses')
+                self._conn.commit()
+
+    def _hit(self, tier: str, latency: float):
+        self.stats['hits'] += 1
+        self.stats[tier] += 1
+        self.stats['saved_seconds'] += latency
+
+    def _remember(self, key: str, item: Tuple[str, float, float]):
+        self._memory[key] = item
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _prune(self, now: float):
+        """Drop expired rows, then the least recently used beyond the limit"""
+        self._conn.execute('DELETE FROM llm_responses WHERE created < ?', (now - self.ttl,))
+        self._conn.execute(
+            'DELETE FROM llm_responses WHERE key IN (SELECT key FROM llm_responses '
+            'ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (self.max_disk_entries,)
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            disk_entries = None
+            if self._conn is not None:
+                try:
+                    disk_entries = self._conn.execute('SELECT COUNT(*) FROM llm_responses').fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                **self.stats,
+                'saved_seconds': round(self.stats['saved_seconds'], 3),
+                'miss_seconds': round(self.stats['miss_seconds'], 3),
+                'hit_ratio': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries
+            }
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide cache configured from LLM_CACHE_* environment variables"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache(
+                path=os.getenv('LLM_CACHE_PATH', '/tmp/xmrt_llm_cache.sqlite3') or None,
+                ttl_seconds=float(os.getenv('LLM_CACHE_TTL_SECONDS', '604800')),
+                max_memory_entries=int(os.getenv('LLM_CACHE_MAX_MEMORY_ENTRIES', '512')),
+                max_disk_entries=int(os.getenv('LLM_CACHE_MAX_DISK_ENTRIES', '20000'))
+            )
+        return _default_cache
@@ -26,13 +26,22 @@ OPENAI_ORG                   : optional
 OPENAI_PROJECT               : optional
 OPENAI_MODEL                 : chat model (default: "gpt-4o-mini")
 OPENAI_RPM                   : throttle requests/min (default: 200)
-OPENAI_MAX_CONCURRENCY       : parallel OpenAI calls (default: 2)
+OPENAI_TPM                   : throttle tokens/min, 0 = off (default: 0)
+OPENAI_COMPLETION_TOKENS_ESTIMATE : completion tokens reserved per call before usage is known (default: 512)
+OPENAI_MAX_CONCURRENCY       : ceiling for adaptive parallel OpenAI calls (default: 2)
+
+# LLM response cache (send header "X-LLM-Cache: bypass" to /api/coordination/trigger to skip it)
+LLM_CACHE_PATH               : SQLite file shared by workers, "" = memory only (default: "/tmp/xmrt_llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS        : entry lifetime (default: 604800 = 7d)
+LLM_CACHE_MAX_MEMORY_ENTRIES : in-process LRU size (default: 512)
+LLM_CACHE_MAX_DISK_ENTRIES   : SQLite rows kept (default: 20000)
 
 # GitHub auth + seed scope
 GITHUB_TOKEN                 : REQUIRED for discovery/writes
 GITHUB_REPOS                 : comma list of seed repos to analyze each cycle
                                default: "DevGruGold/XMRT-Ecosystem,DevGruGold/xmrtassistant,DevGruGold/xmrtcash,DevGruGold/assetverse-nexus"
 GITHUB_DEFAULT_BRANCH        : default branch name if unknown (default: "main")
+GITHUB_HTTP_CACHE_PATH       : ETag/blob cache for GitHub reads (default: "/tmp/xmrt_github_cache.sqlite3")
 
 # Global discovery (OFF by default)
 GITHUB_GLOBAL_DISCOVERY      : "0" | "1"  -> enable search across GitHub (default: "0")
@@ -56,6 +65,11 @@ SCAN_JITTER_SECONDS          : +/- jitter added to interval (default: 60)
 CACHE_PATH                   : path to "seen" repo cache JSON (default: "/tmp/xmrt_seen_repos.json")
 ANALYZE_TTL_HOURS            : hours before a repo can be re-analyzed (default: 24)
 
+# Rules engine
+RULES_WORKERS                : parallel event workers (default: 4)
+RULES_TYPE_LIMITS            : CSV of etype:max concurrent events of that type
+                               default: "analyze.repo:2,analyze.repos.seed:1,discover.github:1"
+
 # Issue/PR cosmetics
 GITHUB_ISSUE_LABELS          : CSV of labels to apply (default: "xmrt,analysis,hardening")
 GITHUB_PR_BRANCH_PREFIX      : prefix for branches (default: "xmrt/improve")
@@ -66,14 +80,19 @@ import json
 import time
 import random
 import logging
+import bisect
 import threading
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Callable
-from queue import Queue, Empty
+from typing import Any, Dict, List, Optional, Callable, Tuple
 
 from flask import Flask, request, jsonify, render_template_string
 from flask_cors import CORS
 
+from github_http import GitHubHTTP, GitHubHTTPError, get_response_cache
+from llm_cache import content_hash, get_llm_cache, request_bypasses_cache
+from rate_limiter import AdaptiveConcurrency, RateLimiter, estimate_tokens, retry_after_seconds
+
 # ---------------- Optional deps ----------------
 try:
     from openai import OpenAI
@@ -159,6 +178,8 @@ OPENAI_PROJECT = os.getenv("OPENAI_PROJECT", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_RPM = int(os.getenv("OPENAI_RPM", "200"))
 OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "2"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "0"))
+OPENAI_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("OPENAI_COMPLETION_TOKENS_ESTIMATE", "512"))
 
 # Worker cadence
 SCAN_INTERVAL_SECONDS = int(os.getenv("SCAN_INTERVAL_SECONDS", "900"))
@@ -167,6 +188,7 @@ SCAN_JITTER_SECONDS = int(os.getenv("SCAN_JITTER_SECONDS", "60"))
 # GitHub config
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 GITHUB_DEFAULT_BRANCH = os.getenv("GITHUB_DEFAULT_BRANCH", "main")
+GITHUB_HTTP_CACHE_PATH = os.getenv("GITHUB_HTTP_CACHE_PATH", "/tmp/xmrt_github_cache.sqlite3")
 GITHUB_REPOS_ENV = os.getenv(
     "GITHUB_REPOS",
     "DevGruGold/XMRT-Ecosystem,DevGruGold/xmrtassistant,DevGruGold/xmrtcash,DevGruGold/assetverse-nexus",
@@ -189,6 +211,28 @@ XMRT_DRY_RUN = os.getenv("XMRT_DRY_RUN", "0") == "1"
 CACHE_PATH = os.getenv("CACHE_PATH", "/tmp/xmrt_seen_repos.json")
 ANALYZE_TTL_HOURS = int(os.getenv("ANALYZE_TTL_HOURS", "24"))
 
+# Rules engine
+RULES_WORKERS = int(os.getenv("RULES_WORKERS", "4"))
+RULES_TYPE_LIMITS = {
+    k.strip(): int(v) for k, v in (
+        s.split(":", 1) for s in os.getenv(
+            "RULES_TYPE_LIMITS", "analyze.repo:2,analyze.repos.seed:1,discover.github:1"
+        ).split(",") if ":" in s
+    )
+}
+# Lower runs first; coordination requests never wait behind discovery fan-out
+RULES_EVENT_PRIORITIES = {
+    "coordination.request": 0,
+    "build.mobile_optimizer": 1,
+    "build.pool_optimizer": 1,
+    "analyze.repos.seed": 2,
+    "analyze.repo": 3,
+    "discover.github": 4,
+}
+RULES_DEFAULT_PRIORITY = 2
+# Upper bounds (ms) of the per-type latency histogram buckets
+RULES_LATENCY_BUCKETS_MS = (10, 50, 100, 500, 1000, 5000, 30000, 60000)
+
 # Cosmetics
 ISSUE_LABELS = [s.strip() for s in os.getenv("GITHUB_ISSUE_LABELS", "xmrt,analysis,hardening").split(",") if s.strip()]
 PR_BRANCH_PREFIX = os.getenv("GITHUB_PR_BRANCH_PREFIX", "xmrt/improve")
@@ -215,7 +259,7 @@ CORS(app)
 # ============================
 
 class OpenAIClient:
-    """Simple RPM limiter + small concurrency gate + retries."""
+    """Token-bucket RPM/TPM limiter + adaptive (AIMD) concurrency + retries."""
     def __init__(self, api_key: str, org: str = "", project: str = "", model: str = "gpt-4o-mini"):
         self.enabled = bool(api_key and OpenAI)
         self.model = model
@@ -224,49 +268,66 @@ class OpenAIClient:
             self._client = None
             return
 
-        self._client = OpenAI(api_key=api_key, organization=org or None, project=project or None)
-        self._rpm = max(1, OPENAI_RPM)
-        self._sema = threading.Semaphore(OPENAI_MAX_CONCURRENCY)
-        self._window_start = time.time()
-        self._req_in_window = 0
-        self._lock = threading.Lock()
+        # 429s are handled here (Retry-After + AIMD), not by the SDK's own retries
+        self._client = OpenAI(api_key=api_key, organization=org or None, project=project or None, max_retries=0)
+        self._limiter = RateLimiter(max(1, OPENAI_RPM), OPENAI_TPM or None)
+        self._concurrency = AdaptiveConcurrency(initial=1, maximum=max(1, OPENAI_MAX_CONCURRENCY))
 
-    def _throttle(self):
-        with self._lock:
-            now = time.time()
-            elapsed = now - self._window_start
-            if elapsed >= 60:
-                self._window_start, self._req_in_window = now, 0
-            if self._req_in_window >= self._rpm:
-                sleep_for = 60 - elapsed + random.uniform(0.1, 0.4)
-                log.info("OpenAI throttle: sleeping %.2fs (RPM=%d)", sleep_for, self._rpm)
-                time.sleep(sleep_for)
-                self._window_start, self._req_in_window = time.time(), 0
-            self._req_in_window += 1
+    def _throttle(self, tokens: int):
+        # The reservation is made under the limiter's lock; the wait is not
+        wait = self._limiter.acquire(tokens)
+        if wait > 1:
+            log.info("OpenAI throttle: waited %.2fs (RPM=%d, TPM=%s)", wait, OPENAI_RPM, OPENAI_TPM or "off")
 
     def chat(self, messages: List[Dict[str, str]], temperature: float = 0.2) -> str:
         if not self.enabled:
             return "(OpenAI disabled)"
-        with self._sema:
-            self._throttle()
-            delay = 2.0
-            for _ in range(5):
-                try:
-                    resp = self._client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        temperature=temperature,
-                    )
-                    return resp.choices[0].message.content or ""
-                except Exception as e:
-                    msg = str(e)
-                    if "429" in msg or "rate limit" in msg.lower():
-                        time.sleep(delay)
-                        delay = min(delay * 2, 30)
-                        continue
-                    log.exception("OpenAI error: %s", e)
-                    return f"(OpenAI error: {e})"
-            return "(OpenAI backoff exhausted)"
+        estimate = estimate_tokens(messages, OPENAI_COMPLETION_TOKENS_ESTIMATE)
+        delay = 2.0
+        for _ in range(5):
+            self._concurrency.acquire()
+            outcome = "error"
+            try:
+                self._throttle(estimate)
+                resp = self._client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                )
+                outcome = "ok"
+                usage = getattr(resp, "usage", None)
+                if usage is not None and getattr(usage, "total_tokens", None):
+                    self._limiter.settle(estimate, usage.total_tokens)
+                return resp.choices[0].message.content or ""
+            except Exception as e:
+                msg = str(e)
+                if getattr(e, "status_code", None) == 429 or "429" in msg or "rate limit" in msg.lower():
+                    outcome = "throttled"
+                    wait = retry_after_seconds(getattr(getattr(e, "response", None), "headers", None))
+                    if wait is None:
+                        wait, delay = delay, min(delay * 2, 30)
+                    log.info("OpenAI 429: pausing %.2fs (concurrency limit %.1f)", wait, self._concurrency.limit)
+                    self._limiter.pause(wait)
+                    continue
+                log.exception("OpenAI error: %s", e)
+                return f"(OpenAI error: {e})"
+            finally:
+                self._concurrency.release(outcome)
+        return "(OpenAI backoff exhausted)"
+
+    def get_metrics(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        return {"enabled": True, "limiter": dict(self._limiter.stats), "concurrency": self._concurrency.get_metrics()}
+
+
+SNAPSHOT_CANDIDATES = [
+    "SECURITY.md", "CONTRIBUTING.md", "CODEOWNERS",
+    "Dockerfile", "docker/Dockerfile",
+    ".github/workflows/ci.yml", ".github/workflows/build.yml",
+    "requirements.txt", "pyproject.toml", "Pipfile",
+    "package.json", "pnpm-lock.yaml", "yarn.lock",
+]
 
 
 class GitHubClient:
@@ -274,97 +335,74 @@ class GitHubClient:
         self.enabled = bool(token and Github)
         self.dry_run = dry_run or not self.enabled
         self._gh = Github(token, per_page=50) if self.enabled else None
+        # Reads go through the conditional-request layer; writes stay on PyGithub
+        self._http = GitHubHTTP(token, get_response_cache(GITHUB_HTTP_CACHE_PATH)) if self.enabled else None
         if self.dry_run:
             log.warning("GitHub writes are in DRY-RUN mode")
 
     # ----- Core helpers -----
-    def _within_limits(self, repo) -> bool:
-        owner = repo.owner.login.lower() if getattr(repo, "owner", None) else ""
-        if owner in BLOCKLIST_ORGS:
-            return False
-        if ALLOWLIST_ORGS and owner not in ALLOWLIST_ORGS:
-            return False
-        if repo.stargazers_count < GITHUB_SEARCH_STARS_MIN:
-            return False
-        return True
-
     def _rate_sleep(self, extra: float = 5.0):
         if not self.enabled:
             return
-        try:
-            rl = self._gh.get_rate_limit().core
-            if rl.remaining <= 1:
-                reset = rl.reset.replace(tzinfo=None)
-                now = datetime.utcnow()
-                wait = max(0.0, (reset - now).total_seconds()) + extra
-                log.warning("GitHub rate limited. Sleeping %.1fs until reset.", wait)
-                time.sleep(wait)
-        except Exception:
-            time.sleep(10)
+        # Limits of whichever resource (core/search/graphql) answered last
+        rl = self._http.rate_limit
+        if rl.get("remaining") is not None and rl["remaining"] <= 1 and rl.get("reset"):
+            wait = max(0.0, rl["reset"] - time.time()) + extra
+            log.warning("GitHub rate limited (%s). Sleeping %.1fs until reset.", rl.get("resource") or "core", wait)
+            time.sleep(wait)
 
     # ----- Discovery -----
+    def _within_limits(self, item: Dict[str, Any]) -> bool:
+        owner = ((item.get("owner") or {}).get("login") or "").lower()
+        if owner in BLOCKLIST_ORGS:
+            return False
+        if ALLOWLIST_ORGS and owner not in ALLOWLIST_ORGS:
+            return False
+        return int(item.get("stargazers_count") or 0) >= GITHUB_SEARCH_STARS_MIN
+
     def discover(self, queries: List[str], hard_cap: int) -> List[str]:
         if not self.enabled:
             log.warning("GitHub discovery disabled (no token or package)")
             return []
         results: List[str] = []
         for q in queries:
-            try:
-                self._rate_sleep(0)
-                log.info("GH search: %s", q)
-                plist = self._gh.search_repositories(q, sort="updated", order="desc")
-                for repo in plist:  # PyGithub paginates lazily
-                    try:
-                        if not self._within_limits(repo):
-                            continue
-                        full = repo.full_name
-                        if full not in results:
-                            results.append(full)
+            page = 1
+            while len(results) < hard_cap:
+                try:
+                    log.info("GH search: %s (page %d)", q, page)
+                    data = self._http.get_json("search/repositories", {
+                        "q": q, "sort": "updated", "order": "desc", "per_page": 100, "page": page
+                    })
+                except GitHubHTTPError as ge:
+                    log.warning("GH search error: %s", ge)
+                    if ge.status in (403, 429):
+                        self._rate_sleep()
+                    break
+                items = data.get("items") or []
+                for item in items:
+                    full = item.get("full_name")
+                    if full and full not in results and self._within_limits(item):
+                        results.append(full)
                         if len(results) >= hard_cap:
                             return results
-                    except GithubException as ge:
-                        log.warning("GH repo iterate err: %s", ge)
-                        self._rate_sleep()
-                        continue
-            except GithubException as ge:
-                log.warning("GH search error: %s", ge)
-                self._rate_sleep()
-                continue
+                if len(items) < 100 or page * 100 >= min(int(data.get("total_count") or 0), 1000):
+                    break
+                page += 1
         return results
 
     # ----- Content fetch -----
     def fetch_repo_snapshot(self, full: str) -> Dict[str, str]:
         """Return a map of filename -> text for a small, relevant set."""
-        files: Dict[str, str] = {}
         if not self.enabled:
-            return files
+            return {}
         try:
-            repo = self._gh.get_repo(full)
-            # README
-            try:
-                rd = repo.get_readme()
-                files[rd.path] = rd.decoded_content.decode("utf-8", errors="ignore")
-            except Exception:
-                pass
-
-            candidates = [
-                "SECURITY.md", "CONTRIBUTING.md", "CODEOWNERS",
-                "Dockerfile", "docker/Dockerfile",
-                ".github/workflows/ci.yml", ".github/workflows/build.yml",
-                "requirements.txt", "pyproject.toml", "Pipfile",
-                "package.json", "pnpm-lock.yaml", "yarn.lock",
-            ]
-            for path in candidates:
-                try:
-                    c = repo.get_contents(path)
-                    if isinstance(c, list):
-                        continue
-                    files[path] = c.decoded_content.decode("utf-8", errors="ignore")
-                except Exception:
-                    continue
-        except GithubException as ge:
+            # README + candidates from one tree listing; unchanged repos cost two 304s
+            return self._http.fetch_files(full, SNAPSHOT_CANDIDATES)
+        except GitHubHTTPError as ge:
             log.warning("GH fetch snapshot error for %s: %s", full, ge)
-        return files
+        except Exception as e:
+            log.warning("GH fetch snapshot failed for %s: %s", full, e)
+        return {}
 
     # ----- Issues / PRs -----
     def create_issue(self, repo_full: str, title: str, body: str = "", labels: Optional[List[str]] = None) -> Optional[int]:
@@ -416,6 +454,7 @@ class GitHubClient:
 
 # Shared clients
 oai = OpenAIClient(OPENAI_API_KEY, OPENAI_ORG, OPENAI_PROJECT, OPENAI_MODEL)
+llm_cache = get_llm_cache()
 gh = GitHubClient(GITHUB_TOKEN, XMRT_DRY_RUN)
 
 # ============================
@@ -428,6 +467,7 @@ class SeenCache:
         self.ttl = timedelta(hours=max(1, ttl_hours))
         self._lock = threading.Lock()
         self._data: Dict[str, float] = {}
+        self._in_flight: set = set()
         self._load()
 
     def _load(self):
@@ -444,16 +484,36 @@ class SeenCache:
         except Exception:
             pass
 
+    def _due(self, full: str) -> bool:
+        # caller holds the lock
+        if full in self._in_flight:
+            return False
+        ts = self._data.get(full)
+        if ts is None:
+            return True
+        last = datetime.utcfromtimestamp(ts)
+        return datetime.utcnow() - last >= self.ttl
+
     def due(self, full: str) -> bool:
         with self._lock:
-            ts = self._data.get(full)
-            if ts is None:
-                return True
-            last = datetime.utcfromtimestamp(ts)
-            return datetime.utcnow() - last >= self.ttl
+            return self._due(full)
+
+    def claim(self, full: str) -> bool:
+        """Atomically check due and reserve the repo; mark() or release() ends the claim"""
+        with self._lock:
+            if not self._due(full):
+                return False
+            self._in_flight.add(full)
+            return True
+
+    def release(self, full: str):
+        """Drop a claim without marking (analysis failed; retry next cycle)"""
+        with self._lock:
+            self._in_flight.discard(full)
 
     def mark(self, full: str):
         with self._lock:
+            self._in_flight.discard(full)
             self._data[full] = time.time()
             self._save()
 
@@ -470,11 +530,73 @@ class InternalEvent:
         self.payload = payload or {}
         self.ts = time.time()
 
+class _EventTypeStats:
+    """Per-event-type counters and latency histograms"""
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.pending: "deque[tuple]" = deque()  # (priority, seq, event, dedup key)
+        self.running = 0
+        self.processed = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.wait_hist = [0] * (len(RULES_LATENCY_BUCKETS_MS) + 1)
+        self.run_hist = [0] * (len(RULES_LATENCY_BUCKETS_MS) + 1)
+
+    @property
+    def saturated(self) -> bool:
+        return self.limit is not None and self.running >= self.limit
+
+    def record(self, wait: float, run: float, failed: bool):
+        self.running -= 1
+        self.processed += 1
+        self.failed += failed
+        self.wait_hist[bisect.bisect_left(RULES_LATENCY_BUCKETS_MS, wait * 1000.0)] += 1
+        self.run_hist[bisect.bisect_left(RULES_LATENCY_BUCKETS_MS, run * 1000.0)] += 1
+
+    @staticmethod
+    def _buckets(hist: List[int]) -> Dict[str, int]:
+        labels = [f"<={ms}ms" for ms in RULES_LATENCY_BUCKETS_MS] + [f">{RULES_LATENCY_BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, hist))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self.pending),
+            "running": self.running,
+            "limit": self.limit,
+            "processed": self.processed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+            "queue_wait_ms": self._buckets(self.wait_hist),
+            "run_ms": self._buckets(self.run_hist),
+        }
+
 class RulesEngine:
-    def __init__(self):
+    """Priority event queue drained by a worker pool.
+
+    Identical events (same type and payload) are collapsed while one is
+    still pending or running, each type may be capped to a number of
+    concurrently running events, and the next event is always the
+    highest-priority pending one whose type has a free slot, so a capped
+    fan-out never holds up other work.
+    """
+    def __init__(self, workers: int = RULES_WORKERS, type_limits: Optional[Dict[str, int]] = None,
+                 priorities: Optional[Dict[str, int]] = None):
         self._rules: List[Callable[[InternalEvent], List[InternalEvent]]] = []
         self._actions: Dict[str, Callable[[InternalEvent], None]] = {}
-        self._q: "Queue[InternalEvent]" = Queue()
+        self.workers = max(1, workers)
+        self._type_limits = dict(RULES_TYPE_LIMITS if type_limits is None else type_limits)
+        self._priorities = dict(RULES_EVENT_PRIORITIES if priorities is None else priorities)
+        self._cv = threading.Condition()
+        self._types: Dict[str, _EventTypeStats] = {}
+        self._pending_keys: set = set()
+        self._queued = 0
+        self._running = 0
+        self._seq = 0
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self._started_at = time.time()
+        self._processed = 0
+        self._completions: "deque[float]" = deque(maxlen=10000)
 
     def register_rule(self, fn: Callable[[InternalEvent], List[InternalEvent]]):
         self._rules.append(fn)
@@ -482,35 +604,149 @@ class RulesEngine:
     def register_action(self, etype: str, fn: Callable[[InternalEvent], None]):
         self._actions[etype] = fn
 
-    def dispatch(self, ev: InternalEvent):
+    def _stats(self, etype: str) -> _EventTypeStats:
+        st = self._types.get(etype)
+        if st is None:
+            st = self._types[etype] = _EventTypeStats(self._type_limits.get(etype))
+        return st
+
+    def dispatch(self, ev: InternalEvent) -> bool:
+        """Queue an event; False if an identical one is already pending or running"""
+        key = (ev.etype, json.dumps(ev.payload, sort_keys=True, default=str))
+        with self._cv:
+            st = self._stats(ev.etype)
+            if key in self._pending_keys:
+                st.deduplicated += 1
+                log.debug("🔁 deduplicated: %s (role=%s)", ev.etype, ev.role)
+                return False
+            self._pending_keys.add(key)
+            self._seq += 1
+            st.pending.append((self._priorities.get(ev.etype, RULES_DEFAULT_PRIORITY), self._seq, ev, key))
+            self._queued += 1
+            self._cv.notify()
         log.info("📥 queued: %s (role=%s)", ev.etype, ev.role)
-        self._q.put(ev)
+        return True
 
-    def run_once(self) -> Optional[InternalEvent]:
-        try:
-            ev = self._q.get(timeout=0.25)
-        except Empty:
+    def _next_event(self) -> Optional[Tuple[InternalEvent, tuple]]:
+        """Pop the best runnable (event, dedup key); caller holds the condition"""
+        best: Optional[_EventTypeStats] = None
+        for st in self._types.values():
+            if st.pending and not st.saturated and (best is None or st.pending[0][:2] < best.pending[0][:2]):
+                best = st
+        if best is None:
             return None
+        _prio, _seq, ev, key = best.pending.popleft()
+        # The key stays in _pending_keys until _execute finishes
+        self._queued -= 1
+        best.running += 1
+        self._running += 1
+        return ev, key
+
+    def _execute(self, ev: InternalEvent, key: tuple):
+        started = time.time()
+        failed = False
+        try:
+            followups: List[InternalEvent] = []
+            for rule in self._rules:
+                try:
+                    followups.extend(rule(ev) or [])
+                except Exception as e:
+                    log.exception("Rule error on %s: %s", ev.etype, e)
 
-        followups: List[InternalEvent] = []
-        for rule in self._rules:
-            try:
-                followups.extend(rule(ev) or [])
-            except Exception as e:
-                log.exception("Rule error on %s: %s", ev.etype, e)
-
-        fn = self._actions.get(ev.etype)
-        if fn:
-            try:
-                fn(ev)
-            except Exception as e:
-                log.exception("Action error on %s: %s", ev.etype, e)
-        else:
-            log.warning("No action for %s", ev.etype)
-
-        for nxt in followups:
-            self.dispatch(nxt)
-        return ev
+            fn = self._actions.get(ev.etype)
+            if fn:
+                try:
+                    fn(ev)
+                except Exception as e:
+                    failed = True
+                    log.exception("Action error on %s: %s", ev.etype, e)
+            else:
+                log.warning("No action for %s", ev.etype)
+
+            for nxt in followups:
+                self.dispatch(nxt)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            finished = time.time()
+            with self._cv:
+                self._pending_keys.discard(key)
+                self._types[ev.etype].record(started - ev.ts, finished - started, failed)
+                self._running -= 1
+                self._processed += 1
+                self._completions.append(finished)
+                # A freed type slot may unblock events other workers skipped
+                self._cv.notify_all()
+
+    def run_once(self, timeout: float = 0.25) -> Optional[InternalEvent]:
+        """Process one event on the calling thread (None if nothing runnable)"""
+        deadline = time.time() + timeout
+        with self._cv:
+            nxt = self._next_event()
+            while nxt is None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._cv.wait(remaining)
+                nxt = self._next_event()
+        self._execute(*nxt)
+        return nxt[0]
+
+    def _worker(self):
+        while True:
+            with self._cv:
+                while True:
+                    if self._stopping:
+                        return
+                    nxt = self._next_event()
+                    if nxt is not None:
+                        break
+                    self._cv.wait()
+            self._execute(*nxt)
+
+    def start(self):
+        with self._cv:
+            if self._threads:
+                return
+            self._stopping = False
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"xmrt-rules-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for t in self._threads:
+            t.start()
+        log.info("Rules engine started (%d workers)", self.workers)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Let workers finish their current event and exit"""
+        with self._cv:
+            self._stopping = True
+            self._cv.notify_all()
+            threads, self._threads = self._threads, []
+        for t in threads:
+            t.join(timeout)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued or running; False on timeout"""
+        with self._cv:
+            return self._cv.wait_for(lambda: not self._queued and not self._running, timeout)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._cv:
+            now = time.time()
+            last_minute = sum(1 for t in self._completions if now - t <= 60)
+            uptime = max(now - self._started_at, 1e-9)
+            return {
+                "workers": self.workers,
+                "active_workers": len(self._threads),
+                "queued": self._queued,
+                "running": self._running,
+                "processed": self._processed,
+                "events_per_sec": round(last_minute / min(60.0, uptime), 3),
+                "events_per_sec_lifetime": round(self._processed / uptime, 3),
+                "by_type": {etype: st.to_dict() for etype, st in self._types.items()},
+            }
 
 coord_core = XMRTCoordinationCore()
 engine = RulesEngine()
@@ -522,13 +758,16 @@ engine = RulesEngine()
 def rule_on_coordination_request(ev: InternalEvent) -> List[InternalEvent]:
     if ev.etype != "coordination.request":
         return []
+    # Carries the LLM cache bypass from the trigger request down to each analysis
+    bypass = {"bypass_cache": True} if ev.payload.get("bypass_cache") else {}
     out: List[InternalEvent] = [
-        InternalEvent("analyze.repos.seed", "defi_specialist", {"repos": GITHUB_REPOS}),
+        InternalEvent("analyze.repos.seed", "defi_specialist", {"repos": GITHUB_REPOS, **bypass}),
     ]
     if GITHUB_GLOBAL_DISCOVERY and GITHUB_SEARCH_QUERIES:
         out.append(InternalEvent("discover.github", "eliza", {
             "queries": GITHUB_SEARCH_QUERIES,
-            "limit": GITHUB_MAX_REPOS_PER_CYCLE
+            "limit": GITHUB_MAX_REPOS_PER_CYCLE,
+            **bypass
         }))
     # Keep the builder fanout as before (safe, internal)
     out.extend([
@@ -543,7 +782,7 @@ engine.register_rule(rule_on_coordination_request)
 # Action Handlers
 # ============================
 
-def _oai_summary_for_repo(full: str, snapshot: Dict[str, str]) -> str:
+def _oai_summary_for_repo(full: str, snapshot: Dict[str, str], bypass_cache: bool = False) -> str:
     files_list = "\n".join(f"- {k}" for k in snapshot.keys()) or "(no files fetched)"
     content_excerpt = "\n\n".join(
         f"## {name}\n{(txt[:1200] + '...') if len(txt) > 1200 else txt}" for name, txt in list(snapshot.items())[:6]
@@ -564,7 +803,12 @@ def _oai_summary_for_repo(full: str, snapshot: Dict[str, str]) -> str:
             f"### Suggested Changes\n- ...\n"
         )},
     ]
-    return oai.chat(messages, temperature=0.2)
+    # Keyed on every fetched file's hash, not just the truncated excerpts
+    return llm_cache.get_or_call(
+        lambda: oai.chat(messages, temperature=0.2), oai.model, messages, temperature=0.2,
+        bypass=bypass_cache, cacheable=lambda text: not text.startswith("(OpenAI"),
+        repo=full, files={name: content_hash(txt) for name, txt in snapshot.items()},
+    )
 
 def _allow_action_on(full: str) -> bool:
     if not ALLOWLIST_ORGS:
@@ -577,32 +821,36 @@ def _allow_action_on(full: str) -> bool:
 def act_analyze_repos_seed(ev: InternalEvent):
     repos = list(dict.fromkeys(ev.payload.get("repos") or []))
     for full in repos:
-        if not seen.due(full):
-            log.info("Skip (cached TTL): %s", full)
+        # Claimed atomically: a concurrent analyze.repo for the same repo skips it
+        if not seen.claim(full):
+            log.info("Skip (cached TTL or in progress): %s", full)
             continue
-        snapshot = gh.fetch_repo_snapshot(full)
-        summary = _oai_summary_for_repo(full, snapshot)
-        log.info("[seed] Analyzed %s (summary.len=%d)", full, len(summary or ""))
-
-        if GITHUB_SAFE_MODE in ("issues", "prs") and _allow_action_on(full):
-            issue_no = gh.create_issue(
-                full,
-                title="XMRT Ecosystem Hardening & Integration Suggestions",
-                body=summary or "Automated analysis.",
-                labels=ISSUE_LABELS,
-            )
-            log.info("Issue result for %s: %s", full, issue_no)
+        try:
+            snapshot = gh.fetch_repo_snapshot(full)
+            summary = _oai_summary_for_repo(full, snapshot, bool(ev.payload.get("bypass_cache")))
+            log.info("[seed] Analyzed %s (summary.len=%d)", full, len(summary or ""))
 
-            if GITHUB_SAFE_MODE == "prs":
-                pr_url = gh.open_low_risk_pr(
+            if GITHUB_SAFE_MODE in ("issues", "prs") and _allow_action_on(full):
+                issue_no = gh.create_issue(
                     full,
-                    title="Add XMRT_SUGGESTIONS.md (hardening & integration)",
-                    body="Automated suggestions generated for hardening and XMRT integration.",
-                    filename="XMRT_SUGGESTIONS.md",
-                    contents=summary or "# Suggestions\n",
+                    title="XMRT Ecosystem Hardening & Integration Suggestions",
+                    body=summary or "Automated analysis.",
+                    labels=ISSUE_LABELS,
                 )
-                log.info("PR result for %s: %s", full, pr_url)
-        seen.mark(full)
+                log.info("Issue result for %s: %s", full, issue_no)
+
+                if GITHUB_SAFE_MODE == "prs":
+                    pr_url = gh.open_low_risk_pr(
+                        full,
+                        title="Add XMRT_SUGGESTIONS.md (hardening & integration)",
+                        body="Automated suggestions generated for hardening and XMRT integration.",
+                        filename="XMRT_SUGGESTIONS.md",
+                        contents=summary or "# Suggestions\n",
+                    )
+                    log.info("PR result for %s: %s", full, pr_url)
+            seen.mark(full)
+        finally:
+            seen.release(full)
 
 def act_discover_github(ev: InternalEvent):
     queries = ev.payload.get("queries") or []
@@ -615,40 +863,44 @@ def act_discover_github(ev: InternalEvent):
     for full in found:
         if not seen.due(full):
             continue
-        engine.dispatch(InternalEvent("analyze.repo", "defi_specialist", {"repo": full}))
+        payload = {"repo": full, "bypass_cache": True} if ev.payload.get("bypass_cache") else {"repo": full}
+        engine.dispatch(InternalEvent("analyze.repo", "defi_specialist", payload))
 
 def act_analyze_single_repo(ev: InternalEvent):
     full = str(ev.payload.get("repo"))
     if not full:
         return
-    if not seen.due(full):
-        log.info("Skip (cached TTL): %s", full)
+    if not seen.claim(full):
+        log.info("Skip (cached TTL or in progress): %s", full)
         return
 
-    snapshot = gh.fetch_repo_snapshot(full)
-    summary = _oai_summary_for_repo(full, snapshot)
-    log.info("[discover] Analyzed %s (summary.len=%d)", full, len(summary or ""))
-
-    if GITHUB_SAFE_MODE in ("issues", "prs") and _allow_action_on(full):
-        issue_no = gh.create_issue(
-            full,
-            title="XMRT Ecosystem Hardening & Integration Suggestions",
-            body=summary or "Automated analysis.",
-            labels=ISSUE_LABELS,
-        )
-        log.info("Issue result for %s: %s", full, issue_no)
+    try:
+        snapshot = gh.fetch_repo_snapshot(full)
+        summary = _oai_summary_for_repo(full, snapshot, bool(ev.payload.get("bypass_cache")))
+        log.info("[discover] Analyzed %s (summary.len=%d)", full, len(summary or ""))
 
-        if GITHUB_SAFE_MODE == "prs":
-            pr_url = gh.open_low_risk_pr(
+        if GITHUB_SAFE_MODE in ("issues", "prs") and _allow_action_on(full):
+            issue_no = gh.create_issue(
                 full,
-                title="Add XMRT_SUGGESTIONS.md (hardening & integration)",
-                body="Automated suggestions generated for hardening and XMRT integration.",
-                filename="XMRT_SUGGESTIONS.md",
-                contents=summary or "# Suggestions\n",
+                title="XMRT Ecosystem Hardening & Integration Suggestions",
+                body=summary or "Automated analysis.",
+                labels=ISSUE_LABELS,
             )
-            log.info("PR result for %s: %s", full, pr_url)
+            log.info("Issue result for %s: %s", full, issue_no)
+
+            if GITHUB_SAFE_MODE == "prs":
+                pr_url = gh.open_low_risk_pr(
+                    full,
+                    title="Add XMRT_SUGGESTIONS.md (hardening & integration)",
+                    body="Automated suggestions generated for hardening and XMRT integration.",
+                    filename="XMRT_SUGGESTIONS.md",
+                    contents=summary or "# Suggestions\n",
+                )
+                log.info("PR result for %s: %s", full, pr_url)
 
-    seen.mark(full)
+        seen.mark(full)
+    finally:
+        seen.release(full)
 
 # Keep builder actions from earlier iterations (safe within your org)
 MOBILE_OPTIMIZER_FILES = {
@@ -755,14 +1007,13 @@ def autonomous_worker_loop():
     log.info("Starting XMRT AUTONOMOUS WORKER")
     record_core_event_and_fanout("coordination.request", {"boot": True}, source="eliza")
 
+    engine.start()
+    last_processed = 0
     while True:
-        # Drain engine queue
-        processed = 0
-        while True:
-            ev = engine.run_once()
-            if ev is None:
-                break
-            processed += 1
+        # Let the worker pool drain the engine queue
+        engine.wait_idle()
+        total = engine.get_metrics()["processed"]
+        processed, last_processed = total - last_processed, total
 
         # Sleep with jitter
         interval = SCAN_INTERVAL_SECONDS + random.randint(-SCAN_JITTER_SECONDS, SCAN_JITTER_SECONDS)
@@ -800,7 +1051,11 @@ def health():
 @app.get("/api/coordination/status")
 def api_coord_status():
     try:
-        st = coord_core.get_system_status()
+        st = dict(coord_core.get_system_status())
+        st["rules_engine"] = engine.get_metrics()
+        st["openai"] = oai.get_metrics()
+        st["llm_cache"] = llm_cache.get_metrics()
+        st["github_http"] = gh._http.get_metrics() if gh._http else None
         return jsonify(success=True, data=st, timestamp=datetime.utcnow().isoformat()), 200
     except Exception as e:
         return jsonify(success=False, error=str(e)), 500
@@ -846,6 +1101,8 @@ def api_trigger_coordination():
         data = request.get_json(force=True, silent=True) or {}
         ev_type = str(data.get("event_type", "coordination.request"))
         payload = data.get("payload", {}) or {}
+        if request_bypasses_cache():
+            payload = {**payload, "bypass_cache": True}
         source = str(data.get("source", "eliza"))
         record_core_event_and_fanout(ev_type, payload, source)
         return jsonify(success=True, message="Coordination event queued"), 202
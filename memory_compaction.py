@@ -0,0 +1,347 @@
+"""
+Memory Compaction Engine
+Retention and compaction for the Enhanced Memory System: evicts memories by
+a keep-score combining age, importance and access count, merges near
+duplicates, rolls old learning metrics up into daily summaries and reclaims
+space with incremental VACUUM/ANALYZE. Work is done in small transactions
+grouped into bounded time slices so foreground writes are never starved.
+"""
+
+import json
+import time
+import uuid
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from memory_storage import INSERT_MEMORY_SQL, SQLiteMemoryStore
+
+logger = logging.getLogger(__name__)
+
+# Keep-score: higher means more worth keeping. A memory past retention is
+# evicted once its score drops below zero; over capacity, lowest scores go
+# first. Access saturates so a handful of hits matters, thousands don't
+# dominate.
+ACCESS_WEIGHT = 0.5
+AGE_WEIGHT = 0.5
+
+KEEP_SCORE_SQL = (
+    "(importance_score"
+    " + {access_weight} * (access_count / (access_count + 5.0))"
+    " - {age_weight} * ((julianday('now') - julianday(timestamp)) / {retention_days}))"
+)
+
+SUMMARY_MEMORY_TYPE = 'learning_metrics_summary'
+
+
+@dataclass
+class CompactionReport:
+    """Outcome of one compaction pass"""
+    started_at: str
+    duration_seconds: float = 0.0
+    completed: bool = False
+    slices: int = 0
+    expired: int = 0
+    evicted_for_capacity: int = 0
+    duplicates_merged: int = 0
+    metrics_rolled_up: int = 0
+    summaries_created: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    bytes_reclaimed: int = 0
+    phases: List[str] = field(default_factory=list)
+
+
+class MemoryCompactor:
+    """Time-sliced retention and compaction pass over a SQLiteMemoryStore
+
+    Each unit of work (one batch delete, one duplicate merge, one day of
+    metric rollup, one incremental vacuum step) is its own short
+    transaction. After ``slice_seconds`` of work the compactor sleeps for
+    ``pause_seconds`` so buffered foreground writes can take the writer
+    lock; an optional ``time_budget`` stops the pass early and the next
+    run resumes where it left off.
+    """
+
+    def __init__(self, store: SQLiteMemoryStore, vector_index=None,
+                 retention_days: float = 30, max_entries: int = 10000,
+                 duplicate_threshold: float = 0.95, batch_size: int = 500,
+                 slice_seconds: float = 0.05, pause_seconds: float = 0.01,
+                 vacuum_pages_per_step: int = 256):
+        self.store = store
+        self.vector_index = vector_index
+        self.retention_days = max(retention_days, 1)
+        self.max_entries = max_entries
+        self.duplicate_threshold = duplicate_threshold
+        self.batch_size = batch_size
+        self.slice_seconds = slice_seconds
+        self.pause_seconds = pause_seconds
+        self.vacuum_pages_per_step = vacuum_pages_per_step
+
+        # rowid of the last memory checked for near-duplicates
+        self._dedup_cursor = 0
+
+    def run(self, time_budget: Optional[float] = None) -> CompactionReport:
+        """Run every compaction phase, yielding to writers between slices"""
+        report = CompactionReport(started_at=datetime.utcnow().isoformat())
+        started = time.monotonic()
+        report.bytes_before = self._database_bytes()
+        self.store.flush()
+        self.store.flush_access()
+
+        phases = [
+            ('rollup_learning_metrics', self._rollup_learning_metrics),
+            ('expire', self._expire),
+            ('merge_duplicates', self._merge_duplicates),
+            ('enforce_capacity', self._enforce_capacity),
+            ('vacuum', self._vacuum),
+        ]
+
+        slice_started = time.monotonic()
+        report.slices = 1
+        try:
+            for name, phase in phases:
+                report.phases.append(name)
+                for _ in phase(report):
+                    if time_budget is not None and time.monotonic() - started >= time_budget:
+                        raise TimeoutError
+                    if time.monotonic() - slice_started >= self.slice_seconds:
+                        time.sleep(self.pause_seconds)
+                        slice_started = time.monotonic()
+                        report.slices += 1
+            report.completed = True
+        except TimeoutError:
+            logger.info("⏱️ Memory compaction hit its time budget, resuming next cycle")
+
+        report.bytes_after = self._database_bytes()
+        report.bytes_reclaimed = max(0, report.bytes_before - report.bytes_after)
+        report.duration_seconds = round(time.monotonic() - started, 4)
+        logger.info(
+            f"🧹 Memory compaction: {report.expired} expired, "
+            f"{report.evicted_for_capacity} evicted, {report.duplicates_merged} merged, "
+            f"{report.metrics_rolled_up} metrics rolled up, "
+            f"{report.bytes_reclaimed} bytes reclaimed in {report.duration_seconds}s"
+        )
+        return report
+
+    def _keep_score_sql(self) -> str:
+        return KEEP_SCORE_SQL.format(
+            access_weight=ACCESS_WEIGHT,
+            age_weight=AGE_WEIGHT,
+            retention_days=float(self.retention_days)
+        )
+
+    def _cutoff(self) -> str:
+        return (datetime.utcnow() - timedelta(days=self.retention_days)).isoformat()
+
+    def _delete_ids(self, ids: List[str]):
+        if not ids:
+            return
+        with self.store.transaction() as conn:
+            conn.executemany("DELETE FROM memories WHERE id = ?", [(i,) for i in ids])
+        if self.vector_index is not None:
+            self.vector_index.remove(ids)
+
+    # Phases. Each is a generator that yields after every unit of work.
+
+    def _rollup_learning_metrics(self, report: CompactionReport) -> Iterator[None]:
+        """Replace each expired day of learning_metrics with one summary memory"""
+        # Only whole days before the retention cutoff, so a day is summarised once
+        days = [row[0] for row in self.store.execute_read(
+            "SELECT DISTINCT substr(timestamp, 1, 10) FROM memories "
+            "WHERE memory_type = 'learning_metrics' AND timestamp < ?",
+            (self._cutoff()[:10],)
+        )]
+
+        for day in days:
+            next_day = (datetime.fromisoformat(day) + timedelta(days=1)).date().isoformat()
+            rows = self.store.execute_read(
+                "SELECT id, content FROM memories WHERE memory_type = 'learning_metrics' "
+                "AND timestamp >= ? AND timestamp < ?",
+                (day, next_day)
+            )
+            if not rows:
+                continue
+
+            fields: Dict[str, List[float]] = defaultdict(list)
+            for _, content in rows:
+                try:
+                    data = json.loads(content)
+                except (TypeError, ValueError):
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                for key, value in data.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        fields[key].append(float(value))
+
+            summary = {
+                'period': day,
+                'count': len(rows),
+                'fields': {
+                    key: {
+                        'min': min(values), 'max': max(values),
+                        'mean': sum(values) / len(values), 'sum': sum(values),
+                        'count': len(values)
+                    }
+                    for key, values in fields.items()
+                }
+            }
+            now = datetime.utcnow().isoformat()
+            ids = [row[0] for row in rows]
+
+            with self.store.transaction() as conn:
+                conn.execute(INSERT_MEMORY_SQL, (
+                    str(uuid.uuid4()), json.dumps(summary), SUMMARY_MEMORY_TYPE,
+                    f"{day}T00:00:00", 0.8, 0, now,
+                    json.dumps(["autonomous", "learning", "metrics", "summary"]), '[]',
+                    1.0, 'compaction', json.dumps({'rolled_up': len(ids), 'period': day})
+                ))
+                conn.executemany("DELETE FROM memories WHERE id = ?", [(i,) for i in ids])
+            if self.vector_index is not None:
+                self.vector_index.remove(ids)
+
+            report.metrics_rolled_up += len(ids)
+            report.summaries_created += 1
+            yield
+
+    def _merge_duplicates(self, report: CompactionReport) -> Iterator[None]:
+        """Fold near-duplicate memories (cosine >= threshold, same type) together"""
+        if self.vector_index is None:
+            return
+
+        while True:
+            rows = self.store.execute_read(
+                "SELECT rowid, id, content, memory_type FROM memories "
+                "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (self._dedup_cursor, self.batch_size)
+            )
+            if not rows:
+                return
+
+            for rowid, memory_id, content, memory_type in rows:
+                self._dedup_cursor = rowid
+                if memory_id not in self.vector_index:
+                    continue
+                matches = [
+                    match_id for match_id, score in self.vector_index.search(content, 5)
+                    if match_id != memory_id and score >= self.duplicate_threshold
+                ]
+                if matches and self._merge_into(memory_id, matches, memory_type):
+                    report.duplicates_merged += 1
+                yield
+
+    def _merge_into(self, memory_id: str, match_ids: List[str], memory_type: str) -> bool:
+        """Merge ``memory_id`` into its best same-type duplicate"""
+        rows = self.store.fetch_by_ids([memory_id] + match_ids, memory_type)
+        if len(rows) < 2:
+            return False
+
+        duplicate, candidates = rows[0], rows[1:]
+        survivor = max(candidates, key=lambda row: row[4] or 0.0)
+        if (duplicate[4] or 0.0) > (survivor[4] or 0.0):
+            survivor, duplicate = duplicate, survivor
+
+        tags = list(dict.fromkeys(json.loads(survivor[7] or '[]') + json.loads(duplicate[7] or '[]')))
+        relationships = list(dict.fromkeys(
+            json.loads(survivor[8] or '[]') + json.loads(duplicate[8] or '[]')
+        ))
+        metadata = json.loads(survivor[11] or '{}')
+        metadata.setdefault('merged_ids', []).append(duplicate[0])
+
+        with self.store.transaction() as conn:
+            conn.execute(
+                "UPDATE memories SET importance_score = ?, access_count = ?, "
+                "last_accessed = ?, tags = ?, relationships = ?, metadata = ? WHERE id = ?",
+                (
+                    max(survivor[4] or 0.0, duplicate[4] or 0.0),
+                    (survivor[5] or 0) + (duplicate[5] or 0),
+                    max(survivor[6] or '', duplicate[6] or ''),
+                    json.dumps(tags), json.dumps(relationships), json.dumps(metadata),
+                    survivor[0]
+                )
+            )
+            conn.execute("DELETE FROM memories WHERE id = ?", (duplicate[0],))
+        if self.vector_index is not None:
+            self.vector_index.remove([duplicate[0]])
+        return True
+
+    def _expire(self, report: CompactionReport) -> Iterator[None]:
+        """Evict memories past retention whose keep-score has gone negative
+
+        Rollup summaries are stamped with the day they cover, so they are
+        always past retention; they are exempt here and bounded only by
+        capacity.
+        """
+        sql = (
+            f"SELECT id FROM memories WHERE timestamp < ? AND memory_type != ? "
+            f"AND {self._keep_score_sql()} < 0 LIMIT ?"
+        )
+        while True:
+            ids = [row[0] for row in self.store.execute_read(
+                sql, (self._cutoff(), SUMMARY_MEMORY_TYPE, self.batch_size)
+            )]
+            if not ids:
+                return
+            self._delete_ids(ids)
+            report.expired += len(ids)
+            yield
+
+    def _enforce_capacity(self, report: CompactionReport) -> Iterator[None]:
+        """Evict the lowest keep-scores until the store fits max_entries"""
+        sql = f"SELECT id FROM memories ORDER BY {self._keep_score_sql()} ASC LIMIT ?"
+        while True:
+            excess = self.store.count() - self.max_entries
+            if excess <= 0:
+                return
+            ids = [row[0] for row in self.store.execute_read(sql, (min(excess, self.batch_size),))]
+            if not ids:
+                return
+            self._delete_ids(ids)
+            report.evicted_for_capacity += len(ids)
+            yield
+
+    def _vacuum(self, report: CompactionReport) -> Iterator[None]:
+        """Incremental vacuum, FTS segment merging and PRAGMA optimize"""
+        with self.store.exclusive() as conn:
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+        if auto_vacuum != 2:
+            # Legacy file created without incremental auto-vacuum: convert it
+            # once. This is the only step that rewrites the whole file.
+            with self.store.exclusive() as conn:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+                # VACUUM may renumber rowids of tables without an INTEGER
+                # PRIMARY KEY, so rebuild the external-content FTS index and
+                # rescan every row for duplicates on the next pass
+                with conn:
+                    conn.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+                self._dedup_cursor = 0
+            yield
+
+        while True:
+            with self.store.exclusive() as conn:
+                if conn.execute("PRAGMA freelist_count").fetchone()[0] == 0:
+                    break
+                conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages_per_step)})")
+            yield
+
+        # Merge FTS b-tree segments a little at a time
+        with self.store.transaction() as conn:
+            conn.execute("INSERT INTO memories_fts(memories_fts, rank) VALUES ('merge', 500)")
+        yield
+
+        with self.store.exclusive() as conn:
+            conn.execute("PRAGMA analysis_limit=1000")
+            conn.execute("PRAGMA optimize")
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        yield
+
+    def _database_bytes(self) -> int:
+        conn = self.store.connection()
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
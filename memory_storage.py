@@ -0,0 +1,622 @@
+"""
+Memory Storage Engine
+Pooled, WAL-mode SQLite backend for the Enhanced Memory System with
+per-thread connections, cached prepared statements, a write-behind
+buffer that groups inserts into batched transactions and an FTS5
+full-text index kept in sync with the memories table.
+"""
+
+import atexit
+import math
+import re
+import sqlite3
+import threading
+import time
+import logging
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+MEMORY_COLUMNS = (
+    'id', 'content', 'memory_type', 'timestamp', 'importance_score',
+    'access_count', 'last_accessed', 'tags', 'relationships',
+    'confidence_score', 'source', 'metadata'
+)
+
+CREATE_MEMORIES_SQL = """
+    CREATE TABLE IF NOT EXISTS memories (
+        id TEXT PRIMARY KEY,
+        content TEXT NOT NULL,
+        memory_type TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        importance_score REAL DEFAULT 0.5,
+        access_count INTEGER DEFAULT 0,
+        last_accessed TEXT,
+        tags TEXT,
+        relationships TEXT,
+        confidence_score REAL DEFAULT 1.0,
+        source TEXT DEFAULT 'system',
+        metadata TEXT
+    )
+"""
+
+INSERT_MEMORY_SQL = """
+    INSERT INTO memories
+    (id, content, memory_type, timestamp, importance_score, access_count,
+     last_accessed, tags, relationships, confidence_score, source, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Bulk imports are replayable: rows whose id already exists are skipped.
+# Only the id conflict is ignored; NOT NULL and other violations still raise
+INSERT_NEW_MEMORY_SQL = INSERT_MEMORY_SQL.rstrip() + "\n    ON CONFLICT(id) DO NOTHING\n"
+
+# Schema migrations applied in order; PRAGMA user_version records progress.
+# Version 1 adds the FTS5 index (external content over memories, kept in
+# sync by triggers), the memory_type index and backfills existing rows.
+SCHEMA_MIGRATIONS = [
+    [
+        """
+        CREATE INDEX IF NOT EXISTS idx_memories_type_rank
+        ON memories(memory_type, importance_score DESC, access_count DESC)
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+            content, memory_type,
+            content='memories', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts_vocab
+        USING fts5vocab(memories_fts, 'row')
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN
+            INSERT INTO memories_fts(rowid, content, memory_type)
+            VALUES (new.rowid, new.content, new.memory_type);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN
+            INSERT INTO memories_fts(memories_fts, rowid, content, memory_type)
+            VALUES ('delete', old.rowid, old.content, old.memory_type);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_au
+        AFTER UPDATE OF content, memory_type ON memories BEGIN
+            INSERT INTO memories_fts(memories_fts, rowid, content, memory_type)
+            VALUES ('delete', old.rowid, old.content, old.memory_type);
+            INSERT INTO memories_fts(rowid, content, memory_type)
+            VALUES (new.rowid, new.content, new.memory_type);
+        END
+        """,
+        # Backfill rows written before the index existed
+        "INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')",
+    ],
+    # Version 2: indexes used by retention/compaction scans
+    [
+        "CREATE INDEX IF NOT EXISTS idx_memories_timestamp ON memories(timestamp)",
+        """
+        CREATE INDEX IF NOT EXISTS idx_memories_type_timestamp
+        ON memories(memory_type, timestamp)
+        """,
+    ],
+]
+
+# Ranking: BM25 text relevance blended with importance and (saturating) usage.
+# FTS5's built-in bm25() walks every matching doclist to count documents, so
+# it gets slower as the table grows. Instead the newest matches are fetched in
+# rowid order (FTS5 streams these and stops early) and BM25 is scored in
+# Python over that bounded window using cached per-term document counts.
+# Very common terms therefore rank within the most recent matches only.
+FTS_CANDIDATE_MULTIPLIER = 20
+FTS_MIN_CANDIDATES = 300
+FTS_STATS_TTL = 300.0
+FTS_TERM_CACHE_SIZE = 10000  # terms with a cached document count (LRU)
+BM25_K1 = 1.2
+BM25_B = 0.75
+IMPORTANCE_WEIGHT = 2.0
+ACCESS_WEIGHT = 1.0
+
+SEARCH_FTS_SQL = """
+    SELECT m.* FROM (
+        SELECT rowid FROM memories_fts
+        WHERE memories_fts MATCH ?
+        ORDER BY rowid DESC LIMIT ?
+    ) AS c
+    JOIN memories AS m ON m.rowid = c.rowid
+    {type_filter}
+"""
+
+SEARCH_BY_TYPE_SQL = """
+    SELECT * FROM memories WHERE memory_type = ?
+    ORDER BY importance_score DESC, access_count DESC LIMIT ?
+"""
+
+SEARCH_ALL_SQL = """
+    SELECT * FROM memories
+    ORDER BY importance_score DESC, access_count DESC LIMIT ?
+"""
+
+TERM_DOC_COUNT_SQL = "SELECT doc FROM memories_fts_vocab WHERE term = ?"
+
+_TOKEN_PATTERN = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text the way the unicode61 FTS tokenizer does (case-folded)"""
+    return _TOKEN_PATTERN.findall((text or '').lower())
+
+
+def build_fts_query(text: str, memory_type: Optional[str] = None) -> Optional[str]:
+    """Turn free text into a safe FTS5 MATCH expression (all terms required)
+
+    Every token is quoted so user input can never inject FTS5 operators.
+    Returns None when the text contains no searchable tokens.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+
+    expression = 'content : (' + ' '.join(f'"{token}"' for token in tokens) + ')'
+    type_tokens = _TOKEN_PATTERN.findall(memory_type or '')
+    if type_tokens:
+        expression += ' AND memory_type : "' + ' '.join(type_tokens) + '"'
+    return expression
+
+
+UPDATE_ACCESS_SQL = """
+    UPDATE memories
+    SET access_count = access_count + ?,
+        last_accessed = MAX(COALESCE(last_accessed, ''), ?)
+    WHERE id = ?
+"""
+
+# Durability modes:
+#   'batched' - inserts are buffered and committed in grouped transactions
+#               (size- or time-triggered) with synchronous=NORMAL
+#   'strict'  - every insert is committed immediately with synchronous=FULL
+DURABILITY_MODES = ('batched', 'strict')
+
+
+class SQLiteMemoryStore:
+    """Thread-safe SQLite storage engine used by MemorySystem
+
+    Each thread gets its own long-lived connection (SQLite connections are
+    cheap to keep but expensive to open), all sharing one WAL-mode database
+    so readers never block the writer. Writes go through a write-behind
+    buffer that is flushed when it reaches ``write_buffer_size`` rows, when
+    ``flush_interval`` seconds have elapsed, or on an explicit ``flush()``.
+    Reads flush pending rows first so callers always see their own writes.
+    Read hits are counted in memory and applied in batches by
+    ``flush_access()`` on the same schedule.
+    """
+
+    def __init__(self, db_path: str, write_buffer_size: int = 100,
+                 flush_interval: float = 1.0, durability: str = 'batched',
+                 cached_statements: int = 128, busy_timeout_ms: int = 5000,
+                 access_buffer_size: int = 1000):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+
+        self.db_path = db_path
+        self.write_buffer_size = max(1, int(write_buffer_size))
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.cached_statements = cached_statements
+        self.busy_timeout_ms = busy_timeout_ms
+        self.access_buffer_size = max(1, int(access_buffer_size))
+
+        # Connection pool (one connection per thread)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Write-behind buffer
+        self._pending: List[Tuple[Any, ...]] = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Access tracking: id -> [hits, latest access timestamp], coalesced so
+        # reads never pay for a write
+        self._access: Dict[str, List[Any]] = {}
+        self._access_lock = threading.Lock()
+
+        # Cached corpus statistics for BM25: term -> (doc count, fetched at),
+        # least recently used terms evicted first
+        self._term_stats: 'OrderedDict[str, Tuple[int, float]]' = OrderedDict()
+        self._term_stats_lock = threading.Lock()
+        self._doc_total: Tuple[int, float] = (0, 0.0)
+
+        self.stats = {
+            'rows_written': 0,
+            'rows_dropped': 0,
+            'flushes': 0,
+            'connections_opened': 0,
+            'access_hits_recorded': 0,
+            'access_rows_updated': 0,
+            'access_flushes': 0
+        }
+
+    def open(self):
+        """Create the schema and start the background flusher"""
+        with self._write_lock:
+            conn = self.connection()
+            with conn:
+                conn.execute(CREATE_MEMORIES_SQL)
+            self._migrate(conn)
+
+        # The flusher also drains access counters, so it runs in strict mode too
+        if self.flush_interval:
+            self._flusher = threading.Thread(
+                target=self._flush_loop,
+                daemon=True,
+                name="MemoryStoreFlusher"
+            )
+            self._flusher.start()
+
+        atexit.register(self.close)
+        logger.info(f"✅ SQLite memory store opened ({self.durability}, WAL): {self.db_path}")
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Apply pending schema migrations (caller holds the write lock)"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target, statements in enumerate(SCHEMA_MIGRATIONS[version:], start=version + 1):
+            with conn:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version={target}")
+            logger.info(f"📦 Memory store schema migrated to v{target}")
+
+    def connection(self) -> sqlite3.Connection:
+        """Return this thread's pooled connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        # Must precede journal_mode=WAL, which writes the header of a new
+        # file; a no-op on existing databases, which the compactor converts
+        # with a one-off VACUUM
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "PRAGMA synchronous=FULL" if self.durability == 'strict'
+            else "PRAGMA synchronous=NORMAL"
+        )
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+
+        with self._connections_lock:
+            self._connections.append(conn)
+            self.stats['connections_opened'] += 1
+        return conn
+
+    def insert(self, row: Sequence[Any]):
+        """Queue a memory row (ordered as MEMORY_COLUMNS) for writing"""
+        if self.durability == 'strict':
+            self._write_rows([tuple(row)])
+            return
+
+        with self._buffer_lock:
+            self._pending.append(tuple(row))
+            should_flush = len(self._pending) >= self.write_buffer_size
+
+        if should_flush:
+            self.flush()
+
+    def insert_many(self, rows: Sequence[Sequence[Any]],
+                    ignore_duplicates: bool = False) -> Tuple[List[str], int]:
+        """Write a chunk of rows in one transaction, bypassing the buffer
+
+        With ``ignore_duplicates``, rows whose id is already stored (or
+        repeated earlier in the chunk) are skipped. A chunk that violates a
+        constraint is retried row by row and the failing rows are dropped.
+        Returns (ids actually inserted, rows dropped).
+        """
+        if not rows:
+            return [], 0
+        # Keep insertion order: anything already buffered goes first
+        self.flush()
+        rows = [tuple(row) for row in rows]
+        sql = INSERT_MEMORY_SQL
+        if ignore_duplicates:
+            seen = {row[0] for row in self.fetch_by_ids([row[0] for row in rows])}
+            fresh = []
+            for row in rows:
+                if row[0] not in seen:
+                    seen.add(row[0])
+                    fresh.append(row)
+            rows, sql = fresh, INSERT_NEW_MEMORY_SQL
+        if not rows:
+            return [], 0
+
+        try:
+            self._write_rows(rows, sql)
+            written = rows
+        except sqlite3.IntegrityError:
+            written = self._write_rows_individually(rows, sql)
+        return [row[0] for row in written], len(rows) - len(written)
+
+    def flush(self) -> int:
+        """Write all buffered rows in a single transaction; returns rows written"""
+        with self._buffer_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+
+        try:
+            return self._write_rows(batch)
+        except sqlite3.IntegrityError:
+            # A bad row must not poison the rest of the batch (or every later flush)
+            return len(self._write_rows_individually(batch))
+        except sqlite3.OperationalError:
+            # Busy/locked: put the batch back so a transient failure doesn't lose memories
+            with self._buffer_lock:
+                self._pending[:0] = batch
+            raise
+
+    def _write_rows_individually(self, rows: List[Tuple[Any, ...]],
+                                 sql: str = INSERT_MEMORY_SQL) -> List[Tuple[Any, ...]]:
+        """Retry a failed batch row by row, dropping rows that violate constraints"""
+        written = []
+        for row in rows:
+            try:
+                self._write_rows([row], sql)
+                written.append(row)
+            except sqlite3.IntegrityError as e:
+                self.stats['rows_dropped'] += 1
+                logger.error(f"❌ Dropping memory row {row[0]!r}: {e}")
+        return written
+
+    def record_access(self, ids: Sequence[str], accessed_at: str):
+        """Count a read hit for each id; applied later by flush_access()"""
+        if not ids:
+            return
+        with self._access_lock:
+            for memory_id in ids:
+                entry = self._access.get(memory_id)
+                if entry is None:
+                    self._access[memory_id] = [1, accessed_at]
+                else:
+                    entry[0] += 1
+                    if accessed_at > entry[1]:
+                        entry[1] = accessed_at
+            self.stats['access_hits_recorded'] += len(ids)
+            should_flush = len(self._access) >= self.access_buffer_size
+
+        if should_flush:
+            self.flush_access()
+
+    def flush_access(self) -> int:
+        """Apply buffered access hits as one batched UPDATE; returns rows touched"""
+        with self._access_lock:
+            if not self._access:
+                return 0
+            batch, self._access = self._access, {}
+
+        params = [(hits, accessed_at, memory_id) for memory_id, (hits, accessed_at) in batch.items()]
+        try:
+            # Rows may still be sitting in the write-behind buffer
+            self.flush()
+            with self._write_lock:
+                conn = self.connection()
+                with conn:
+                    conn.executemany(UPDATE_ACCESS_SQL, params)
+                self.stats['access_rows_updated'] += len(params)
+                self.stats['access_flushes'] += 1
+        except Exception:
+            with self._access_lock:
+                for memory_id, (hits, accessed_at) in batch.items():
+                    entry = self._access.setdefault(memory_id, [0, accessed_at])
+                    entry[0] += hits
+                    entry[1] = max(entry[1], accessed_at)
+            raise
+        return len(params)
+
+    def _write_rows(self, rows: List[Tuple[Any, ...]], sql: str = INSERT_MEMORY_SQL) -> int:
+        with self._write_lock:
+            conn = self.connection()
+            with conn:
+                written = conn.executemany(sql, rows).rowcount
+            self.stats['rows_written'] += written
+            self.stats['flushes'] += 1
+        return written
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer lock and run the block in one committed transaction"""
+        with self._write_lock:
+            conn = self.connection()
+            with conn:
+                yield conn
+
+    @contextmanager
+    def exclusive(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer lock without opening a transaction (VACUUM, PRAGMAs)"""
+        with self._write_lock:
+            yield self.connection()
+
+    def pending_count(self) -> int:
+        """Number of rows waiting in the write-behind buffer"""
+        with self._buffer_lock:
+            return len(self._pending)
+
+    def _flush_before_read(self):
+        """Flush so reads see their own writes; a failing flush must not fail the read"""
+        if self._pending:
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Reading without {self.pending_count()} buffered rows: {e}")
+
+    def execute_read(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        """Run a read query on this thread's connection after flushing pending writes"""
+        self._flush_before_read()
+        return self.connection().execute(sql, params).fetchall()
+
+    def execute_write(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run a single write statement in its own transaction; returns rowcount"""
+        with self._write_lock:
+            conn = self.connection()
+            with conn:
+                return conn.execute(sql, params).rowcount
+
+    def search(self, query: str, limit: int,
+               memory_type: Optional[str] = None) -> List[Tuple[Any, ...]]:
+        """Full-text search ranked by BM25 blended with importance and usage"""
+        match = build_fts_query(query, memory_type)
+        if match is None:
+            # Nothing to match on: list by rank, using the memory_type index
+            if memory_type:
+                return self.execute_read(SEARCH_BY_TYPE_SQL, (memory_type, limit))
+            return self.execute_read(SEARCH_ALL_SQL, (limit,))
+
+        sql = SEARCH_FTS_SQL.format(
+            type_filter="WHERE m.memory_type = ?" if memory_type else ""
+        )
+        candidates = max(FTS_MIN_CANDIDATES, limit * FTS_CANDIDATE_MULTIPLIER)
+        params: List[Any] = [match, candidates]
+        if memory_type:
+            params.append(memory_type)
+        rows = self.execute_read(sql, params)
+        if not rows:
+            return []
+
+        scores = self._bm25_scores(tokenize(query), [row[1] for row in rows])
+        ranked = sorted(
+            zip(rows, scores),
+            key=lambda item: (
+                item[1]
+                + IMPORTANCE_WEIGHT * (item[0][4] or 0.0)
+                + ACCESS_WEIGHT * (item[0][5] / (item[0][5] + 10.0))
+            ),
+            reverse=True
+        )
+        return [row for row, _ in ranked[:limit]]
+
+    def _bm25_scores(self, terms: List[str], contents: List[str]) -> List[float]:
+        """Okapi BM25 for each candidate document against the query terms"""
+        documents = [tokenize(content) for content in contents]
+        avg_length = (sum(len(doc) for doc in documents) / len(documents)) or 1.0
+        total_docs = self._cached_doc_total()
+        idf = {}
+        for term in set(terms):
+            doc_count = self._cached_term_doc_count(term)
+            idf[term] = math.log((total_docs - doc_count + 0.5) / (doc_count + 0.5) + 1.0)
+
+        scores = []
+        for doc in documents:
+            length_norm = BM25_K1 * (1.0 - BM25_B + BM25_B * len(doc) / avg_length)
+            frequencies = Counter(doc)
+            score = 0.0
+            for term, term_idf in idf.items():
+                tf = frequencies.get(term, 0)
+                if tf:
+                    score += term_idf * tf * (BM25_K1 + 1.0) / (tf + length_norm)
+            scores.append(score)
+        return scores
+
+    def _cached_doc_total(self) -> int:
+        total, fetched_at = self._doc_total
+        if time.monotonic() - fetched_at > FTS_STATS_TTL:
+            total = self.execute_read("SELECT COUNT(*) FROM memories")[0][0]
+            self._doc_total = (total, time.monotonic())
+        return max(total, 1)
+
+    def _cached_term_doc_count(self, term: str) -> int:
+        with self._term_stats_lock:
+            cached = self._term_stats.get(term)
+            if cached and time.monotonic() - cached[1] <= FTS_STATS_TTL:
+                self._term_stats.move_to_end(term)
+                return cached[0]
+        rows = self.execute_read(TERM_DOC_COUNT_SQL, (term,))
+        doc_count = rows[0][0] if rows else 0
+        with self._term_stats_lock:
+            self._term_stats[term] = (doc_count, time.monotonic())
+            self._term_stats.move_to_end(term)
+            while len(self._term_stats) > FTS_TERM_CACHE_SIZE:
+                self._term_stats.popitem(last=False)
+        return doc_count
+
+    def iter_read(self, sql: str, params: Sequence[Any] = (),
+                  batch_size: int = 1000) -> Iterator[List[Tuple[Any, ...]]]:
+        """Stream a read query in batches without materialising every row"""
+        self._flush_before_read()
+        cursor = self.connection().execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+    def fetch_by_ids(self, ids: Sequence[str],
+                     memory_type: Optional[str] = None) -> List[Tuple[Any, ...]]:
+        """Fetch memory rows by id, preserving the order of ``ids``"""
+        found: Dict[str, Tuple[Any, ...]] = {}
+        for start in range(0, len(ids), 500):
+            chunk = list(ids[start:start + 500])
+            sql = f"SELECT * FROM memories WHERE id IN ({','.join('?' * len(chunk))})"
+            if memory_type:
+                sql += " AND memory_type = ?"
+                chunk.append(memory_type)
+            for row in self.execute_read(sql, chunk):
+                found[row[0]] = row
+        return [found[memory_id] for memory_id in ids if memory_id in found]
+
+    def count(self) -> int:
+        """Total number of stored memories (including buffered rows)"""
+        return self.execute_read("SELECT COUNT(*) FROM memories")[0][0]
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.flush_access()
+            except Exception as e:
+                logger.error(f"❌ Memory store background flush failed: {e}")
+
+    def close(self):
+        """Flush pending writes, stop the flusher and close every pooled connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop_event.set()
+
+        try:
+            self.flush()
+            self.flush_access()
+        except Exception as e:
+            logger.error(f"❌ Final memory store flush failed: {e}")
+
+        if self._flusher and self._flusher.is_alive():
+            self._flusher.join(timeout=self.flush_interval + 1)
+
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
@@ -10,16 +10,19 @@ import time
 import json
 import logging
 import uuid
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import sqlite3
+from typing import Dict, Iterable, List, Any, Optional, Union
 from dataclasses import dataclass, asdict
 from collections import defaultdict
 
+from memory_storage import SQLiteMemoryStore
+from memory_vector_index import HashingVectorIndex, VECTOR_INDEX_AVAILABLE
+from memory_compaction import MemoryCompactor
+
 try:
     from supabase import create_client, Client
     import numpy as np
-    from sklearn.feature_extraction.text import TfidfVectorizer
     from sklearn.metrics.pairwise import cosine_similarity
     ADVANCED_FEATURES_AVAILABLE = True
 except ImportError:
@@ -82,8 +85,23 @@ class MemorySystem:
         # Advanced features
         self.similarity_threshold = config.get('similarity_threshold', 0.7)
         self.learning_rate = config.get('learning_rate', 0.1)
-        self.vectorizer = None
-        self.memory_vectors = {}
+        self.vector_index: Optional[HashingVectorIndex] = None
+        self.vector_index_path = config.get(
+            'vector_index_path', f"{self.local_db_path}.vectors.npz"
+        )
+        self.vector_features = config.get('vector_features', 2 ** 18)
+
+        # Storage engine (pooled WAL-mode SQLite with write-behind buffer)
+        self.store: Optional[SQLiteMemoryStore] = None
+        self.write_buffer_size = config.get('write_buffer_size', 100)
+        self.write_flush_interval = config.get('write_flush_interval', 1.0)
+        self.durability = config.get('durability', 'batched')
+
+        # Retention and compaction
+        self.compactor: Optional[MemoryCompactor] = None
+        self.duplicate_threshold = config.get('duplicate_threshold', 0.95)
+        self.compaction_time_budget = config.get('compaction_time_budget', 30.0)
+        self.optimization_interval = config.get('optimization_interval', 3600)
 
         # Background processing
         self.background_thread = None
@@ -105,10 +123,19 @@ class MemorySystem:
                 self._initialize_local_db()
 
             # Initialize advanced features
-            if ADVANCED_FEATURES_AVAILABLE and self.pattern_recognition_enabled:
-                self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+            if VECTOR_INDEX_AVAILABLE and self.pattern_recognition_enabled and self.store:
+                self._initialize_vector_index()
                 logger.info("✅ Advanced pattern recognition enabled")
 
+            if self.store:
+                self.compactor = MemoryCompactor(
+                    self.store,
+                    vector_index=self.vector_index,
+                    retention_days=self.memory_retention_days,
+                    max_entries=self.max_memory_entries,
+                    duplicate_threshold=self.duplicate_threshold
+                )
+
             # Load existing memories and patterns
             self._load_existing_data()
 
@@ -139,36 +166,52 @@ class MemorySystem:
             return False
 
     def _initialize_local_db(self):
-        """Initialize local SQLite database"""
+        """Initialize local SQLite storage engine"""
         try:
-            conn = sqlite3.connect(self.local_db_path)
-            cursor = conn.cursor()
-
-            # Create memories table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS memories (
-                    id TEXT PRIMARY KEY,
-                    content TEXT NOT NULL,
-                    memory_type TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    importance_score REAL DEFAULT 0.5,
-                    access_count INTEGER DEFAULT 0,
-                    last_accessed TEXT,
-                    tags TEXT,
-                    relationships TEXT,
-                    confidence_score REAL DEFAULT 1.0,
-                    source TEXT DEFAULT 'system',
-                    metadata TEXT
-                )
-            """)
-
-            conn.commit()
-            conn.close()
+            self.store = SQLiteMemoryStore(
+                self.local_db_path,
+                write_buffer_size=self.write_buffer_size,
+                flush_interval=self.write_flush_interval,
+                durability=self.durability
+            )
+            self.store.open()
             logger.info("✅ Local SQLite database initialized")
 
         except Exception as e:
             logger.error(f"❌ Local database initialization failed: {e}")
 
+    def _initialize_vector_index(self):
+        """Load the persisted vector index and catch up with the database"""
+        try:
+            self.vector_index = HashingVectorIndex(
+                n_features=self.vector_features,
+                path=self.vector_index_path
+            )
+            self.vector_index.load()
+
+            if len(self.vector_index) != self.store.count():
+                self._sync_vector_index()
+
+        except Exception as e:
+            logger.error(f"❌ Vector index initialization failed: {e}")
+            self.vector_index = None
+
+    def _sync_vector_index(self):
+        """Index memories missing from the vector index and drop stale entries"""
+        stored_ids = set()
+        added = 0
+        for rows in self.store.iter_read("SELECT id, content FROM memories"):
+            missing = [(row[0], row[1]) for row in rows if row[0] not in self.vector_index]
+            stored_ids.update(row[0] for row in rows)
+            if missing:
+                self.vector_index.add([m[0] for m in missing], [m[1] for m in missing])
+                added += len(missing)
+
+        stale = [memory_id for memory_id in self.vector_index.ids() if memory_id not in stored_ids]
+        self.vector_index.remove(stale)
+        self.vector_index.save()
+        logger.info(f"🔄 Vector index synced: {added} added, {len(stale)} removed")
+
     def store_memory(self, content: str, memory_type: str = "general", 
                     importance: float = 0.5, tags: List[str] = None,
                     metadata: Dict[str, Any] = None) -> str:
@@ -204,29 +247,166 @@ class MemorySystem:
             logger.error(f"❌ Failed to store memory: {e}")
             return None
 
+    def store_memories_bulk(self, memories: Iterable[Union[Dict[str, Any], MemoryEntry]],
+                            chunk_size: int = 1000) -> Dict[str, Any]:
+        """Store many memories from any iterable (including generators)
+
+        Items are MemoryEntry objects or dicts with at least ``content`` and
+        optionally ``memory_type``, ``importance``, ``tags``, ``metadata``,
+        ``timestamp``, ``source`` and ``id``. Memories are written in chunked
+        executemany transactions and indexed a chunk at a time, so memory use
+        stays bounded by ``chunk_size`` regardless of the input size. Ids that
+        already exist are skipped, so imports can be replayed safely.
+        """
+        stats = {'stored': 0, 'duplicates': 0, 'failed': 0, 'chunks': 0}
+        started = time.perf_counter()
+        iterator = iter(memories)
+
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+
+            entries = []
+            for item in chunk:
+                try:
+                    entries.append(item if isinstance(item, MemoryEntry) else self._entry_from_dict(item))
+                except Exception as e:
+                    stats['failed'] += 1
+                    logger.debug(f"Skipping invalid memory: {e}")
+
+            try:
+                if self.is_connected_flag and self.supabase_client:
+                    for entry in entries:
+                        self._store_memory_supabase(entry)
+                    stats['stored'] += len(entries)
+                else:
+                    inserted, dropped = self.store.insert_many(
+                        [self._memory_to_row(entry) for entry in entries],
+                        ignore_duplicates=True
+                    )
+                    if self.vector_index is not None and inserted:
+                        # Index only rows that were written, each id once
+                        by_id = {}
+                        for entry in entries:
+                            by_id.setdefault(entry.id, entry)
+                        self.vector_index.add(inserted, [by_id[memory_id].content for memory_id in inserted])
+                    stats['stored'] += len(inserted)
+                    stats['failed'] += dropped
+                    stats['duplicates'] += len(entries) - len(inserted) - dropped
+            except Exception as e:
+                stats['failed'] += len(entries)
+                logger.error(f"❌ Bulk memory chunk failed: {e}")
+            stats['chunks'] += 1
+
+        elapsed = time.perf_counter() - started
+        stats['elapsed_seconds'] = round(elapsed, 4)
+        stats['memories_per_second'] = round(stats['stored'] / elapsed, 1) if elapsed > 0 else 0.0
+
+        self.performance_metrics['total_memories'] += stats['stored']
+        self.usage_analytics['memories_stored'] += stats['stored']
+        logger.info(
+            f"💾 Bulk stored {stats['stored']} memories "
+            f"({stats['memories_per_second']}/s, {stats['failed']} failed)"
+        )
+        return stats
+
+    @staticmethod
+    def _entry_from_dict(data: Dict[str, Any]) -> MemoryEntry:
+        """Build a MemoryEntry from a loosely-shaped import record"""
+        content = data['content']
+        if content is None:
+            raise ValueError("memory content is required")
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        return MemoryEntry(
+            id=str(data.get('id') or uuid.uuid4()),
+            content=content,
+            memory_type=data.get('memory_type') or 'general',
+            timestamp=data.get('timestamp') or datetime.utcnow().isoformat(),
+            importance_score=float(data.get('importance', data.get('importance_score', 0.5))),
+            access_count=int(data.get('access_count', 0)),
+            last_accessed=data.get('last_accessed'),
+            tags=list(data.get('tags') or []),
+            relationships=list(data.get('relationships') or []),
+            confidence_score=float(data.get('confidence_score', 1.0)),
+            source=data.get('source', 'import'),
+            metadata=dict(data.get('metadata') or {})
+        )
+
     def query_memories(self, query: str, limit: int = 10, 
                       memory_type: str = None) -> List[MemoryEntry]:
         """Advanced memory querying with semantic search"""
         try:
             results = []
 
-            # Keyword-based search
+            # Keyword-based search (already ranked by relevance, importance and usage)
             keyword_results = self._keyword_search(query, limit, memory_type)
             results.extend(keyword_results)
 
-            # Sort by relevance and importance
-            results.sort(key=lambda x: (x.importance_score, -x.access_count), reverse=True)
+            results = results[:limit]
+            self._record_access(results)
 
             # Update analytics
             self.usage_analytics['queries_executed'] += 1
 
             logger.info(f"🔍 Query '{query}' returned {len(results)} results")
-            return results[:limit]
+            return results
 
         except Exception as e:
             logger.error(f"❌ Failed to query memories: {e}")
             return []
 
+    def search_similar_memories(self, query: str, limit: int = 10,
+                                memory_type: str = None) -> List[MemoryEntry]:
+        """Semantic search by cosine similarity over the vector index"""
+        if self.vector_index is None:
+            return self.query_memories(query, limit, memory_type)
+
+        try:
+            # Over-fetch when filtering by type since the index is type-agnostic
+            k = limit * 5 if memory_type else limit
+            matches = self.vector_index.search(query, k)
+            rows = self.store.fetch_by_ids([memory_id for memory_id, _ in matches], memory_type)
+
+            results = [self._row_to_memory(row) for row in rows[:limit]]
+            self._record_access(results)
+
+            self.usage_analytics['semantic_queries_executed'] += 1
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ Semantic search failed: {e}")
+            return []
+
+    def retrieve_memory(self, memory_id: str) -> Optional[MemoryEntry]:
+        """Fetch a single memory by ID"""
+        try:
+            rows = self.store.fetch_by_ids([memory_id]) if self.store else []
+            if not rows:
+                self.performance_metrics['failed_retrievals'] += 1
+                return None
+
+            memory = self._row_to_memory(rows[0])
+            self._record_access([memory])
+            self.performance_metrics['successful_retrievals'] += 1
+            return memory
+
+        except Exception as e:
+            logger.error(f"❌ Failed to retrieve memory {memory_id}: {e}")
+            self.performance_metrics['failed_retrievals'] += 1
+            return None
+
+    def _record_access(self, memories: List[MemoryEntry]):
+        """Buffer access hits; the store applies them in one batched UPDATE"""
+        if not memories or not self.store:
+            return
+        try:
+            self.store.record_access([memory.id for memory in memories],
+                                     datetime.utcnow().isoformat())
+        except Exception as e:
+            logger.error(f"❌ Failed to record memory access: {e}")
+
     def _keyword_search(self, query: str, limit: int, 
                        memory_type: str = None) -> List[MemoryEntry]:
         """Perform keyword-based search"""
@@ -237,45 +417,58 @@ class MemorySystem:
             return []
 
     def _keyword_search_local(self, query: str, limit: int, memory_type: str) -> List[MemoryEntry]:
-        """Keyword search in local SQLite"""
+        """Full-text search in local SQLite (FTS5, BM25-ranked)"""
         try:
-            conn = sqlite3.connect(self.local_db_path)
-            cursor = conn.cursor()
-
-            # Build query with optional memory type filter
-            sql_query = "SELECT * FROM memories WHERE content LIKE ?"
-            params = [f'%{query}%']
+            rows = self.store.search(query, limit, memory_type)
+            return [self._row_to_memory(row) for row in rows]
 
-            if memory_type:
-                sql_query += " AND memory_type = ?"
-                params.append(memory_type)
-
-            sql_query += " ORDER BY importance_score DESC, access_count DESC LIMIT ?"
-            params.append(limit)
-
-            cursor.execute(sql_query, params)
-            rows = cursor.fetchall()
-            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Local keyword search failed: {e}")
+            return []
 
-            # Convert to MemoryEntry objects
-            results = []
-            for row in rows:
-                memory_data = {
-                    'id': row[0], 'content': row[1], 'memory_type': row[2],
-                    'timestamp': row[3], 'importance_score': row[4],
-                    'access_count': row[5], 'last_accessed': row[6],
-                    'tags': json.loads(row[7] or '[]'),
-                    'relationships': json.loads(row[8] or '[]'),
-                    'confidence_score': row[9], 'source': row[10],
-                    'metadata': json.loads(row[11] or '{}')
-                }
-                results.append(MemoryEntry(**memory_data))
+    @staticmethod
+    def _row_to_memory(row) -> MemoryEntry:
+        """Convert a memories table row into a MemoryEntry"""
+        return MemoryEntry(
+            id=row[0], content=row[1], memory_type=row[2],
+            timestamp=row[3], importance_score=row[4],
+            access_count=row[5], last_accessed=row[6],
+            tags=json.loads(row[7] or '[]'),
+            relationships=json.loads(row[8] or '[]'),
+            confidence_score=row[9], source=row[10],
+            metadata=json.loads(row[11] or '{}')
+        )
 
-            return results
+    @staticmethod
+    def _memory_to_row(memory: MemoryEntry) -> tuple:
+        """Convert a MemoryEntry into a memories table row"""
+        return (
+            memory.id, memory.content, memory.memory_type, memory.timestamp,
+            memory.importance_score, memory.access_count, memory.last_accessed,
+            json.dumps(memory.tags), json.dumps(memory.relationships),
+            memory.confidence_score, memory.source, json.dumps(memory.metadata)
+        )
 
+    def flush(self) -> int:
+        """Force buffered memory writes and access counts to disk; returns rows written"""
+        if not self.store:
+            return 0
+        try:
+            written = self.store.flush()
+            self.store.flush_access()
+            return written
         except Exception as e:
-            logger.error(f"❌ Local keyword search failed: {e}")
-            return []
+            logger.error(f"❌ Memory flush failed: {e}")
+            return 0
+
+    def close(self):
+        """Stop background processing and flush/close the storage engine"""
+        self.is_processing = False
+        self._save_vector_index()
+        if self.store:
+            self.store.close()
+            self.store = None
+        logger.info("🛑 Memory system closed")
 
     def analyze_usage_patterns(self) -> Dict[str, Any]:
         """Analyze memory usage patterns and provide insights"""
@@ -397,8 +590,8 @@ class MemorySystem:
         """Background processing loop for memory optimization"""
         while self.is_processing:
             try:
-                # Run optimization every hour
-                time.sleep(3600)
+                # Run optimization every hour (by default)
+                time.sleep(self.optimization_interval)
 
                 if self.is_processing:  # Check again after sleep
                     self._optimize_storage()
@@ -407,10 +600,30 @@ class MemorySystem:
                 logger.error(f"❌ Background processing error: {e}")
                 time.sleep(300)  # Wait 5 minutes on error
 
+    def _save_vector_index(self):
+        """Persist the vector index if it changed since the last save"""
+        if self.vector_index is None or not self.vector_index.dirty:
+            return
+        try:
+            self.vector_index.save()
+        except Exception as e:
+            logger.error(f"❌ Vector index save failed: {e}")
+
+    def compact_storage(self, time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Run a retention/compaction pass and return its report"""
+        if not self.compactor:
+            return {}
+        report = asdict(self.compactor.run(time_budget=time_budget))
+        self.performance_metrics['total_memories'] = self.store.count()
+        self.performance_metrics['last_compaction'] = report
+        return report
+
     def _optimize_storage(self):
         """Optimize memory storage"""
         try:
-            # Basic optimization - could be expanded
+            if self.auto_cleanup_enabled:
+                self.compact_storage(time_budget=self.compaction_time_budget)
+            self._save_vector_index()
             self.performance_metrics['optimization_cycles'] += 1
             logger.info("🔧 Memory storage optimized")
         except Exception as e:
@@ -422,25 +635,11 @@ class MemorySystem:
         pass
 
     def _store_memory_local(self, memory: MemoryEntry):
-        """Store memory in local SQLite"""
+        """Store memory in local SQLite (buffered by the storage engine)"""
         try:
-            conn = sqlite3.connect(self.local_db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT INTO memories 
-                (id, content, memory_type, timestamp, importance_score, access_count,
-                 last_accessed, tags, relationships, confidence_score, source, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                memory.id, memory.content, memory.memory_type, memory.timestamp,
-                memory.importance_score, memory.access_count, memory.last_accessed,
-                json.dumps(memory.tags), json.dumps(memory.relationships),
-                memory.confidence_score, memory.source, json.dumps(memory.metadata)
-            ))
-
-            conn.commit()
-            conn.close()
+            self.store.insert(self._memory_to_row(memory))
+            if self.vector_index is not None:
+                self.vector_index.add([memory.id], [memory.content])
 
         except Exception as e:
             logger.error(f"❌ Local storage failed: {e}")
@@ -448,13 +647,11 @@ class MemorySystem:
     def _load_existing_data(self):
         """Load existing memories and patterns"""
         try:
+            if not self.store:
+                return
             # Count existing memories
-            conn = sqlite3.connect(self.local_db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM memories")
-            count = cursor.fetchone()[0]
+            count = self.store.count()
             self.performance_metrics['total_memories'] = count
-            conn.close()
             logger.info(f"📊 Loaded {count} existing memories")
         except Exception as e:
             logger.error(f"❌ Failed to load existing data: {e}")
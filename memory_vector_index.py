@@ -0,0 +1,262 @@
+"""
+Memory Vector Index
+Incrementally updated sparse vector index for semantic memory search.
+
+Documents are embedded with a stable hashing vectorizer (unigrams and
+bigrams hashed with CRC32 into a fixed feature space), so new memories
+never force a vocabulary refit. Document frequencies are maintained per
+hashed feature and applied as IDF weights to the query at search time.
+Top-k cosine search is a single sparse matrix-vector product.
+"""
+
+import os
+import re
+import threading
+import logging
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+    VECTOR_INDEX_AVAILABLE = True
+except ImportError:
+    VECTOR_INDEX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+class HashingVectorIndex:
+    """Sparse hashed TF-IDF index with incremental adds and removals
+
+    Rows are L2-normalised sublinear term frequencies; the query vector is
+    weighted by IDF from the running document frequencies, so scores rank
+    rare shared terms above common ones without re-vectorising the corpus.
+    Removed rows are masked and physically dropped on ``compact()``/``save()``.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, path: Optional[str] = None,
+                 ngram_range: Tuple[int, int] = (1, 2)):
+        if not VECTOR_INDEX_AVAILABLE:
+            raise RuntimeError("numpy and scipy are required for the vector index")
+
+        self.n_features = n_features
+        self.path = path
+        self.ngram_range = ngram_range
+
+        self._lock = threading.RLock()
+        # Rows live in size-tiered CSR segments (one large base plus small
+        # recent ones) so adds never copy the whole matrix
+        self._segments: List["sparse.csr_matrix"] = []
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._alive = np.zeros(1024, dtype=bool)
+        self._doc_freq = np.zeros(n_features, dtype=np.int64)
+        self._live_count = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._positions
+
+    def ids(self) -> List[str]:
+        """Ids of all live (non-removed) memories in the index"""
+        with self._lock:
+            return list(self._positions)
+
+    def _features(self, text: str) -> Dict[int, float]:
+        tokens = _TOKEN_PATTERN.findall((text or '').lower())
+        counts: Dict[int, float] = {}
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(tokens) - n + 1):
+                gram = ' '.join(tokens[i:i + n]).encode('utf-8')
+                feature = zlib.crc32(gram) % self.n_features
+                counts[feature] = counts.get(feature, 0.0) + 1.0
+        return counts
+
+    def _vectorize(self, texts: Sequence[str]) -> "sparse.csr_matrix":
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for text in texts:
+            counts = self._features(text)
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+
+        values = np.log1p(np.asarray(data, dtype=np.float32))  # sublinear tf
+        bounds = np.asarray(indptr, dtype=np.int64)
+        lengths = np.diff(bounds)
+
+        # L2-normalise each row in place on the flat data array
+        squares = np.zeros(len(texts), dtype=np.float32)
+        nonempty = lengths > 0
+        if values.size:
+            squares[nonempty] = np.add.reduceat(values * values, bounds[:-1][nonempty])
+        norms = np.sqrt(squares)
+        norms[norms == 0] = 1.0
+        values /= np.repeat(norms, lengths)
+
+        return sparse.csr_matrix(
+            (values, np.asarray(indices, dtype=np.int32), bounds),
+            shape=(len(texts), self.n_features)
+        )
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]):
+        """Index new memories; existing ids are replaced"""
+        if not ids:
+            return
+        rows = self._vectorize(texts)
+        with self._lock:
+            self.remove([memory_id for memory_id in ids if memory_id in self._positions])
+            start = len(self._ids)
+            for offset, memory_id in enumerate(ids):
+                self._positions[memory_id] = start + offset
+            self._ids.extend(ids)
+            self._ensure_capacity(len(self._ids))
+            self._alive[start:len(self._ids)] = True
+            np.add.at(self._doc_freq, rows.indices, 1)
+            self._segments.append(rows)
+            self._live_count += len(ids)
+            self._merge_segments()
+            self.dirty = True
+
+    def remove(self, ids: Iterable[str]):
+        """Mask memories out of the index (dropped for good on compaction)"""
+        with self._lock:
+            for memory_id in ids:
+                position = self._positions.pop(memory_id, None)
+                if position is None:
+                    continue
+                self._alive[position] = False
+                np.subtract.at(self._doc_freq, self._row(position).indices, 1)
+                self._live_count -= 1
+                self.dirty = True
+
+    def _ensure_capacity(self, size: int):
+        if size > len(self._alive):
+            grown = np.zeros(max(size, 2 * len(self._alive)), dtype=bool)
+            grown[:len(self._alive)] = self._alive
+            self._alive = grown
+
+    def _row(self, position: int) -> "sparse.csr_matrix":
+        offset = 0
+        for segment in self._segments:
+            if position < offset + segment.shape[0]:
+                return segment.getrow(position - offset)
+            offset += segment.shape[0]
+        raise IndexError(position)
+
+    def _merge_segments(self):
+        """Keep the segment count small without rewriting the base on every add"""
+        if len(self._segments) <= 1:
+            return
+        base_rows = self._segments[0].shape[0]
+        tail_rows = sum(segment.shape[0] for segment in self._segments[1:])
+        if tail_rows >= max(4096, base_rows // 8):
+            self._segments = [sparse.vstack(self._segments, format='csr')]
+        elif len(self._segments) > 17:
+            self._segments = [self._segments[0], sparse.vstack(self._segments[1:], format='csr')]
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k memories by cosine similarity to ``text``"""
+        query = self._vectorize([text])
+        if query.nnz == 0:
+            return []
+
+        with self._lock:
+            if self._live_count == 0:
+                return []
+
+            total = max(self._live_count, 1)
+            idf = np.log((1.0 + total) / (1.0 + self._doc_freq[query.indices])) + 1.0
+            weights = query.data * idf
+            weights /= np.linalg.norm(weights) or 1.0
+            query_vector = np.zeros(self.n_features, dtype=np.float32)
+            query_vector[query.indices] = weights
+
+            scores = np.concatenate([segment @ query_vector for segment in self._segments])
+            scores[~self._alive[:len(self._ids)]] = -np.inf
+
+            k = min(k, self._live_count)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def compact(self):
+        """Physically drop removed rows and renumber positions"""
+        with self._lock:
+            if len(self._segments) > 1:
+                self._segments = [sparse.vstack(self._segments, format='csr')]
+            if self._live_count == len(self._ids):
+                return
+            keep = np.flatnonzero(self._alive[:len(self._ids)])
+            self._segments = [self._segments[0][keep]]
+            self._ids = [self._ids[i] for i in keep]
+            self._positions = {memory_id: i for i, memory_id in enumerate(self._ids)}
+            self._alive = np.zeros(max(1024, len(self._ids)), dtype=bool)
+            self._alive[:len(self._ids)] = True
+            self.dirty = True
+
+    def save(self, path: Optional[str] = None):
+        """Persist the index next to the SQLite file (atomic replace)"""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            self.compact()
+            matrix = (self._segments[0] if self._segments
+                      else sparse.csr_matrix((0, self.n_features), dtype=np.float32))
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as handle:
+                np.savez(
+                    handle,
+                    data=matrix.data,
+                    indices=matrix.indices,
+                    indptr=matrix.indptr,
+                    ids=np.asarray(self._ids, dtype=str),
+                    doc_freq=self._doc_freq,
+                    n_features=np.asarray([self.n_features])
+                )
+            os.replace(tmp_path, path)
+            self.dirty = False
+        logger.info(f"💾 Vector index saved: {len(self._ids)} memories -> {path}")
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """Load a persisted index; returns False if missing or incompatible"""
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                if int(stored['n_features'][0]) != self.n_features:
+                    logger.warning("⚠️ Vector index feature size changed, rebuilding")
+                    return False
+                ids = [str(memory_id) for memory_id in stored['ids']]
+                matrix = sparse.csr_matrix(
+                    (stored['data'], stored['indices'], stored['indptr']),
+                    shape=(len(ids), self.n_features)
+                )
+                doc_freq = stored['doc_freq'].astype(np.int64)
+        except Exception as e:
+            logger.error(f"❌ Failed to load vector index: {e}")
+            return False
+
+        with self._lock:
+            self._segments = [matrix]
+            self._ids = ids
+            self._positions = {memory_id: i for i, memory_id in enumerate(ids)}
+            self._alive = np.zeros(max(1024, len(ids)), dtype=bool)
+            self._alive[:len(ids)] = True
+            self._doc_freq = doc_freq
+            self._live_count = len(ids)
+            self.dirty = False
+        logger.info(f"📊 Vector index loaded: {len(ids)} memories")
+        return True
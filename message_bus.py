@@ -0,0 +1,317 @@
+"""
+XMRT-Ecosystem: A2A Message Bus
+Sharded, priority-aware message delivery between agents.
+
+Every subscriber owns a bounded mailbox with one FIFO lane per priority,
+so a critical message is delivered before any bulk traffic already queued
+for that agent. Subscribers are spread over a fixed number of shards by a
+stable hash of their id; each shard is drained by one worker task, which
+keeps per-subscriber ordering while slow subscribers only hold up their
+own shard. Callbacks are awaited by the worker rather than spawned, so a
+full mailbox is real back-pressure:
+
+- ``drop_oldest``: evict the oldest message of the lowest priority lane
+  that is not above the incoming message (else drop the incoming one)
+- ``drop_newest``: reject the incoming message
+- ``block``: the sender waits up to ``block_timeout`` for space, then drops
+
+Addressing: a receiver id delivers to that subscriber, ``'all'`` or
+``'broadcast'`` to every subscriber except the sender, and
+``'topic:<name>'`` to every subscriber of that topic. ``multicast`` takes
+an explicit list of receivers.
+"""
+
+import asyncio
+import logging
+import time
+import zlib
+from collections import deque
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+from xmrt_coordination_core import AgentMessage
+
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+BROADCAST_RECEIVERS = ('all', 'broadcast')
+TOPIC_PREFIX = 'topic:'
+
+
+class MessagePriority(IntEnum):
+    """Delivery lanes, highest first"""
+    BULK = 0
+    NORMAL = 1
+    HIGH = 2
+    CRITICAL = 3
+
+
+class _Mailbox:
+    """Bounded per-subscriber queue with one lane per priority"""
+
+    __slots__ = ('receiver_id', 'callbacks', 'shard', 'capacity', 'lanes', 'size', 'space',
+                 'posted', 'delivered', 'dropped', 'failed', 'max_lag', 'latencies')
+
+    def __init__(self, receiver_id: str, shard: '_Shard', capacity: int):
+        self.receiver_id = receiver_id
+        self.callbacks: List[Callable[[AgentMessage], Any]] = []
+        self.shard = shard
+        self.capacity = capacity
+        self.lanes: List[Deque] = [deque() for _ in MessagePriority]
+        self.size = 0
+        self.space = asyncio.Event()
+        self.posted = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_lag = 0
+        self.latencies: Deque[float] = deque(maxlen=1024)
+
+    def push(self, message: AgentMessage, priority: int, posted_at: float):
+        self.lanes[priority].append((message, posted_at))
+        self.size += 1
+        self.posted += 1
+        if self.size > self.max_lag:
+            self.max_lag = self.size
+        self.shard.ready[priority].append(self)
+        self.shard.wakeup.set()
+
+    def pop(self):
+        for lane in reversed(self.lanes):
+            if lane:
+                self.size -= 1
+                return lane.popleft()
+        return None
+
+    def evict(self, priority: int) -> bool:
+        """Drop the oldest message at or below ``priority``"""
+        for lane in self.lanes[:priority + 1]:
+            if lane:
+                lane.popleft()
+                self.size -= 1
+                self.dropped += 1
+                return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def latency_percentile(pct: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(round(pct / 100.0 * (len(latencies) - 1))))] * 1000
+
+        return {
+            'lag': self.size,
+            'max_lag': self.max_lag,
+            'posted': self.posted,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'latency_p50_ms': latency_percentile(50),
+            'latency_p99_ms': latency_percentile(99)
+        }
+
+
+class _Shard:
+    """Mailboxes drained by one worker; ``ready`` holds one ticket per queued message"""
+
+    __slots__ = ('ready', 'wakeup', 'worker')
+
+    def __init__(self):
+        self.ready: List[Deque[_Mailbox]] = [deque() for _ in MessagePriority]
+        self.wakeup = asyncio.Event()
+        self.worker: Optional[asyncio.Task] = None
+
+    def next_mailbox(self) -> Optional[_Mailbox]:
+        for lane in reversed(self.ready):
+            if lane:
+                return lane.popleft()
+        return None
+
+
+class MessageBus:
+    """
+    Asynchronous Message Bus for Inter-Agent Communication
+    Enables structured A2A messaging with subscription support.
+    """
+    def __init__(self, workers: int = 4, max_queue_size: int = 1000,
+                 backpressure: str = 'drop_oldest', block_timeout: float = 1.0):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown message bus back-pressure policy: {backpressure}")
+
+        self.max_queue_size = max_queue_size
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self._shards = [_Shard() for _ in range(max(1, workers))]
+        self._mailboxes: Dict[str, _Mailbox] = {}
+        self._topics: Dict[str, Set[str]] = {}
+        self._running = False
+        self.stats = {
+            'posted': 0,
+            'fanned_out': 0,
+            'delivered': 0,
+            'dropped': 0,
+            'blocked': 0,
+            'undeliverable': 0
+        }
+        logger.info(f"🚌 A2A Message Bus initialized ({len(self._shards)} workers)")
+
+    async def start(self):
+        """Start the shard workers"""
+        if self._running:
+            return
+        self._running = True
+        for shard in self._shards:
+            shard.worker = asyncio.create_task(self._process_messages(shard))
+        logger.info("🚀 Message Bus started")
+
+    async def stop(self):
+        """Stop the shard workers"""
+        self._running = False
+        workers = [shard.worker for shard in self._shards if shard.worker]
+        for worker in workers:
+            worker.cancel()
+        for worker in workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        for shard in self._shards:
+            shard.worker = None
+        logger.info("🛑 Message Bus stopped")
+
+    def subscribe(self, receiver_id: str, callback: Callable[[AgentMessage], Any]):
+        """Subscribe an agent to messages addressed to them"""
+        self._mailbox(receiver_id).callbacks.append(callback)
+        logger.info(f"📝 Agent {receiver_id} subscribed to message bus")
+
+    def unsubscribe(self, receiver_id: str):
+        """Remove an agent, its callbacks, topics and queued messages"""
+        mailbox = self._mailboxes.pop(receiver_id, None)
+        if mailbox is not None:
+            mailbox.lanes = [deque() for _ in MessagePriority]
+            mailbox.size = 0
+            mailbox.space.set()
+        for members in self._topics.values():
+            members.discard(receiver_id)
+
+    def subscribe_topic(self, receiver_id: str, topic: str):
+        """Also deliver messages sent to ``topic:<topic>`` to this agent"""
+        self._mailbox(receiver_id)
+        self._topics.setdefault(topic, set()).add(receiver_id)
+
+    def unsubscribe_topic(self, receiver_id: str, topic: str):
+        members = self._topics.get(topic)
+        if members is not None:
+            members.discard(receiver_id)
+            if not members:
+                del self._topics[topic]
+
+    async def post_message(self, message: AgentMessage, priority: MessagePriority = MessagePriority.NORMAL):
+        """Post a message to the bus"""
+        receiver = message.receiver
+        if receiver in BROADCAST_RECEIVERS:
+            receivers: Iterable[str] = [r for r in self._mailboxes if r != message.sender]
+        elif receiver.startswith(TOPIC_PREFIX):
+            receivers = list(self._topics.get(receiver[len(TOPIC_PREFIX):], ()))
+        else:
+            receivers = (receiver,)
+        await self.multicast(message, receivers, priority)
+        logger.debug(f"📨 Message {message.id} posted from {message.sender} to {receiver}")
+
+    async def multicast(self, message: AgentMessage, receivers: Iterable[str],
+                        priority: MessagePriority = MessagePriority.NORMAL):
+        """Deliver one message to each of ``receivers``"""
+        self.stats['posted'] += 1
+        posted_at = time.perf_counter()
+        delivered_to = 0
+        for receiver_id in receivers:
+            mailbox = self._mailboxes.get(receiver_id)
+            if mailbox is None:
+                continue
+            delivered_to += 1
+            if mailbox.size >= mailbox.capacity and not await self._make_room(mailbox, priority):
+                mailbox.dropped += 1
+                self.stats['dropped'] += 1
+                continue
+            mailbox.push(message, priority, posted_at)
+        if delivered_to:
+            self.stats['fanned_out'] += delivered_to
+        else:
+            self.stats['undeliverable'] += 1
+
+    async def _make_room(self, mailbox: _Mailbox, priority: int) -> bool:
+        """Apply the back-pressure policy to a full mailbox; True if there is space now"""
+        policy = self.backpressure
+        # Blocking the worker that drains this mailbox would deadlock
+        if policy == 'block' and asyncio.current_task() is not mailbox.shard.worker:
+            self.stats['blocked'] += 1
+            deadline = time.monotonic() + self.block_timeout
+            while mailbox.size >= mailbox.capacity and mailbox.receiver_id in self._mailboxes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                mailbox.space.clear()
+                try:
+                    await asyncio.wait_for(mailbox.space.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            return mailbox.size < mailbox.capacity
+        if policy == 'drop_newest':
+            return False
+        if mailbox.evict(priority):
+            self.stats['dropped'] += 1
+            return True
+        return False
+
+    async def _process_messages(self, shard: _Shard):
+        """Worker loop delivering one shard's mailboxes, highest priority first"""
+        while self._running:
+            try:
+                mailbox = shard.next_mailbox()
+                if mailbox is None:
+                    shard.wakeup.clear()
+                    await shard.wakeup.wait()
+                    continue
+
+                # A ticket can outlive its message when it was evicted
+                item = mailbox.pop()
+                if item is None:
+                    continue
+                mailbox.space.set()
+
+                message, posted_at = item
+                for callback in mailbox.callbacks:
+                    try:
+                        if asyncio.iscoroutinefunction(callback):
+                            await callback(message)
+                        else:
+                            callback(message)
+                    except Exception as e:
+                        mailbox.failed += 1
+                        logger.error(f"Error delivering message {message.id} to {mailbox.receiver_id}: {e}")
+                mailbox.delivered += 1
+                mailbox.latencies.append(time.perf_counter() - posted_at)
+                self.stats['delivered'] += 1
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in message processing loop: {e}")
+
+    def _mailbox(self, receiver_id: str) -> _Mailbox:
+        mailbox = self._mailboxes.get(receiver_id)
+        if mailbox is None:
+            shard = self._shards[zlib.crc32(receiver_id.encode()) % len(self._shards)]
+            mailbox = _Mailbox(receiver_id, shard, self.max_queue_size)
+            self._mailboxes[receiver_id] = mailbox
+        return mailbox
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Bus totals plus per-subscriber lag, drop and latency"""
+        return {
+            **self.stats,
+            'workers': len(self._shards),
+            'queued': sum(mailbox.size for mailbox in self._mailboxes.values()),
+            'subscribers': {receiver_id: mailbox.stats() for receiver_id, mailbox in self._mailboxes.items()}
+        }
@@ -0,0 +1,408 @@
+"""
+XMRT-Ecosystem: Columnar Metric Store
+Compact time series storage for the Advanced Analytics Engine.
+
+Each metric is a fixed-capacity ring buffer backed by one float64 array of
+values and one int64 array of epoch-nanosecond timestamps. Tag sets are
+interned once per store and referenced by a small integer per point.
+Buffers are "mirrored" (every point is written at i and i + capacity), so
+the most recent window is always one contiguous slice and readers get
+zero-copy NumPy views instead of list copies. Buffers start small and
+double up to the configured capacity, so sparse metrics stay cheap.
+
+Each series has a lock taken by appends (including growth) and by reads,
+so concurrent ``record_metric`` callers never interleave and a reader
+sees one consistent state. Views stay zero-copy until the ring is at
+capacity; from then on the next append overwrites the oldest slot of
+any window, so reads return a copy instead.
+
+Alongside the raw points every metric maintains rollup tiers (1m, 1h, 1d
+by default): fixed-width buckets holding count/sum/min/max plus the sum of
+squared deviations, updated incrementally on append. Long windows are
+answered from the coarsest tier instead of the raw ring, whose capacity
+only covers recent history for busy metrics.
+"""
+
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TagSet = Tuple[Tuple[str, str], ...]
+
+NS_PER_SECOND = 1_000_000_000
+
+# (name, bucket width in seconds, buckets kept)
+DEFAULT_ROLLUP_TIERS: Tuple[Tuple[str, int, int], ...] = (
+    ('1m', 60, 2 * 1440),
+    ('1h', 3600, 30 * 24),
+    ('1d', 86400, 30),
+)
+
+
+class MirroredRing:
+    """Fixed-capacity multi-column ring buffer with contiguous suffix views"""
+
+    __slots__ = ('capacity', 'size', 'head', '_slots', '_dtypes', '_columns')
+
+    def __init__(self, capacity: int, dtypes: Sequence[Any], initial_slots: int = 64):
+        self.capacity = capacity
+        self.size = 0
+        self.head = 0  # next write slot in [0, _slots)
+        self._slots = 0
+        self._dtypes = tuple(dtypes)
+        self._columns: List[np.ndarray] = []
+        self._allocate(max(1, min(initial_slots, capacity)))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _allocate(self, slots: int):
+        """(Re)allocate the mirrored arrays, keeping the current window"""
+        window = self._window(None) if self.size else None
+        columns = []
+        for index, dtype in enumerate(self._dtypes):
+            column = np.zeros(2 * slots, dtype=dtype)
+            if window is not None:
+                old = self._columns[index][window]
+                column[:self.size] = old
+                column[slots:slots + self.size] = old
+            columns.append(column)
+        self._columns = columns
+        self._slots = slots
+        self.head = self.size % slots
+
+    def append(self, row: Sequence[Any]):
+        if self.size == self._slots and self._slots < self.capacity:
+            self._allocate(min(2 * self._slots, self.capacity))
+        head = self.head
+        mirror = head + self._slots
+        for column, value in zip(self._columns, row):
+            column[head] = column[mirror] = value
+        self.head = (head + 1) % self._slots
+        if self.size < self._slots:
+            self.size += 1
+
+    def _window(self, last_n: Optional[int]) -> slice:
+        # The newest row always sits at head - 1 + slots in the mirrored
+        # layout, so any suffix of the ring is one contiguous slice
+        count = self.size if last_n is None else max(0, min(last_n, self.size))
+        end = self.head + self._slots
+        return slice(end - count, end)
+
+    def column(self, index: int, last_n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the newest ``last_n`` rows of a column (oldest first)"""
+        view = self._columns[index][self._window(last_n)]
+        if self.size >= self.capacity:
+            # A full ring writes its next row over the oldest slot of this window
+            view = view.copy()
+        view.flags.writeable = False
+        return view
+
+    def oldest(self, index: int) -> Any:
+        """Oldest value of a column (ring must not be empty)"""
+        return self._columns[index][self._window(None).start]
+
+    def drop_oldest(self, count: int):
+        # Shrinking size is enough: old slots are simply never read again
+        self.size -= max(0, min(count, self.size))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns)
+
+
+class RollupTier:
+    """Fixed-width buckets of count/sum/min/max/M2 for one metric"""
+
+    __slots__ = ('name', 'resolution_ns', 'lock', '_ring', '_open_start', '_open_count',
+                 '_open_sum', '_open_min', '_open_max', '_open_mean', '_open_m2')
+
+    # Column order in the closed-bucket ring
+    START, COUNT, SUM, MIN, MAX, M2 = range(6)
+
+    def __init__(self, name: str, resolution_seconds: int, capacity: int,
+                 lock: Optional[threading.RLock] = None):
+        self.name = name
+        self.resolution_ns = resolution_seconds * NS_PER_SECOND
+        self.lock = lock or threading.RLock()  # shared with the owning series
+        self._ring = MirroredRing(capacity, (np.int64, np.int64, np.float64,
+                                             np.float64, np.float64, np.float64),
+                                  initial_slots=8)
+        self._open_start: Optional[int] = None
+        self._reset_open(None)
+
+    def __len__(self) -> int:
+        return len(self._ring) + (1 if self._open_count else 0)
+
+    def _reset_open(self, start: Optional[int]):
+        self._open_start = start
+        self._open_count = 0
+        self._open_sum = self._open_mean = self._open_m2 = 0.0
+        self._open_min = float('inf')
+        self._open_max = float('-inf')
+
+    def add(self, timestamp_ns: int, value: float):
+        # Caller (MetricSeries.append) holds self.lock
+        start = timestamp_ns - timestamp_ns % self.resolution_ns
+        if self._open_start is None:
+            self._open_start = start
+        elif start > self._open_start:
+            self._close()
+            self._open_start = start
+        # Late points (start < open bucket) are folded into the open bucket
+
+        # Welford update keeps the per-bucket variance numerically stable
+        self._open_count += 1
+        delta = value - self._open_mean
+        self._open_mean += delta / self._open_count
+        self._open_m2 += delta * (value - self._open_mean)
+        self._open_sum += value
+        if value < self._open_min:
+            self._open_min = value
+        if value > self._open_max:
+            self._open_max = value
+
+    def _close(self):
+        if self._open_count:
+            self._ring.append((self._open_start, self._open_count, self._open_sum,
+                               self._open_min, self._open_max, self._open_m2))
+        self._reset_open(None)
+
+    def buckets(self, cutoff_ns: Optional[int] = None) -> Tuple[np.ndarray, ...]:
+        """(start, count, sum, min, max, m2) arrays for buckets overlapping
+        ``[cutoff_ns, now]``, the still-open bucket included"""
+        with self.lock:
+            starts = self._ring.column(self.START)
+            first = 0
+            if cutoff_ns is not None:
+                # Keep the bucket that straddles the cutoff
+                first = int(np.searchsorted(starts, cutoff_ns - self.resolution_ns, side='right'))
+            columns = [self._ring.column(index)[first:] for index in range(6)]
+            if self._open_count and (cutoff_ns is None or
+                                     self._open_start > cutoff_ns - self.resolution_ns):
+                open_row = (self._open_start, self._open_count, self._open_sum,
+                            self._open_min, self._open_max, self._open_m2)
+                columns = [np.append(column, value) for column, value in zip(columns, open_row)]
+            return tuple(columns)
+
+    def drop_before(self, cutoff_ns: int) -> int:
+        """Forget buckets that end before ``cutoff_ns``"""
+        with self.lock:
+            starts = self._ring.column(self.START)
+            dropped = int(np.searchsorted(starts, cutoff_ns - self.resolution_ns, side='right'))
+            self._ring.drop_oldest(dropped)
+            return dropped
+
+    @property
+    def nbytes(self) -> int:
+        return self._ring.nbytes
+
+
+def summarize_buckets(buckets: Tuple[np.ndarray, ...]) -> Optional[Dict[str, Any]]:
+    """Merge rollup buckets into count/mean/std/min/max/median statistics
+
+    Means and variances are combined exactly (Chan et al. parallel update);
+    the median is approximated by the count-weighted median of bucket means.
+    """
+    starts, counts, sums, minimums, maximums, m2 = buckets
+    total = int(counts.sum())
+    if not total:
+        return None
+
+    mean = float(sums.sum() / total)
+    bucket_means = sums / counts
+    combined_m2 = float(m2.sum() + (counts * (bucket_means - mean) ** 2).sum())
+
+    order = np.argsort(bucket_means, kind='stable')
+    cumulative = np.cumsum(counts[order])
+    median = float(bucket_means[order][int(np.searchsorted(cumulative, total / 2.0))])
+
+    return {
+        'count': total,
+        'start_ns': int(starts[0]),
+        'end_ns': int(starts[-1]),
+        'mean': mean,
+        'median': median,
+        'std': (combined_m2 / (total - 1)) ** 0.5 if total > 1 else 0,
+        'min': float(minimums.min()),
+        'max': float(maximums.max()),
+        'sum': float(sums.sum()),
+        'buckets': len(counts)
+    }
+
+
+class MetricSeries:
+    """Mirrored ring buffer of raw points for a single metric, plus rollups"""
+
+    __slots__ = ('name', 'metric_type', 'lock', '_ring', 'rollups', 'last_metadata')
+
+    TIMESTAMP, VALUE, TAG_ID = range(3)
+
+    def __init__(self, name: str, capacity: int, metric_type: Any = None,
+                 initial_slots: int = 64,
+                 rollup_tiers: Sequence[Tuple[str, int, int]] = ()):
+        self.name = name
+        self.metric_type = metric_type
+        self.lock = threading.RLock()
+        self._ring = MirroredRing(capacity, (np.int64, np.float64, np.int32), initial_slots)
+        self.rollups = [RollupTier(*spec, lock=self.lock) for spec in rollup_tiers]
+        self.last_metadata: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    @property
+    def capacity(self) -> int:
+        return self._ring.capacity
+
+    @property
+    def size(self) -> int:
+        return self._ring.size
+
+    def append(self, timestamp_ns: int, value: float, tag_id: int = 0):
+        with self.lock:
+            self._ring.append((timestamp_ns, value, tag_id))
+            for tier in self.rollups:
+                tier.add(timestamp_ns, value)
+
+    def values(self, last_n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the newest ``last_n`` values (oldest first)"""
+        with self.lock:
+            return self._ring.column(self.VALUE, last_n)
+
+    def timestamps(self, last_n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the matching epoch-ns timestamps"""
+        with self.lock:
+            return self._ring.column(self.TIMESTAMP, last_n)
+
+    def tag_ids(self, last_n: Optional[int] = None) -> np.ndarray:
+        with self.lock:
+            return self._ring.column(self.TAG_ID, last_n)
+
+    def snapshot(self, last_n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) of the newest ``last_n`` points, read together"""
+        with self.lock:
+            return self._ring.column(self.TIMESTAMP, last_n), self._ring.column(self.VALUE, last_n)
+
+    def since(self, cutoff_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) views for points at or after ``cutoff_ns``"""
+        timestamps, values = self.snapshot()
+        start = int(np.searchsorted(timestamps, cutoff_ns, side='left'))
+        return timestamps[start:], values[start:]
+
+    def covers(self, cutoff_ns: int) -> bool:
+        """True if no raw point newer than ``cutoff_ns`` has been evicted"""
+        with self.lock:
+            if not self.size:
+                return False
+            return self.size < self.capacity or int(self._ring.oldest(self.TIMESTAMP)) <= cutoff_ns
+
+    def tier_for_window(self, window_ns: int, min_buckets: int) -> Optional[RollupTier]:
+        """Coarsest rollup tier with at least ``min_buckets`` buckets per window"""
+        best = None
+        for tier in self.rollups:
+            if tier.resolution_ns * min_buckets <= window_ns and \
+                    (best is None or tier.resolution_ns > best.resolution_ns):
+                best = tier
+        return best
+
+    def drop_before(self, cutoff_ns: int) -> int:
+        """Forget points and buckets older than ``cutoff_ns``; returns raw points dropped"""
+        with self.lock:
+            dropped = int(np.searchsorted(self.timestamps(), cutoff_ns, side='left'))
+            self._ring.drop_oldest(dropped)
+            for tier in self.rollups:
+                tier.drop_before(cutoff_ns)
+            return dropped
+
+    def is_empty(self) -> bool:
+        with self.lock:
+            return not self.size and not any(len(tier) for tier in self.rollups)
+
+    @property
+    def nbytes(self) -> int:
+        return self._ring.nbytes + sum(tier.nbytes for tier in self.rollups)
+
+
+class ColumnarMetricStore:
+    """Per-metric ring buffers plus a shared tag-set intern table"""
+
+    def __init__(self, capacity: int = 10000,
+                 rollup_tiers: Sequence[Tuple[str, int, int]] = DEFAULT_ROLLUP_TIERS):
+        self.capacity = capacity
+        self.rollup_tiers = tuple(rollup_tiers)
+        self._series: Dict[str, MetricSeries] = {}
+        self._tag_sets: List[TagSet] = [()]
+        self._tag_index: Dict[TagSet, int] = {(): 0}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._series
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._series))
+
+    def items(self) -> List[Tuple[str, MetricSeries]]:
+        return list(self._series.items())
+
+    def get(self, name: str) -> Optional[MetricSeries]:
+        return self._series.get(name)
+
+    def intern_tags(self, tags: Optional[Dict[str, str]]) -> int:
+        """Return the id of a tag set, registering it on first sight"""
+        if not tags:
+            return 0
+        key = tuple(sorted((str(k), str(v)) for k, v in tags.items()))
+        tag_id = self._tag_index.get(key)
+        if tag_id is None:
+            with self._lock:
+                tag_id = self._tag_index.get(key)
+                if tag_id is None:
+                    tag_id = len(self._tag_sets)
+                    self._tag_sets.append(key)
+                    self._tag_index[key] = tag_id
+        return tag_id
+
+    def tags(self, tag_id: int) -> Dict[str, str]:
+        return dict(self._tag_sets[tag_id])
+
+    def tag_values(self, name: str) -> List[str]:
+        """Distinct tag values currently referenced by a metric"""
+        series = self._series.get(name)
+        if series is None or not series.size:
+            return []
+        values = set()
+        for tag_id in np.unique(series.tag_ids()):
+            values.update(v for _, v in self._tag_sets[int(tag_id)])
+        return sorted(values)
+
+    def append(self, name: str, timestamp_ns: int, value: float,
+               tags: Optional[Dict[str, str]] = None, metric_type: Any = None,
+               metadata: Optional[Dict[str, Any]] = None) -> MetricSeries:
+        series = self._series.get(name)
+        if series is None:
+            with self._lock:
+                series = self._series.get(name)
+                if series is None:
+                    series = MetricSeries(name, self.capacity, metric_type,
+                                          rollup_tiers=self.rollup_tiers)
+                    self._series[name] = series
+        series.append(timestamp_ns, value, self.intern_tags(tags))
+        if metadata:
+            series.last_metadata = metadata
+        return series
+
+    def remove(self, name: str):
+        self._series.pop(name, None)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(series.nbytes for series in self._series.values())
+
+    @property
+    def point_count(self) -> int:
+        return sum(series.size for series in self._series.values())
@@ -0,0 +1,234 @@
+"""
+XMRT-Ecosystem: API Rate Limiting
+Token buckets and adaptive concurrency for quota-limited APIs.
+
+``RateLimiter`` holds a requests bucket and an optional tokens bucket.
+A caller reserves capacity up front, is told how long to wait and does
+that waiting outside any lock, so concurrent callers queue up behind
+each other's reservations instead of behind a sleeping thread. Reported
+usage is settled against the estimate afterwards, and a server's
+``Retry-After`` pauses every caller until it has passed.
+
+``AdaptiveConcurrency`` is an AIMD limit on requests in flight: each
+success raises it by about one per window of ``limit`` requests, and a
+throttled response halves it (at most once per ``cooldown`` seconds, so a
+burst of 429s from the same moment counts once).
+
+Both offer blocking and ``async`` entry points.
+"""
+
+import asyncio
+import email.utils
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional
+
+# Seconds of steady-state rate a bucket may burst when idle
+DEFAULT_BURST_SECONDS = 1.0
+CONCURRENCY_OUTCOMES = ('ok', 'throttled', 'error', 'cancelled')
+
+
+class TokenBucket:
+    """Continuously refilled bucket; reservations may run into debt"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = DEFAULT_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` and return the seconds until it is covered"""
+        self._refill(now)
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float, now: float):
+        """Return (or, if negative, take more) capacity after the fact"""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits with server pauses"""
+
+    def __init__(self, rpm: float, tpm: Optional[float] = None, burst_seconds: float = DEFAULT_BURST_SECONDS):
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds) if tpm else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'reservations': 0, 'delayed': 0, 'waited_seconds': 0.0, 'pauses': 0}
+
+    def reserve(self, tokens: float = 0.0) -> float:
+        """Reserve one request (and ``tokens``); return the seconds to wait before sending"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self.requests.reserve(1.0, now)
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            wait = max(wait, self._paused_until - now)
+            self.stats['reservations'] += 1
+            if wait > 0:
+                self.stats['delayed'] += 1
+                self.stats['waited_seconds'] += wait
+            return wait
+
+    def acquire(self, tokens: float = 0.0) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 0.0) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def settle(self, estimated: float, actual: float):
+        """Correct a token reservation with the usage the server reported"""
+        if self.tokens is None:
+            return
+        with self._lock:
+            self.tokens.refund(estimated - actual, time.monotonic())
+
+    def pause(self, seconds: float):
+        """Hold every new request for ``seconds`` (e.g. from ``Retry-After``)"""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self.stats['pauses'] += 1
+
+
+class AdaptiveConcurrency:
+    """AIMD-adjusted cap on concurrent requests, granted in FIFO order"""
+
+    def __init__(self, initial: int = 1, minimum: int = 1, maximum: int = 16,
+                 decrease: float = 0.5, cooldown: float = 1.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._waiters: Deque[Any] = deque()  # threading.Event or (loop, future)
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'granted': 0, 'throttled': 0, 'decreases': 0, 'peak_in_flight': 0}
+
+    def _take(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        self.stats['granted'] += 1
+        self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.in_flight)
+        return True
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            if not self._waiters and self._take():
+                return True
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        if waiter.wait(timeout):
+            return True
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+                return False
+            except ValueError:
+                return True  # granted just as the wait timed out
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self._take():
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                    granted = False
+                except ValueError:
+                    # A slot was handed over; _resolve gives back the ones
+                    # that arrive after the future was cancelled
+                    granted = not future.cancelled()
+            if granted:
+                self.release('cancelled')
+            raise
+
+    def release(self, outcome: str = 'ok'):
+        """Free a slot and adapt the limit to how the request went"""
+        if outcome not in CONCURRENCY_OUTCOMES:
+            raise ValueError(f"Unknown request outcome: {outcome}")
+        with self._lock:
+            self.in_flight -= 1
+            if outcome == 'ok':
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            elif outcome == 'throttled':
+                self.stats['throttled'] += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self.limit = max(float(self.minimum), self.limit * self.decrease)
+                    self.stats['decreases'] += 1
+            self._grant()
+
+    def _grant(self):
+        while self._waiters and self._take():
+            waiter = self._waiters.popleft()
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self._resolve, future)
+
+    def _resolve(self, future: asyncio.Future):
+        if future.done():
+            # Cancelled after the slot was handed over
+            self.release('cancelled')
+        else:
+            future.set_result(None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.stats, 'limit': round(self.limit, 2), 'in_flight': self.in_flight,
+                'waiting': len(self._waiters)}
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds requested by ``retry-after-ms`` / ``Retry-After`` (delta or HTTP date)"""
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(messages: Iterable[Mapping[str, Any]], completion_tokens: int = 0) -> int:
+    """Rough prompt size (about four characters per token) plus the expected completion"""
+    chars = sum(len(str(message.get('content') or '')) + 8 for message in messages)
+    return chars // 4 + completion_tokens
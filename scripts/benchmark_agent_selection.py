@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Agent Selection Benchmark
+Compares the legacy scan-every-agent selection against the AgentRegistry
+behind EnhancedMultiAgentCoordinator._select_best_agent and
+TaskManager._select_best_agent, with loads, stress and capability
+reliability changing between selections.
+
+Usage:
+    python scripts/benchmark_agent_selection.py --agents 1000 5000 10000
+    python scripts/benchmark_agent_selection.py --agents 5000 --selections 5000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from enhanced_multi_agent_coordinator import (  # noqa: E402
+    EnhancedMultiAgentCoordinator, EnhancedTask, TaskPriority, TaskType
+)
+import task_manager  # noqa: E402
+
+CAPABILITIES = [f'capability-{i}' for i in range(40)]
+DESCRIPTIONS = ['analyze and monitor the treasury', 'optimize liquidity', 'audit and secure the bridge',
+                'coordinate and announce the release', 'weekly sync']
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def legacy_coordinator_select(coordinator, task):
+    """The pre-registry EnhancedMultiAgentCoordinator._select_best_agent"""
+    available_agents = []
+    for agent_id, metrics in coordinator.agent_metrics.items():
+        if (metrics.current_load < metrics.max_concurrent_tasks and
+                (datetime.utcnow() - metrics.last_heartbeat).total_seconds() < 60):
+            capability_score = 0.0
+            for req_cap in task.required_capabilities:
+                if req_cap in metrics.capabilities:
+                    cap = metrics.capabilities[req_cap]
+                    capability_score += cap.proficiency * cap.reliability_score
+            if capability_score > 0:
+                load_factor = 1.0 - (metrics.current_load / metrics.max_concurrent_tasks)
+                total_score = capability_score * load_factor * metrics.efficiency_score * (1.0 - metrics.stress_level)
+                available_agents.append((agent_id, total_score))
+    if available_agents:
+        available_agents.sort(key=lambda x: x[1], reverse=True)
+        return available_agents[0]
+    return None
+
+
+def legacy_task_manager_select(manager, task):
+    """The pre-registry TaskManager._find_suitable_agents + _select_best_agent"""
+    agents = [agent for agent in manager.agents.values()
+              if agent.specialization == task.specialization and agent.availability and
+              len(agent.current_tasks) < agent.max_concurrent_tasks]
+    scored_agents = []
+    for agent in agents:
+        score = agent.performance_score * (1.0 - len(agent.current_tasks) / agent.max_concurrent_tasks)
+        required_capabilities = manager._extract_required_capabilities(task)
+        capability_match = len(set(required_capabilities) & set(agent.capabilities))
+        if capability_match > 0:
+            score *= (1.0 + capability_match * 0.1)
+        scored_agents.append((score, agent))
+    if not scored_agents:
+        return None
+    scored_agents.sort(key=lambda x: x[0], reverse=True)
+    return scored_agents[0]
+
+
+def bench_coordinator(agent_count, selections, rng):
+    coordinator = EnhancedMultiAgentCoordinator()
+    for i in range(agent_count):
+        coordinator.register_agent(f'agent-{i}', rng.sample(CAPABILITIES, rng.randint(1, 4)),
+                                   max_concurrent=rng.randint(1, 8))
+    agent_ids = list(coordinator.agent_metrics)
+
+    legacy, indexed, agree = [], [], 0
+    for i in range(selections):
+        task = EnhancedTask(
+            id=f'task-{i}',
+            type=TaskType.ANALYSIS,
+            priority=TaskPriority.MEDIUM,
+            description='benchmark task',
+            required_capabilities=rng.sample(CAPABILITIES, rng.randint(1, 3)),
+            estimated_duration=1.0
+        )
+        start = time.perf_counter()
+        expected = legacy_coordinator_select(coordinator, task)
+        legacy.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        selected = coordinator._select_best_agent(task)
+        indexed.append(time.perf_counter() - start)
+
+        if expected is None:
+            agree += selected is None
+        elif selected is not None:
+            # Ties may resolve to a different agent with the same score
+            metrics = coordinator.agent_metrics[selected]
+            score = sum(metrics.capabilities[c].proficiency * metrics.capabilities[c].reliability_score
+                        for c in task.required_capabilities if c in metrics.capabilities)
+            score *= (1.0 - metrics.current_load / metrics.max_concurrent_tasks) * \
+                metrics.efficiency_score * (1.0 - metrics.stress_level)
+            agree += abs(score - expected[1]) <= 1e-9
+
+        # Churn: assignments, completions, failures and capability drift
+        agent_id = rng.choice(agent_ids)
+        metrics = coordinator.agent_metrics[agent_id]
+        if metrics.current_load < metrics.max_concurrent_tasks and rng.random() < 0.6:
+            metrics.current_load += 1
+        elif metrics.current_load:
+            metrics.current_load -= 1
+            metrics.tasks_completed += 1
+            metrics.total_processing_time += rng.uniform(1, 30)
+            if rng.random() < 0.2:
+                metrics.tasks_failed += 1
+            for cap in metrics.capabilities.values():
+                cap.update_performance(rng.random() < 0.9, rng.uniform(1, 30))
+        metrics.stress_level = rng.random() * 0.5
+        coordinator._sync_agent(agent_id)
+
+    return legacy, indexed, agree
+
+
+def bench_task_manager(agent_count, selections, rng):
+    manager = task_manager.TaskManager()
+    specializations = list(task_manager.AgentSpecialization)
+    keywords = list(task_manager.CAPABILITY_KEYWORDS)
+    for i in range(agent_count):
+        manager.register_agent(task_manager.Agent(
+            id=f'agent-{i}',
+            name=f'Agent {i}',
+            specialization=rng.choice(specializations),
+            capabilities=rng.sample(keywords, 2),
+            current_tasks=[],
+            max_concurrent_tasks=rng.randint(1, 8),
+            performance_score=rng.uniform(0.5, 2.0)
+        ))
+
+    legacy, indexed, agree = [], [], 0
+    assigned = []
+    for i in range(selections):
+        task_id = manager.create_task(f'Task {i}', rng.choice(DESCRIPTIONS), task_manager.TaskPriority.LOW,
+                                      rng.choice(specializations))
+        task = manager.tasks[task_id]
+
+        start = time.perf_counter()
+        expected = legacy_task_manager_select(manager, task)
+        legacy.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        selected = manager._select_best_agent(task)
+        indexed.append(time.perf_counter() - start)
+
+        if expected is None:
+            agree += selected is None
+        elif selected is not None:
+            required = set(manager._extract_required_capabilities(task))
+            score = selected.performance_score * (1.0 - len(selected.current_tasks) / selected.max_concurrent_tasks)
+            match = len(required & set(selected.capabilities))
+            if match:
+                score *= 1.0 + match * 0.1
+            agree += abs(score - expected[0]) <= 1e-9
+
+        if manager._assign_task(task_id):
+            assigned.append(task_id)
+        if assigned and rng.random() < 0.5:
+            manager.complete_task(assigned.pop(rng.randrange(len(assigned))))
+
+    return legacy, indexed, agree
+
+
+def summarize(legacy, indexed, agree, selections):
+    return {
+        'legacy_p50_us': round(percentile(legacy, 50) * 1e6, 1),
+        'legacy_p99_us': round(percentile(legacy, 99) * 1e6, 1),
+        'registry_p50_us': round(percentile(indexed, 50) * 1e6, 1),
+        'registry_p99_us': round(percentile(indexed, 99) * 1e6, 1),
+        'same_best_score': f'{agree}/{selections}'
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--agents', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--selections', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    results = {}
+    for agent_count in args.agents:
+        rng = random.Random(args.seed)
+        results[agent_count] = {
+            'coordinator': summarize(*bench_coordinator(agent_count, args.selections, rng), args.selections),
+            'task_manager': summarize(*bench_task_manager(agent_count, args.selections, rng), args.selections)
+        }
+    print(json.dumps({'selections': args.selections, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Analytics Engine Benchmark
+Compares the legacy deque-of-MetricPoint buffers against the columnar
+ring-buffer metric store behind AdvancedAnalyticsEngine.
+
+Reports memory per stored point and get_metric_summary latency for the
+full buffer, a 60 second window and a 30 day window (rollup tiers).
+
+Usage:
+    python scripts/benchmark_analytics_engine.py --points 1000000
+    python scripts/benchmark_analytics_engine.py --points 1000000 --legacy-points 200000
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_analytics_engine import AdvancedAnalyticsEngine, MetricPoint, MetricType  # noqa: E402
+
+METRIC = 'system.cpu_usage'
+TAGS = [{'agent': f'agent-{i}', 'region': 'eu'} for i in range(8)]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def legacy_summary(buffer, time_window=None):
+    """The pre-columnar get_metric_summary statistics path"""
+    data_points = list(buffer)
+    if time_window:
+        cutoff_time = datetime.utcnow() - time_window
+        data_points = [dp for dp in data_points if dp.timestamp >= cutoff_time]
+    values = [dp.value for dp in data_points]
+    return {
+        'start': min(dp.timestamp for dp in data_points),
+        'end': max(dp.timestamp for dp in data_points),
+        'mean': statistics.mean(values),
+        'median': statistics.median(values),
+        'std': statistics.stdev(values),
+        'min': min(values),
+        'max': max(values)
+    }
+
+
+def bench_legacy(points, runs, rng):
+    gc.collect()
+    tracemalloc.start()
+    buffer = deque(maxlen=points)
+    now = datetime.utcnow()
+    for i in range(points):
+        buffer.append(MetricPoint(
+            timestamp=now - timedelta(milliseconds=points - i),
+            value=rng.random() * 100,
+            metric_name=METRIC,
+            metric_type=MetricType.SYSTEM,
+            tags=dict(TAGS[i % len(TAGS)]),
+            metadata={}
+        ))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        legacy_summary(buffer)
+        latencies.append(time.perf_counter() - start)
+    return used / points, latencies
+
+
+def bench_columnar(points, runs, rng):
+    engine = AdvancedAnalyticsEngine(buffer_capacity=points)
+    store = engine.metric_store
+    start_ns = time.time_ns() - points * 1_000_000
+
+    gc.collect()
+    tracemalloc.start()
+    for i in range(points):
+        store.append(METRIC, start_ns + i * 1_000_000, rng.random() * 100,
+                     TAGS[i % len(TAGS)], MetricType.SYSTEM)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies, window_latencies, month_latencies = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        engine.get_metric_summary(METRIC)
+        latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        engine.get_metric_summary(METRIC, timedelta(seconds=60))
+        window_latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        engine.get_metric_summary(METRIC, timedelta(days=30))
+        month_latencies.append(time.perf_counter() - start)
+
+    return used / points, store.nbytes / points, latencies, window_latencies, month_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--legacy-points', type=int, default=None,
+                        help='points for the legacy run (defaults to --points)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(args.seed)
+    legacy_points = args.legacy_points or args.points
+
+    legacy_bytes, legacy_latencies = bench_legacy(legacy_points, args.runs, rng)
+    traced_bytes, array_bytes, latencies, window_latencies, month_latencies = bench_columnar(args.points, args.runs, rng)
+
+    print(json.dumps({
+        'points': args.points,
+        'results': {
+            'legacy': {
+                'points': legacy_points,
+                'bytes_per_point': round(legacy_bytes, 1),
+                'summary_p50_ms': round(percentile(legacy_latencies, 50) * 1000, 3)
+            },
+            'columnar': {
+                'points': args.points,
+                'bytes_per_point': round(traced_bytes, 1),
+                'array_bytes_per_point': round(array_bytes, 1),
+                'summary_p50_ms': round(percentile(latencies, 50) * 1000, 3),
+                'summary_60s_window_p50_ms': round(percentile(window_latencies, 50) * 1000, 3),
+                'summary_30d_window_p50_ms': round(percentile(month_latencies, 50) * 1000, 3)
+            }
+        }
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
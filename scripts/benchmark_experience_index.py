@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Experience Index Benchmark
+Compares the full-scan similarity search the learning core used to run
+with ExperienceIndex over a synthetic experience store: index build
+time, similar-experience queries (same action, key Jaccard > 0.5, top 10
+by success score) and knowledge-graph neighbour lookups (Jaccard > 0.4),
+checking that both return the same results.
+
+Usage:
+    python scripts/benchmark_experience_index.py --experiences 100000
+    python scripts/benchmark_experience_index.py --experiences 10000 --templates 50
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from experience_index import ExperienceIndex, jaccard  # noqa: E402
+
+
+def make_experiences(count, actions, templates, vocabulary, rng):
+    """Contexts built from shared key templates, a third with extra rare keys"""
+    keys = [f"key_{i}" for i in range(vocabulary)]
+    shapes = [rng.sample(keys[:200], rng.randint(3, 10)) for _ in range(templates)]
+    experiences = []
+    for i in range(count):
+        context_keys = list(rng.choice(shapes))
+        if rng.random() < 0.35:
+            context_keys += rng.sample(keys, rng.randint(1, 3))
+        experiences.append(SimpleNamespace(
+            experience_id=f"exp_{i}",
+            action_taken=f"action_{int(rng.paretovariate(1.2)) % actions}",
+            context=dict.fromkeys(context_keys, 0),
+            success_score=round(rng.random(), 3)
+        ))
+    return experiences
+
+
+def scan_similar(experiences, context, action):
+    """The pre-index _find_similar_experiences"""
+    keys = set(context)
+    similar = [e for e in experiences if e.action_taken == action and jaccard(keys, set(e.context)) > 0.5]
+    return [e.experience_id for e in sorted(similar, key=lambda e: e.success_score, reverse=True)[:10]]
+
+
+def scan_neighbours(experiences, experience):
+    """The pre-index _update_knowledge_graph candidate loop"""
+    keys = set(experience.context)
+    out = set()
+    for existing in experiences:
+        if existing.experience_id != experience.experience_id:
+            other = set(existing.context)
+            union = keys | other
+            context_similarity = len(keys & other) / len(union) if union else 0.0
+            action_similarity = 1.0 if existing.action_taken == experience.action_taken else 0.0
+            if (context_similarity + action_similarity) / 2 > 0.7:
+                out.add(existing.experience_id)
+    return out
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return results, (time.perf_counter() - start) / len(items) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--experiences', type=int, default=100000)
+    parser.add_argument('--actions', type=int, default=25)
+    parser.add_argument('--templates', type=int, default=300)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(args.seed)
+    experiences = make_experiences(args.experiences, args.actions, args.templates, args.vocabulary, rng)
+    probes = rng.sample(experiences, args.queries)
+
+    index = ExperienceIndex()
+    start = time.perf_counter()
+    for e in experiences:
+        index.add(e.experience_id, e.action_taken, e.context.keys(), e.success_score)
+    build_seconds = time.perf_counter() - start
+
+    scan_top, scan_top_ms = timed(lambda e: scan_similar(experiences, e.context, e.action_taken), probes)
+    index_top, index_top_ms = timed(lambda e: index.best_matches(e.action_taken, e.context.keys(), 0.5), probes)
+
+    scan_edges, scan_edges_ms = timed(lambda e: scan_neighbours(experiences, e), probes)
+    index_edges, index_edges_ms = timed(
+        lambda e: {i for i, sim in index.neighbours(e.action_taken, e.context.keys(), 0.4)
+                   if i != e.experience_id and (sim + 1.0) / 2 > 0.7}, probes)
+
+    # Scores tie often at 3 decimals; compare the score sequence rather than ids
+    scores = {e.experience_id: e.success_score for e in experiences}
+    same_top = all([scores[i] for i in a] == [scores[i] for i in b] for a, b in zip(scan_top, index_top))
+
+    print(json.dumps({
+        'experiences': args.experiences,
+        'index': {**index.get_metrics(), 'build_seconds': round(build_seconds, 2)},
+        'similar_experiences': {
+            'scan_ms': round(scan_top_ms, 3),
+            'index_ms': round(index_top_ms, 3),
+            'speedup': round(scan_top_ms / index_top_ms, 1),
+            'identical_results': same_top
+        },
+        'graph_neighbours': {
+            'scan_ms': round(scan_edges_ms, 3),
+            'index_ms': round(index_edges_ms, 3),
+            'speedup': round(scan_edges_ms / index_edges_ms, 1),
+            'mean_neighbours': round(sum(map(len, index_edges)) / len(index_edges), 1),
+            'identical_results': scan_edges == index_edges
+        }
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+GitHub Fetch Benchmark
+Snapshots many repositories from a local fake GitHub API, which serves
+ETags, answers conditional requests with 304 and counts only the
+requests that GitHub bills against the rate limit, once with the legacy
+contents call per candidate path and once with GitHubHTTP.fetch_files.
+A second pass, after a fraction of the repositories changed, shows what
+revalidation saves; the result includes repositories per 5000-request
+window.
+
+Usage:
+    python scripts/benchmark_github_fetch.py --repos 200 --changed 0.1
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_http import GitHubHTTP, GitHubResponseCache  # noqa: E402
+
+RATE_LIMIT_WINDOW = 5000
+
+# GitHubClient.SNAPSHOT_CANDIDATES plus the README lookup
+CANDIDATES = [
+    "README.md", "SECURITY.md", "CONTRIBUTING.md", "CODEOWNERS",
+    "Dockerfile", "docker/Dockerfile",
+    ".github/workflows/ci.yml", ".github/workflows/build.yml",
+    "requirements.txt", "pyproject.toml", "Pipfile",
+    "package.json", "pnpm-lock.yaml", "yarn.lock",
+]
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def git_sha(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class FakeGitHub:
+    """Repos, contents, trees, blobs and GraphQL with GitHub's 304 accounting"""
+
+    def __init__(self, repos, rng):
+        self.repos = {}
+        self.counted = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+        for i in range(repos):
+            files = {f"src/module_{j}.py": f"# module {j} of repo {i}\n".encode() for j in range(rng.randint(20, 200))}
+            for path in CANDIDATES:
+                if path == "README.md" or rng.random() < 0.4:
+                    files[path] = f"{path} for repo {i}\n".encode() * rng.randint(1, 50)
+            self.repos[f"owner/repo-{i}"] = files
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, payload = server.route_get(urlparse(self.path))
+                self.reply(status, payload)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                self.reply(200, server.graphql(body))
+
+            def reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                etag = '"%s"' % hashlib.md5(data).hexdigest()
+                if status == 200 and self.command == 'GET' and self.headers.get('If-None-Match') == etag:
+                    with server.lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                with server.lock:
+                    server.counted += 1
+                self.send_response(status)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def tree_sha(self, files):
+        return git_sha(''.join(f"{path}:{git_sha(data)}" for path, data in sorted(files.items())).encode())
+
+    def route_get(self, url):
+        match = re.match(r'^/repos/([^/]+/[^/]+)(?:/(contents|git/trees|git/blobs)/(.+))?$', url.path)
+        files = self.repos.get(match.group(1)) if match else None
+        if files is None:
+            return 404, {'message': 'Not Found'}
+        kind, rest = match.group(2), match.group(3)
+        if kind is None:
+            return 200, {'full_name': match.group(1), 'default_branch': 'main'}
+        if kind == 'contents':
+            if rest not in files:
+                return 404, {'message': 'Not Found'}
+            return 200, {'path': rest, 'sha': git_sha(files[rest]), 'encoding': 'base64',
+                         'content': base64.b64encode(files[rest]).decode()}
+        if kind == 'git/trees':
+            if rest not in ('main', self.tree_sha(files)):
+                return 404, {'message': 'Not Found'}
+            recursive = 'recursive' in parse_qs(url.query)
+            return 200, {'sha': self.tree_sha(files), 'truncated': False, 'tree': [
+                {'path': path, 'type': 'blob', 'sha': git_sha(data), 'size': len(data)}
+                for path, data in sorted(files.items()) if recursive or '/' not in path]}
+        for data in files.values():
+            if git_sha(data) == rest:
+                return 200, {'sha': rest, 'encoding': 'base64', 'content': base64.b64encode(data).decode()}
+        return 404, {'message': 'Not Found'}
+
+    def graphql(self, body):
+        variables = body['variables']
+        files = self.repos[f"{variables['owner']}/{variables['name']}"]
+        by_sha = {git_sha(data): data for data in files.values()}
+        repository = {}
+        for alias, sha in re.findall(r'(b\d+): object\(oid: "([0-9a-f]{40})"\)', body['query']):
+            data = by_sha.get(sha)
+            repository[alias] = {'text': data.decode(), 'isBinary': False} if data is not None else None
+        return {'data': {'repository': repository}}
+
+    def mutate(self, fraction, rng):
+        for full in rng.sample(sorted(self.repos), int(len(self.repos) * fraction)):
+            files = self.repos[full]
+            path = rng.choice([p for p in CANDIDATES if p in files])
+            files[path] = files[path] + b"changed\n"
+
+    def reset_counts(self):
+        with self.lock:
+            self.counted = self.not_modified = 0
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def legacy_snapshot(session, base, full):
+    """One contents call per candidate, as PyGithub's get_contents does"""
+    out = {}
+    for path in CANDIDATES:
+        response = session.get(f"{base}/repos/{full}/contents/{path}")
+        if response.status_code == 200:
+            out[path] = base64.b64decode(response.json()['content']).decode()
+    return out
+
+
+def run_pass(server, snapshot):
+    server.reset_counts()
+    start = time.perf_counter()
+    files = sum(len(snapshot(full)) for full in sorted(server.repos))
+    elapsed = time.perf_counter() - start
+    repos = len(server.repos)
+    return {
+        'files': files,
+        'seconds': round(elapsed, 2),
+        'rate_limited_requests': server.counted,
+        'not_modified_304': server.not_modified,
+        'requests_per_repo': round(server.counted / repos, 2),
+        'repos_per_5000_requests': int(RATE_LIMIT_WINDOW * repos / max(1, server.counted))
+    }
+
+
+def run(mode, args):
+    server = FakeGitHub(args.repos, random.Random(args.seed))
+    if mode == 'legacy':
+        session = requests.Session()
+        snapshot = lambda full: legacy_snapshot(session, server.url, full)  # noqa: E731
+    else:
+        directory = tempfile.mkdtemp()
+        client = GitHubHTTP(args.token, GitHubResponseCache(os.path.join(directory, 'github.sqlite3')),
+                            api_base=server.url)
+        snapshot = lambda full: client.fetch_files(full, CANDIDATES[1:])  # noqa: E731
+    first = run_pass(server, snapshot)
+    server.mutate(args.changed, random.Random(args.seed + 1))
+    second = run_pass(server, snapshot)
+    server.close()
+    return {'first_pass': first, 'second_pass': second}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repos', type=int, default=200)
+    parser.add_argument('--changed', type=float, default=0.1)
+    parser.add_argument('--token', default='benchmark-token',
+                        help='blank to use per-blob REST fetches instead of GraphQL')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    results = {'legacy_contents': run('legacy', args), 'conditional_tree': run('conditional', args)}
+    print(json.dumps({'repos': args.repos, 'changed_fraction': args.changed, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
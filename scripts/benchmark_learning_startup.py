@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Learning Core Startup Benchmark
+Builds learning-memory databases of several sizes and measures
+AutonomousLearningCore constructor time and resident memory with the
+eager loader (every row parsed) and the lazy, index-first loader, each
+in a fresh process with memory_capacity equal to the number of rows.
+
+Usage:
+    python scripts/benchmark_learning_startup.py --sizes 10000 100000 1000000
+    python scripts/benchmark_learning_startup.py --sizes 100000 --modes lazy
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def rss_mb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def build_database(path, rows, seed):
+    """Schema from the learning core itself, then bulk-inserted synthetic experiences"""
+    from autonomous_learning_core import AutonomousLearningCore
+
+    core = AutonomousLearningCore(memory_path=path)
+    core.store.close()
+
+    rng = random.Random(seed)
+    keys = [f"key_{i}" for i in range(60)]
+    shapes = [rng.sample(keys, rng.randint(3, 8)) for _ in range(200)]
+    start = datetime(2026, 1, 1)
+    conn = sqlite3.connect(path)
+    with conn:
+        batch = []
+        for i in range(rows):
+            context = {key: rng.random() for key in rng.choice(shapes)}
+            context['description'] = 'synthetic experience ' * rng.randint(1, 10)
+            batch.append((
+                f"exp_{i}", json.dumps(context), f"action_{rng.randint(0, 24)}",
+                json.dumps({'result': rng.random(), 'notes': ['ok'] * rng.randint(0, 5)}),
+                rng.random(), (start + timedelta(seconds=i)).isoformat(), 'experience',
+                json.dumps(['synthetic']), None, json.dumps(sorted(context))
+            ))
+            if len(batch) == 10000:
+                conn.executemany("INSERT INTO experiences VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT INTO experiences VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.close()
+
+
+def measure(path, rows, mode):
+    """Runs in a child process so each measurement starts from a clean heap"""
+    from autonomous_learning_core import AutonomousLearningCore
+
+    logging.disable(logging.CRITICAL)
+    baseline = rss_mb()
+    start = time.perf_counter()
+    core = AutonomousLearningCore(memory_path=path, memory_capacity=rows, load_mode=mode)
+    elapsed = time.perf_counter() - start
+    loaded = len(core.experiences)
+    core.store.close()
+    return {'constructor_seconds': round(elapsed, 3), 'rss_mb': round(rss_mb() - baseline, 1),
+            'experiences': loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--modes', nargs='+', default=['eager', 'lazy'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--child', nargs=3, metavar=('PATH', 'ROWS', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    if args.child:
+        path, rows, mode = args.child
+        print(json.dumps(measure(path, int(rows), mode)))
+        return
+
+    results = {}
+    directory = tempfile.mkdtemp()
+    for rows in args.sizes:
+        path = os.path.join(directory, f"learning_{rows}.db")
+        start = time.perf_counter()
+        build_database(path, rows, args.seed)
+        results[rows] = {'build_seconds': round(time.perf_counter() - start, 1),
+                         'db_mb': round(os.path.getsize(path) / 1e6, 1)}
+        for mode in args.modes:
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', path, str(rows), mode],
+                                   capture_output=True, text=True, cwd=ROOT)
+            results[rows][mode] = json.loads(child.stdout) if child.returncode == 0 else {
+                'error': child.stderr.strip().splitlines()[-1:]}
+        os.remove(path)
+
+    print(json.dumps({'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Memory System Benchmark
+Compares the legacy connect-per-call SQLite path against the pooled,
+WAL-mode storage engine behind MemorySystem.
+
+Usage:
+    python scripts/benchmark_memory_system.py --entries 5000 --queries 500
+    python scripts/benchmark_memory_system.py --scale 10000,100000,1000000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory_system import MemorySystem  # noqa: E402
+from memory_storage import CREATE_MEMORIES_SQL, INSERT_MEMORY_SQL  # noqa: E402
+
+WORDS = [
+    'agent', 'mining', 'governance', 'treasury', 'proposal', 'xmrt', 'monero',
+    'learning', 'cycle', 'repository', 'analysis', 'security', 'community',
+    'token', 'vote', 'reward', 'pool', 'hashrate', 'bridge', 'staking'
+]
+MEMORY_TYPES = ['general', 'learning_metrics', 'fix_action', 'conversation']
+
+
+def random_content(rng: random.Random) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 24)))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench_legacy(db_path, contents, queries):
+    """Legacy behaviour: new connection and commit per insert, LIKE scan per query"""
+    conn = sqlite3.connect(db_path)
+    conn.execute(CREATE_MEMORIES_SQL)
+    conn.commit()
+    conn.close()
+
+    start = time.perf_counter()
+    for content, memory_type in contents:
+        now = datetime.utcnow().isoformat()
+        conn = sqlite3.connect(db_path)
+        conn.execute(INSERT_MEMORY_SQL, (
+            str(uuid.uuid4()), content, memory_type, now, 0.5, 0, now,
+            '[]', '[]', 1.0, 'system', '{}'
+        ))
+        conn.commit()
+        conn.close()
+    insert_elapsed = time.perf_counter() - start
+
+    latencies = []
+    for query, memory_type in queries:
+        q_start = time.perf_counter()
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "SELECT * FROM memories WHERE content LIKE ? AND memory_type = ? "
+            "ORDER BY importance_score DESC, access_count DESC LIMIT ?",
+            (f'%{query}%', memory_type, 10)
+        ).fetchall()
+        conn.close()
+        latencies.append(time.perf_counter() - q_start)
+
+    return insert_elapsed, latencies
+
+
+def bench_engine(db_path, contents, queries):
+    """Current MemorySystem with the pooled storage engine"""
+    memory = MemorySystem({'local_db_path': db_path})
+    memory._initialize_local_db()
+
+    start = time.perf_counter()
+    for content, memory_type in contents:
+        memory.store_memory(content, memory_type)
+    memory.flush()
+    insert_elapsed = time.perf_counter() - start
+
+    latencies = []
+    for query, memory_type in queries:
+        q_start = time.perf_counter()
+        memory.query_memories(query, limit=10, memory_type=memory_type)
+        latencies.append(time.perf_counter() - q_start)
+
+    memory.close()
+    return insert_elapsed, latencies
+
+
+def bench_scaling(db_path, sizes, queries, rng):
+    """Full-text query latency as the store grows (engine only)"""
+    memory = MemorySystem({'local_db_path': db_path, 'write_buffer_size': 5000})
+    memory._initialize_local_db()
+    store = memory.store
+
+    scaling = {}
+    stored = 0
+    for size in sorted(sizes):
+        now = datetime.utcnow().isoformat()
+        while stored < size:
+            store.insert((
+                str(uuid.uuid4()), random_content(rng), rng.choice(MEMORY_TYPES), now,
+                rng.random(), 0, now, '[]', '[]', 1.0, 'system', '{}'
+            ))
+            stored += 1
+        memory.flush()
+
+        latencies = []
+        for query, memory_type in queries:
+            q_start = time.perf_counter()
+            memory.query_memories(query, limit=10, memory_type=memory_type)
+            latencies.append(time.perf_counter() - q_start)
+        scaling[size] = {
+            'query_p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'query_p99_ms': round(percentile(latencies, 99) * 1000, 3)
+        }
+
+    memory.close()
+    return scaling
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scale', type=str, default='',
+                        help='comma-separated store sizes for the query latency scaling run')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(args.seed)
+    contents = [(random_content(rng), rng.choice(MEMORY_TYPES)) for _ in range(args.entries)]
+    queries = [(rng.choice(WORDS), rng.choice(MEMORY_TYPES)) for _ in range(args.queries)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, bench in (('legacy', bench_legacy), ('engine', bench_engine)):
+            insert_elapsed, latencies = bench(os.path.join(tmp, f'{name}.db'), contents, queries)
+            results[name] = {
+                'inserts_per_sec': round(args.entries / insert_elapsed, 1),
+                'query_p50_ms': round(percentile(latencies, 50) * 1000, 3),
+                'query_p99_ms': round(percentile(latencies, 99) * 1000, 3)
+            }
+
+        if args.scale:
+            sizes = [int(size) for size in args.scale.split(',') if size]
+            results['scaling'] = bench_scaling(os.path.join(tmp, 'scaling.db'), sizes, queries, rng)
+
+    print(json.dumps({'entries': args.entries, 'queries': args.queries, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
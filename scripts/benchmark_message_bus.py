@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Message Bus Benchmark
+Measures A2A message throughput across simulated agents for the legacy
+single-queue bus and the sharded MessageBus at several worker counts,
+broadcast fan-out, and how long a critical message waits behind a flood
+of bulk traffic to a slow agent.
+
+Usage:
+    python scripts/benchmark_message_bus.py --agents 100 --messages 100000
+    python scripts/benchmark_message_bus.py --agents 100 --workers 1 4 8 16
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from message_bus import MessageBus, MessagePriority  # noqa: E402
+from xmrt_coordination_core import AgentMessage, MessageType  # noqa: E402
+
+
+class LegacyMessageBus:
+    """The pre-sharding bus: one unbounded queue, one consumer, create_task per callback"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+        self._message_queue = asyncio.Queue()
+        self._processing_task = None
+
+    async def start(self):
+        self._processing_task = asyncio.create_task(self._process_messages())
+
+    async def stop(self):
+        self._processing_task.cancel()
+        try:
+            await self._processing_task
+        except asyncio.CancelledError:
+            pass
+
+    def subscribe(self, receiver_id, callback):
+        self._subscribers[receiver_id].append(callback)
+
+    async def post_message(self, message):
+        await self._message_queue.put(message)
+
+    async def _process_messages(self):
+        while True:
+            message = await self._message_queue.get()
+            for callback in self._subscribers.get(message.receiver, ()):
+                if asyncio.iscoroutinefunction(callback):
+                    asyncio.create_task(callback(message))
+                else:
+                    callback(message)
+            self._message_queue.task_done()
+
+
+def make_message(sender, receiver, method='bench'):
+    return AgentMessage(id=str(uuid.uuid4()), type=MessageType.NOTIFICATION, sender=sender,
+                        receiver=receiver, method=method, params={})
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def bench_throughput(bus, agents, messages, rng, broadcast=False):
+    """Post ``messages`` (direct or broadcast) and time until every delivery lands"""
+    received = [0]
+    expected = messages * (agents - 1) if broadcast else messages
+    done = asyncio.Event()
+
+    async def on_message(_message):
+        received[0] += 1
+        if received[0] == expected:
+            done.set()
+
+    agent_ids = [f'agent-{i}' for i in range(agents)]
+    for agent_id in agent_ids:
+        bus.subscribe(agent_id, on_message)
+    await bus.start()
+
+    batch = [make_message(rng.choice(agent_ids), 'all' if broadcast else rng.choice(agent_ids))
+             for _ in range(messages)]
+    start = time.perf_counter()
+    for message in batch:
+        await bus.post_message(message)
+    await asyncio.wait_for(done.wait(), timeout=300)
+    elapsed = time.perf_counter() - start
+    await bus.stop()
+
+    return {
+        'messages': messages,
+        'deliveries': received[0],
+        'seconds': round(elapsed, 3),
+        'deliveries_per_sec': round(received[0] / elapsed, 1)
+    }
+
+
+async def bench_priority(workers, flood):
+    """Queue ``flood`` bulk messages for a slow agent, then one critical message"""
+    bus = MessageBus(workers=workers, max_queue_size=flood + 10)
+    latencies = {}
+    order = []
+
+    async def slow_agent(message):
+        await asyncio.sleep(0.0005)
+        order.append(message.method)
+        latencies.setdefault(message.method, []).append(time.perf_counter() - message.params['sent'])
+
+    bus.subscribe('slow-agent', slow_agent)
+    for i in range(flood):
+        message = make_message('sender', 'slow-agent', 'bulk')
+        message.params['sent'] = time.perf_counter()
+        await bus.post_message(message, MessagePriority.BULK)
+    critical = make_message('sender', 'slow-agent', 'critical')
+    critical.params['sent'] = time.perf_counter()
+    await bus.post_message(critical, MessagePriority.CRITICAL)
+
+    await bus.start()
+    while len(latencies.get('bulk', ())) < flood or 'critical' not in latencies:
+        await asyncio.sleep(0.01)
+    await bus.stop()
+
+    return {
+        'bulk_messages_queued_ahead': flood,
+        'critical_latency_ms': round(latencies['critical'][0] * 1000, 2),
+        'bulk_p50_latency_ms': round(percentile(latencies['bulk'], 50) * 1000, 2),
+        'critical_delivery_position': order.index('critical') + 1
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--agents', type=int, default=100)
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--broadcasts', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--flood', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    results = {
+        'legacy': asyncio.run(bench_throughput(LegacyMessageBus(), args.agents, args.messages,
+                                               random.Random(args.seed)))
+    }
+    for workers in args.workers:
+        bus = MessageBus(workers=workers, max_queue_size=args.messages)
+        results[f'sharded_{workers}_workers'] = asyncio.run(
+            bench_throughput(bus, args.agents, args.messages, random.Random(args.seed)))
+    bus = MessageBus(workers=max(args.workers), max_queue_size=args.broadcasts)
+    results['broadcast'] = asyncio.run(
+        bench_throughput(bus, args.agents, args.broadcasts, random.Random(args.seed), broadcast=True))
+    results['priority'] = asyncio.run(bench_priority(max(args.workers), args.flood))
+
+    print(json.dumps({'agents': args.agents, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+OpenAI Rate Limiter Benchmark
+Drives a local fake chat-completions server, which enforces per-second
+request and token quotas and answers 429 with ``retry-after-ms``, from
+many threads with the legacy fixed-window throttle and with the
+RateLimiter + AdaptiveConcurrency pair behind OpenAIClient, and reports
+throughput, 429s and latency for each.
+
+Usage:
+    python scripts/benchmark_openai_limiter.py --rpm 3000 --tpm 600000 --requests 400
+    python scripts/benchmark_openai_limiter.py --threads 32 --latency-ms 80
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import AdaptiveConcurrency, RateLimiter, estimate_tokens, retry_after_seconds  # noqa: E402
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FakeCompletionServer:
+    """Chat completions endpoint with one-second request and token windows"""
+
+    def __init__(self, rpm, tpm, latency):
+        self.requests_per_window = max(1, rpm // 60)
+        self.tokens_per_window = max(1, tpm // 60) if tpm else None
+        self.latency = latency
+        self.window = int(time.monotonic())
+        self.used_requests = self.used_tokens = 0
+        self.throttled = self.served = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                prompt = sum(len(m['content']) for m in body['messages']) // 4
+                completion = body.get('completion_tokens', 200)
+                retry = server.admit(prompt + completion)
+                if retry is not None:
+                    self.reply(429, {'error': {'message': 'Rate limit reached'}}, {'retry-after-ms': str(retry)})
+                    return
+                time.sleep(server.latency * random.uniform(0.5, 1.5))
+                self.reply(200, {
+                    'choices': [{'message': {'role': 'assistant', 'content': 'ok'}}],
+                    'usage': {'prompt_tokens': prompt, 'completion_tokens': completion,
+                              'total_tokens': prompt + completion}
+                })
+
+            def reply(self, status, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/v1/chat/completions'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def admit(self, tokens):
+        """None if the request fits this window, else milliseconds until the next one"""
+        with self.lock:
+            now = time.monotonic()
+            if int(now) != self.window:
+                self.window, self.used_requests, self.used_tokens = int(now), 0, 0
+            over_tokens = self.tokens_per_window is not None and self.used_tokens + tokens > self.tokens_per_window
+            if self.used_requests >= self.requests_per_window or over_tokens:
+                self.throttled += 1
+                return int((self.window + 1 - now) * 1000) + 1
+            self.used_requests += 1
+            self.used_tokens += tokens
+            self.served += 1
+            return None
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def post(url, messages, completion_tokens):
+    """Returns (status, headers, payload)"""
+    data = json.dumps({'messages': messages, 'completion_tokens': completion_tokens}).encode()
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, response.headers, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, None
+
+
+class LegacyClient:
+    """The pre-token-bucket OpenAIClient: 60 s window counter, sleeps under the lock"""
+
+    def __init__(self, url, rpm, concurrency, _tpm):
+        self.url = url
+        self._rpm = rpm
+        self._sema = threading.Semaphore(concurrency)
+        self._window_start = time.time()
+        self._req_in_window = 0
+        self._lock = threading.Lock()
+
+    def _throttle(self):
+        with self._lock:
+            now = time.time()
+            elapsed = now - self._window_start
+            if elapsed >= 60:
+                self._window_start, self._req_in_window = now, 0
+            if self._req_in_window >= self._rpm:
+                time.sleep(60 - elapsed + random.uniform(0.1, 0.4))
+                self._window_start, self._req_in_window = time.time(), 0
+            self._req_in_window += 1
+
+    def chat(self, messages, completion_tokens, stats):
+        with self._sema:
+            self._throttle()
+            delay = 2.0
+            for _ in range(5):
+                status, _headers, payload = post(self.url, messages, completion_tokens)
+                if status == 429:
+                    stats['throttled'] += 1
+                    time.sleep(delay)
+                    delay = min(delay * 2, 30)
+                    continue
+                return payload
+            return None
+
+
+class AdaptiveClient:
+    """The OpenAIClient.chat loop over RateLimiter + AdaptiveConcurrency"""
+
+    def __init__(self, url, rpm, concurrency, tpm):
+        self.url = url
+        self.limiter = RateLimiter(rpm, tpm or None)
+        self.concurrency = AdaptiveConcurrency(initial=1, maximum=concurrency)
+
+    def chat(self, messages, completion_tokens, stats):
+        estimate = estimate_tokens(messages, 512)
+        delay = 2.0
+        for _ in range(5):
+            self.concurrency.acquire()
+            outcome = 'error'
+            try:
+                self.limiter.acquire(estimate)
+                status, headers, payload = post(self.url, messages, completion_tokens)
+                if status == 429:
+                    outcome = 'throttled'
+                    stats['throttled'] += 1
+                    wait = retry_after_seconds({k.lower(): v for k, v in headers.items()})
+                    if wait is None:
+                        wait, delay = delay, min(delay * 2, 30)
+                    self.limiter.pause(wait)
+                    continue
+                outcome = 'ok'
+                self.limiter.settle(estimate, payload['usage']['total_tokens'])
+                return payload
+            finally:
+                self.concurrency.release(outcome)
+        return None
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(client_cls, args):
+    server = FakeCompletionServer(args.rpm, args.tpm, args.latency_ms / 1000.0)
+    client = client_cls(server.url, args.rpm, args.threads, args.tpm)
+    rng = random.Random(args.seed)
+    work = [([{'role': 'user', 'content': 'x' * rng.randint(200, 4000)}], rng.randint(50, 400))
+            for _ in range(args.requests)]
+    stats = {'throttled': 0, 'failed': 0}
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not work:
+                    return
+                messages, completion_tokens = work.pop()
+            start = time.perf_counter()
+            ok = client.chat(messages, completion_tokens, stats) is not None
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                stats['failed'] += not ok
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.close()
+
+    result = {
+        'seconds': round(elapsed, 2),
+        'completed_per_sec': round((args.requests - stats['failed']) / elapsed, 1),
+        'quota_requests_per_sec': round(args.rpm / 60.0, 1),
+        'throttled_429': stats['throttled'],
+        'failed': stats['failed'],
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'latency_p95_ms': round(percentile(latencies, 95) * 1000, 1)
+    }
+    if isinstance(client, AdaptiveClient):
+        result['concurrency'] = client.concurrency.get_metrics()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rpm', type=int, default=3000)
+    parser.add_argument('--tpm', type=int, default=1500000)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    results = {'legacy': run(LegacyClient, args), 'token_bucket_aimd': run(AdaptiveClient, args)}
+    print(json.dumps({'rpm': args.rpm, 'tpm': args.tpm, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Memory Import Tool
+Streams memories into a MemorySystem store with constant memory use.
+
+Sources:
+  - JSONL files (or '-' for stdin), one memory per line with at least a
+    "content" field; see MemorySystem.store_memories_bulk for the rest
+  - directories of activity logs (*.json) or agent cycle reports (*.md),
+    one memory per file, e.g. activity_logs/ and agent_cycles/
+
+Usage:
+    python scripts/import_memories.py export.jsonl --db xmrt_memory.db
+    cat export.jsonl | python scripts/import_memories.py - --db xmrt_memory.db
+    python scripts/import_memories.py --dir activity_logs --type activity_log
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory_system import MemorySystem  # noqa: E402
+
+logger = logging.getLogger("import_memories")
+
+_MARKDOWN_TIMESTAMP = re.compile(r'\*\*Timestamp:\*\*\s*(\S+)')
+
+
+def _normalize_timestamp(value: Optional[str]) -> Optional[str]:
+    """Store timestamps as naive UTC ISO strings like the rest of MemorySystem"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield one record per non-empty JSONL line"""
+    handle = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"⚠️ {path}:{line_number}: invalid JSON ({e})")
+                continue
+            if isinstance(record, dict):
+                record['timestamp'] = _normalize_timestamp(record.get('timestamp')) or record.get('timestamp')
+                yield record
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def iter_directory(path: str, memory_type: str) -> Iterator[Dict[str, Any]]:
+    """Yield one record per activity log / agent cycle file"""
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if not os.path.isfile(file_path) or not name.endswith(('.json', '.md')):
+            continue
+        with open(file_path, 'r', encoding='utf-8') as handle:
+            content = handle.read()
+
+        timestamp = None
+        if name.endswith('.json'):
+            try:
+                timestamp = _normalize_timestamp(json.loads(content).get('timestamp'))
+            except (ValueError, AttributeError):
+                pass
+        else:
+            match = _MARKDOWN_TIMESTAMP.search(content)
+            timestamp = _normalize_timestamp(match.group(1)) if match else None
+
+        yield {
+            # Stable ids make re-imports of the same directory idempotent
+            'id': f"{memory_type}:{name}",
+            'content': content,
+            'memory_type': memory_type,
+            'timestamp': timestamp or datetime.utcfromtimestamp(os.path.getmtime(file_path)).isoformat(),
+            'source': path.rstrip('/'),
+            'tags': [memory_type, 'import'],
+            'metadata': {'file': name}
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream memories into a MemorySystem store")
+    parser.add_argument('inputs', nargs='*', help="JSONL files to import ('-' for stdin)")
+    parser.add_argument('--dir', action='append', default=[],
+                        help='directory of *.json / *.md files to import (repeatable)')
+    parser.add_argument('--type', default=None,
+                        help='memory_type for --dir imports (default: directory name)')
+    parser.add_argument('--db', default='xmrt_memory.db', help='SQLite database path')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    if not args.inputs and not args.dir:
+        parser.error('nothing to import: pass JSONL files or --dir')
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    memory = MemorySystem({'local_db_path': args.db})
+    if not memory.initialize() or memory.store is None:
+        parser.exit(1, f"Could not open memory store at {args.db}\n")
+
+    totals = {}
+    try:
+        for path in args.inputs:
+            totals[path] = memory.store_memories_bulk(iter_jsonl(path), args.chunk_size)
+        for path in args.dir:
+            memory_type = args.type or os.path.basename(os.path.normpath(path))
+            totals[path] = memory.store_memories_bulk(
+                iter_directory(path, memory_type), args.chunk_size
+            )
+    finally:
+        memory.close()
+
+    print(json.dumps(totals, indent=2))
+
+
+if __name__ == '__main__':
+    main()
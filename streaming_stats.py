@@ -0,0 +1,169 @@
+"""
+XMRT-Ecosystem: Streaming Statistics
+Constant-time, constant-memory estimators for anomaly baselines.
+
+- Welford's algorithm for the running mean and variance
+- The P² algorithm (Jain & Chlamtac, extended to several quantiles) for
+  the median and quartiles without storing observations
+- An exponentially weighted mean/variance that tracks drift; points are
+  winsorised before they enter it so a single outlier cannot inflate the
+  baseline it is being compared against
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+class P2Quantiles:
+    """P² sketch tracking several quantiles with 2k+3 markers"""
+
+    __slots__ = ('quantiles', '_fractions', '_heights', '_positions', '_desired', '_initial', 'count')
+
+    def __init__(self, quantiles: Sequence[float] = (0.25, 0.5, 0.75)):
+        self.quantiles = tuple(sorted(quantiles))
+        # Markers at the extremes, at each quantile and halfway between them
+        points = (0.0,) + self.quantiles + (1.0,)
+        fractions = [0.0]
+        for low, high in zip(points, points[1:]):
+            fractions.extend(((low + high) / 2, high))
+        self._fractions = fractions
+        self._heights: List[float] = []
+        self._positions: List[float] = []
+        self._desired: List[float] = []
+        self._initial: List[float] = []
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        markers = len(self._fractions)
+
+        if self._initial is not None:
+            self._initial.append(value)
+            if len(self._initial) == markers:
+                self._heights = sorted(self._initial)
+                self._positions = [float(i) for i in range(markers)]
+                self._desired = [f * (markers - 1) for f in self._fractions]
+                self._initial = None
+            return
+
+        heights, positions = self._heights, self._positions
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[-1]:
+            heights[-1] = value
+            cell = markers - 2
+        else:
+            cell = bisect_right(heights, value) - 1
+
+        for i in range(cell + 1, markers):
+            positions[i] += 1
+        desired = self._desired
+        for i, fraction in enumerate(self._fractions):
+            desired[i] += fraction
+
+        # Nudge interior markers towards their desired positions
+        for i in range(1, markers - 1):
+            offset = desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not heights[i - 1] < candidate < heights[i + 1]:
+                    candidate = heights[i] + step * (heights[i + step] - heights[i]) / \
+                        (positions[i + step] - positions[i])
+                heights[i] = candidate
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def quantile(self, q: float) -> float:
+        """Current estimate of quantile ``q`` (must be one of ``quantiles``)"""
+        if self._initial is not None:
+            return float(np.percentile(self._initial, q * 100)) if self._initial else 0.0
+        return self._heights[self._fractions.index(q)]
+
+
+class StreamingBaseline:
+    """Per-metric running baseline updated in O(1) per observation"""
+
+    __slots__ = ('alpha', 'clip_sigmas', 'min_samples', 'count', 'mean', '_m2', 'minimum',
+                 'maximum', 'ewma', '_ew_var', 'quantiles')
+
+    def __init__(self, alpha: float = 0.02, clip_sigmas: float = 4.0, min_samples: int = 10):
+        self.alpha = alpha
+        self.clip_sigmas = clip_sigmas
+        self.min_samples = min_samples
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self.ewma = 0.0
+        self._ew_var = 0.0
+        self.quantiles = P2Quantiles((0.25, 0.5, 0.75))
+
+    def update(self, value: float):
+        self.count += 1
+
+        # Welford
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+        # Exponentially weighted mean/variance over winsorised values
+        if self.count == 1:
+            self.ewma = value
+        else:
+            if self.count > self.min_samples and self._ew_var > 0:
+                bound = self.clip_sigmas * self._ew_var ** 0.5
+                value_clipped = min(max(value, self.ewma - bound), self.ewma + bound)
+            else:
+                value_clipped = value
+            diff = value_clipped - self.ewma
+            increment = self.alpha * diff
+            self.ewma += increment
+            self._ew_var = (1 - self.alpha) * (self._ew_var + diff * increment)
+
+        self.quantiles.add(value)
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.min_samples
+
+    @property
+    def std(self) -> float:
+        return (self._m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+    @property
+    def ewma_std(self) -> float:
+        return self._ew_var ** 0.5
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Baseline statistics in the shape AnomalyDetector has always exposed"""
+        q25 = self.quantiles.quantile(0.25)
+        q75 = self.quantiles.quantile(0.75)
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'median': self.quantiles.quantile(0.5),
+            'std': self.std,
+            'min': self.minimum,
+            'max': self.maximum,
+            'q25': q25,
+            'q75': q75,
+            'iqr': q75 - q25,
+            'ewma': self.ewma,
+            'ewma_std': self.ewma_std
+        }
@@ -0,0 +1,139 @@
+"""
+Tests for ExperienceIndex against a brute-force Jaccard scan
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from experience_index import ExperienceIndex, jaccard
+
+ACTIONS = ('optimize', 'analyze', 'deploy')
+VOCABULARY = [f'key_{i}' for i in range(14)]
+THRESHOLDS = (0.4, 0.5, 0.6, 0.75, 0.9)
+
+
+def random_keys(rng: random.Random) -> frozenset:
+    return frozenset(rng.sample(VOCABULARY, rng.randint(0, 7)))
+
+
+class BruteForce:
+    """Reference scan over every indexed experience"""
+
+    def __init__(self):
+        self.entries = {}  # id -> (action, keys, success_score, seq)
+        self.seq = 0
+
+    def add(self, experience_id, action, keys, success_score):
+        self.seq += 1
+        self.entries[experience_id] = (action, frozenset(keys), success_score, self.seq)
+
+    def remove(self, experience_id):
+        return self.entries.pop(experience_id, None) is not None
+
+    def neighbours(self, action, keys, threshold):
+        keys = frozenset(keys)
+        return {experience_id: jaccard(keys, entry_keys)
+                for experience_id, (entry_action, entry_keys, _, _) in self.entries.items()
+                if entry_action == action and jaccard(keys, entry_keys) > threshold}
+
+    def best_matches(self, action, keys, threshold, limit):
+        matches = self.neighbours(action, keys, threshold)
+        ranked = sorted(matches, key=lambda experience_id: (-self.entries[experience_id][2],
+                                                            self.entries[experience_id][3]))
+        return ranked[:limit]
+
+
+def populate(rng: random.Random, count: int, index: ExperienceIndex, reference: BruteForce):
+    for i in range(count):
+        entry = (f'exp_{i}', rng.choice(ACTIONS), random_keys(rng), round(rng.random(), 2))
+        index.add(*entry)
+        reference.add(*entry)
+
+
+def assert_same_results(rng: random.Random, index: ExperienceIndex, reference: BruteForce,
+                        thresholds=THRESHOLDS, queries: int = 200):
+    for _ in range(queries):
+        action, keys = rng.choice(ACTIONS), random_keys(rng)
+        for threshold in thresholds:
+            assert dict(index.neighbours(action, keys, threshold)) == reference.neighbours(action, keys, threshold)
+            assert index.best_matches(action, keys, threshold, 10) == \
+                reference.best_matches(action, keys, threshold, 10)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_full_scan(seed):
+    rng = random.Random(seed)
+    index, reference = ExperienceIndex(), BruteForce()
+    populate(rng, 400, index, reference)
+    assert len(index) == len(reference.entries)
+    assert_same_results(rng, index, reference)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_matches_full_scan_after_removals(seed):
+    rng = random.Random(seed)
+    index, reference = ExperienceIndex(), BruteForce()
+    populate(rng, 400, index, reference)
+
+    for experience_id in rng.sample(sorted(reference.entries), 250):
+        assert index.remove(experience_id) == reference.remove(experience_id)
+    assert not index.remove('exp_missing')
+    assert len(index) == len(reference.entries)
+    assert_same_results(rng, index, reference)
+
+    # Re-adding an id replaces its old entry
+    for experience_id in sorted(reference.entries)[:50]:
+        entry = (experience_id, rng.choice(ACTIONS), random_keys(rng), round(rng.random(), 2))
+        index.add(*entry)
+        reference.add(*entry)
+    assert_same_results(rng, index, reference)
+
+
+def test_removing_everything_drops_postings():
+    rng = random.Random(7)
+    index, reference = ExperienceIndex(), BruteForce()
+    populate(rng, 100, index, reference)
+    for experience_id in list(reference.entries):
+        assert index.remove(experience_id)
+    assert len(index) == 0
+    metrics = index.get_metrics()
+    assert metrics['actions'] == 0 and metrics['key_groups'] == 0
+
+
+def test_add_many_matches_add():
+    rng = random.Random(11)
+    entries = [(f'exp_{i}', rng.choice(ACTIONS), random_keys(rng), round(rng.random(), 2)) for i in range(300)]
+    bulk, reference = ExperienceIndex(), BruteForce()
+    bulk.add_many(entries)
+    for entry in entries:
+        reference.add(*entry)
+    assert_same_results(rng, bulk, reference)
+
+
+def test_lower_minimum_threshold():
+    rng = random.Random(3)
+    index, reference = ExperienceIndex(min_similarity=0.2), BruteForce()
+    populate(rng, 300, index, reference)
+    assert_same_results(rng, index, reference, thresholds=(0.2, 0.3, 0.4))
+
+
+def test_threshold_below_minimum_is_rejected():
+    index = ExperienceIndex(min_similarity=0.5)
+    with pytest.raises(ValueError):
+        index.neighbours('optimize', {'key_0'}, 0.4)
+    with pytest.raises(ValueError):
+        ExperienceIndex(min_similarity=0.0)
+
+
+def test_empty_key_sets_never_match():
+    index = ExperienceIndex()
+    index.add('empty', 'optimize', [], 0.9)
+    index.add('full', 'optimize', ['key_0'], 0.5)
+    assert 'empty' in index
+    assert index.neighbours('optimize', [], 0.4) == []
+    assert index.best_matches('optimize', ['key_0'], 0.4) == ['full']
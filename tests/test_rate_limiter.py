@@ -0,0 +1,195 @@
+"""
+Tests for the adaptive concurrency limit and Retry-After parsing
+"""
+
+import asyncio
+import email.utils
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import rate_limiter
+from rate_limiter import AdaptiveConcurrency, retry_after_seconds
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', fake)
+    return fake
+
+
+async def _waiting_acquire(limiter: AdaptiveConcurrency) -> asyncio.Task:
+    """Start an acquire_async that has to queue behind the held slot"""
+    task = asyncio.ensure_future(limiter.acquire_async())
+    await asyncio.sleep(0)
+    assert not task.done()
+    assert limiter.get_metrics()['waiting'] == 1
+    return task
+
+
+def test_cancel_before_handover_returns_slot():
+    """Cancelled after release() picked the waiter but before _resolve ran"""
+    async def scenario():
+        limiter = AdaptiveConcurrency(initial=1, maximum=1)
+        await limiter.acquire_async()
+        waiter = await _waiting_acquire(limiter)
+
+        limiter.release('ok')  # grants the slot and schedules _resolve
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.acquire(timeout=0)
+
+
+def test_cancel_after_handover_returns_slot():
+    """Cancelled after the future got its result but before the task resumed"""
+    async def scenario():
+        limiter = AdaptiveConcurrency(initial=1, maximum=1)
+        await limiter.acquire_async()
+        waiter = await _waiting_acquire(limiter)
+
+        limiter.release('ok')
+        await asyncio.sleep(0)  # _resolve sets the result; the waiter has not run yet
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.acquire(timeout=0)
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        limiter = AdaptiveConcurrency(initial=1, maximum=1)
+        await limiter.acquire_async()
+        waiter = await _waiting_acquire(limiter)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release('ok')
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.get_metrics()['waiting'] == 0
+    assert limiter.in_flight == 0
+
+
+def test_grants_in_fifo_order():
+    async def scenario():
+        limiter = AdaptiveConcurrency(initial=1, maximum=1)
+        await limiter.acquire_async()
+        order = []
+
+        async def worker(name):
+            await limiter.acquire_async()
+            order.append(name)
+            limiter.release('ok')
+
+        tasks = [asyncio.ensure_future(worker(name)) for name in 'abc']
+        await asyncio.sleep(0)
+        limiter.release('ok')
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ['a', 'b', 'c']
+
+
+def test_additive_increase_up_to_maximum():
+    limiter = AdaptiveConcurrency(initial=1, maximum=3)
+    for expected in (2.0, 2.5, 2.9):
+        assert limiter.acquire(timeout=0)
+        limiter.release('ok')
+        assert limiter.limit == pytest.approx(expected, abs=0.01)
+    for _ in range(10):
+        limiter.acquire(timeout=0)
+        limiter.release('ok')
+    assert limiter.limit == 3.0
+
+
+def test_throttle_burst_halves_once_per_cooldown(clock):
+    limiter = AdaptiveConcurrency(initial=8, maximum=16, cooldown=5.0)
+    for _ in range(3):
+        assert limiter.acquire(timeout=0)
+    for _ in range(3):
+        limiter.release('throttled')
+    assert limiter.limit == 4.0
+    assert limiter.stats['throttled'] == 3
+    assert limiter.stats['decreases'] == 1
+
+    clock.now += 5.0
+    limiter.acquire(timeout=0)
+    limiter.release('throttled')
+    assert limiter.limit == 2.0
+    assert limiter.stats['decreases'] == 2
+
+
+def test_decrease_stops_at_minimum(clock):
+    limiter = AdaptiveConcurrency(initial=4, minimum=2, cooldown=1.0)
+    for _ in range(5):
+        limiter.acquire(timeout=0)
+        limiter.release('throttled')
+        clock.now += 1.0
+    assert limiter.limit == 2.0
+
+
+def test_error_outcome_keeps_limit():
+    limiter = AdaptiveConcurrency(initial=4)
+    limiter.acquire(timeout=0)
+    limiter.release('error')
+    assert limiter.limit == 4.0
+    with pytest.raises(ValueError):
+        limiter.release('unknown')
+
+
+def test_blocking_acquire_times_out_and_leaves_queue():
+    limiter = AdaptiveConcurrency(initial=1, maximum=1)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0.01)
+    assert limiter.get_metrics()['waiting'] == 0
+    limiter.release('ok')
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize('headers, expected', [
+    (None, None),
+    ({}, None),
+    ({'retry-after': '7'}, 7.0),
+    ({'retry-after': '1.5'}, 1.5),
+    ({'retry-after': '-3'}, 0.0),
+    ({'retry-after-ms': '250'}, 0.25),
+    ({'retry-after-ms': '250', 'retry-after': '9'}, 0.25),
+    ({'retry-after-ms': 'soon', 'retry-after': '9'}, 9.0),
+    ({'retry-after': 'not a date'}, None),
+])
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(headers) == expected
+
+
+def test_retry_after_http_date():
+    future = datetime.now(timezone.utc) + timedelta(seconds=30)
+    seconds = retry_after_seconds({'retry-after': email.utils.format_datetime(future, usegmt=True)})
+    assert 28.0 <= seconds <= 30.0
+
+    past = email.utils.formatdate(time.time() - 60, usegmt=True)
+    assert retry_after_seconds({'retry-after': past}) == 0.0